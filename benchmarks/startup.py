@@ -0,0 +1,47 @@
+# copyright @infradom
+# ======================= startup time benchmark ============================
+#
+# usage: python benchmarks/startup.py [--runs N]
+#
+# Each snippet runs in a fresh interpreter; the median wall time is reported.
+# Only the geometry build should pay for loading cadquery / OCP.
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+LIBRARY_DIR = Path(__file__).resolve().parent.parent
+
+SNIPPETS = {
+    "python (empty)":        "pass",
+    "import din_declarations": "import din_declarations",
+    "import din_enclosure":  "import din_enclosure",
+    "validate(Config())":    "from din_validate import validate; from din_declarations import Config; validate(Config())",
+    "load dual/config.py":   "from din_batch import load_config; load_config('dual/config.py')",
+    "import cadquery":       "import cadquery",
+}
+
+
+def run(code, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=LIBRARY_DIR, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="interpreter startup time per entry point")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+    check = "import sys, din_enclosure, din_validate, din_batch; assert 'cadquery' not in sys.modules"
+    subprocess.run([sys.executable, "-c", check], cwd=LIBRARY_DIR, check=True)
+    for name, code in SNIPPETS.items():
+        print(f"{name:26} {run(code, args.runs)*1000:8.1f} ms", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# copyright @infradom
+# ======================= build benchmark suite =============================
+#
+# usage: python benchmarks/suite.py [--sweep] [--only NAME ...] [--repeat N] [--history FILE] [--no-save] [--threshold F]
+#
+# Times generate_enclosure end to end and per stage (see din_profile) for the shipped configs and
+# the Config() defaults; --sweep adds variants of dual_zeros that scale the work: wago count,
+# LED count, text length and case width. Every run is appended to a JSON lines history; a
+# workload that got slower than the previous run on the same machine by more than --threshold
+# is reported and makes the exit code 1.
+
+import argparse
+import contextlib
+import copy
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+LIBRARY_DIR = Path(__file__).resolve().parent.parent
+if str(LIBRARY_DIR) not in sys.path: sys.path.insert(0, str(LIBRARY_DIR))
+
+from din_batch import load_config
+from din_declarations import *
+from din_profile import Profiler
+from din_validate import validate
+
+DEFAULT_HISTORY = Path(__file__).resolve().parent / "history.jsonl"
+
+
+def workloads(sweep = False):
+    # name: Config
+    result = {name: load_config(LIBRARY_DIR / name / "config.py") for name in ("dual", "dual2", "dual_zeros")}
+    result["defaults"] = Config()
+    if not sweep: return result
+    base = result["dual_zeros"] # accepts every wago and LED count of the sweep
+    def variant(name, **changes):
+        c = copy.deepcopy(base)
+        for k, v in changes.items(): setattr(c, k, v)
+        result[name] = c
+        return c
+    for n in range(0, 11, 2):
+        labels = [str(i) for i in range(n)]
+        variant(f"wago {n}+{n}", NR_WAGO_TOP=n, NR_WAGO_BOTTOM=n, WAGO_UPPER_TEXT=labels, WAGO_LOWER_TEXT=list(labels))
+    for n in range(0, 17, 4):
+        c = variant(f"leds {n}")
+        c.board1.leds = [Led(x=3 + 8*(i % 2), y=3 + 4.5*(i//2), txt=str(i)) for i in range(n)]
+    for n in (4, 16, 32):
+        variant(f"text {n}", BRAND="@" + "x"*(n - 1), MODULE_NAME="m"*n)
+    for width in (18, 27, 36, 54):
+        variant(f"width {width}", CASE_WIDTH=width)
+    return result
+
+
+def run(config, repeat):
+    # median wall time and the per-stage seconds of the median run, built in a scratch directory
+    import din_enclosure
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            for _ in range(repeat):
+                din_enclosure.glyph.cache_clear() # every run starts without text solids
+                profiler = Profiler()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = din_enclosure.generate_enclosure(config, profiler=profiler, export_workers=1)
+                runs.append((time.perf_counter() - start, profiler, result))
+        finally:
+            os.chdir(cwd)
+    runs.sort(key=lambda r: r[0])
+    seconds, profiler, result = runs[len(runs)//2]
+    stages = {}
+    for s in profiler.stages: stages[s.path] = stages.get(s.path, 0) + s.seconds
+    case = result.outputs["case"]
+    return {"seconds": seconds, "min_seconds": runs[0][0], "stages": stages,
+            "case_faces": len(case.Faces()), "case_volume": case.Volume(), "peak_rss_mb": profiler.report()["peak_rss_mb"]}
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=LIBRARY_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    import cadquery as cq
+    return {"time": datetime.datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "machine": platform.node(), "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count(),
+            "python": platform.python_version(), "cadquery": cq.__version__}
+
+
+def previous(history, machine):
+    # last result per workload recorded on this machine
+    last = {}
+    if not history.exists(): return last
+    for line in history.read_text().splitlines():
+        if not line.strip(): continue
+        entry = json.loads(line)
+        if entry.get("machine") != machine: continue
+        last.update(entry["results"])
+    return last
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="time generate_enclosure for the shipped configs and a parameter sweep")
+    parser.add_argument("--sweep", action="store_true", help="add the wago / LED / text / width sweep")
+    parser.add_argument("--only", nargs="*", help="workload names to run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slow down reported as a regression")
+    args = parser.parse_args(argv)
+
+    env = environment() # also loads cadquery, so its import is not part of the first workload
+    before = previous(args.history, env["machine"])
+    results, regressions = {}, []
+    for name, config in workloads(args.sweep).items():
+        if args.only and name not in args.only: continue
+        errors = [i.message for i in validate(config) if i.level == "error"]
+        if errors:
+            print(f"{name:16} skipped: {errors[0]}", flush=True)
+            continue
+        results[name] = r = run(config, args.repeat)
+        line = f"{name:16} {r['seconds']:7.2f}s  (min {r['min_seconds']:.2f}s, {r['case_faces']} faces)"
+        old = before.get(name)
+        if old:
+            change = r["seconds"]/old["seconds"] - 1
+            line += f"  {change:+.0%} vs previous"
+            if change > args.threshold: regressions.append(name)
+        print(line, flush=True)
+
+    if not args.no_save and results:
+        with open(args.history, "a") as f: f.write(json.dumps(dict(env, repeat=args.repeat, results=results)) + "\n")
+    if regressions: print(f"slower than the previous run by more than {args.threshold:.0%}: {', '.join(regressions)}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# copyright @infradom
+# ======================= build every */config.py in parallel ==============
+#
+# usage: python din_batch.py [root] [--jobs N] [--cache] [--profile] [--interference]
+#
+# The config.py scripts build their enclosure at import time; here only the statements up to
+# the `config = Config(...)` assignment are executed, so loading a config has no side effects.
+# Each config is then built in its own directory by a worker process.
+# --profile writes profile.json and profile.folded (flamegraph input) next to every config.py.
+# --interference also checks the assembled parts of every build for interference (din_interference);
+# the report goes into the log and a collision fails the build. It is off by default: the check
+# triangulates every part and adds seconds per build.
+
+import argparse
+import ast
+import contextlib
+import io
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+LIBRARY_DIR = Path(__file__).resolve().parent
+if str(LIBRARY_DIR) not in sys.path: sys.path.insert(0, str(LIBRARY_DIR))
+
+from din_declarations import *
+
+
+def find_configs(root):
+    return sorted(Path(root).glob("*/config.py"))
+
+def load_config(path) -> Config:
+    # execute the config script up to (and including) the assignment of `config`
+    path = Path(path)
+    tree = ast.parse(path.read_text(), filename=str(path))
+    body = []
+    for node in tree.body:
+        body.append(node)
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "config" for t in node.targets):
+            break
+    else: raise ValueError(f"{path}: no 'config = Config(...)' assignment found")
+    namespace = {"__file__": str(path), "__name__": "din_config"}
+    exec(compile(ast.Module(body=body, type_ignores=[]), str(path), "exec"), namespace)
+    return namespace["config"]
+
+
+def build_one(path, use_cache = False, profile = False, interference = False):
+    # runs in a worker process; returns (path, seconds, error or None, captured output)
+    path = Path(path)
+    log = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            import din_enclosure # imported here so the parent process never loads cadquery
+            config = load_config(path)
+            cache = None
+            if use_cache:
+                from din_cache import PartCache
+                cache = PartCache()
+            profiler = None
+            if profile:
+                from din_profile import Profiler
+                profiler = Profiler()
+            # output files go next to config.py; the batch pool already uses every core
+            result = din_enclosure.generate_enclosure(config, cache=cache, export_workers=1, profiler=profiler, output_dir=path.parent)
+            if result.placement: print(result.placement)
+            if cache: print(f"part cache: {result.cache_hits} hits, {result.cache_misses} misses")
+            if profiler:
+                profiler.write_json(path.parent / "profile.json")
+                profiler.write_folded(path.parent / "profile.folded")
+            pairs = result.interference() if interference else []
+            for p in pairs: print(p)
+        collisions = [str(p) for p in pairs if p.status == "interference"]
+        error = "\n".join(["parts collide:"] + collisions) + "\n" if collisions else None
+    except Exception:
+        error = traceback.format_exc()
+    return str(path), time.perf_counter() - start, error, log.getvalue()
+
+
+def build_all(paths, jobs = None, use_cache = False, profile = False, interference = False):
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = [pool.submit(build_one, p, use_cache, profile, interference) for p in paths]
+        for f in as_completed(futures):
+            path, seconds, error, log = f.result()
+            print(f"{'FAILED' if error else 'ok':6} {seconds:7.2f}s  {path}", flush=True)
+            results.append((path, seconds, error, log))
+    return results
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="generate all enclosure variants in parallel")
+    parser.add_argument("root", nargs="?", default=LIBRARY_DIR, help="directory holding one sub-directory per config")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--cache", action="store_true", help="use the on-disk part cache")
+    parser.add_argument("--profile", action="store_true", help="write a per-stage timing report next to every config")
+    parser.add_argument("--interference", action="store_true", help="check the assembled parts for interference")
+    args = parser.parse_args(argv)
+
+    paths = find_configs(args.root)
+    if not paths:
+        print(f"no */config.py found below {args.root}")
+        return 1
+    start = time.perf_counter()
+    results = build_all(paths, args.jobs, args.cache, args.profile, args.interference)
+    failed = [r for r in results if r[2]]
+    for path, seconds, error, log in failed:
+        print(f"\n===== {path} =====\n{log}{error}")
+    print(f"{len(results) - len(failed)} built, {len(failed)} failed in {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# copyright @infradom
+# ======================= on-disk BREP cache for enclosure sub-parts ========
+#
+# Every entry is keyed by a hash of the part name and of the Config/Board/Led values
+# that part reads, so changing e.g. BRAND only invalidates the brand text.
+# Entries are evicted least-recently-used once the cache exceeds max_bytes. Several processes may
+# share the directory: every process keeps a running total of what it stored since its last scan
+# and rescans (tolerating entries another process removed meanwhile) only to evict.
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "din_enclosure"
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024 # bytes
+
+
+def _plain(value):
+    # json fallback for dataclasses (Board, Led) and anything else with a stable repr
+    if is_dataclass(value): return asdict(value)
+    return repr(value)
+
+def part_key(name, deps):
+    blob = json.dumps([name, deps], sort_keys=True, default=_plain)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class PartCache:
+    def __init__(self, directory = DEFAULT_CACHE_DIR, max_bytes = DEFAULT_CACHE_SIZE):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total = None # bytes in the directory as of the last scan, plus what this process stored since
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.directory / (key + ".brep")
+
+    def get(self, name, deps, build):
+        # build() returns a workplane or a tuple of (at least two) workplanes; the same structure is returned on a hit
+        path = self._path(part_key(name, deps))
+        if path.exists():
+            try:
+                parts = self._load(path)
+                os.utime(path) # mark as recently used
+                self.hits += 1
+                return parts
+            except Exception: # unreadable entry: rebuild and overwrite it
+                pass
+        self.misses += 1
+        parts = build()
+        if parts is None: return None # unsupported feature, nothing to cache
+        self._store(path, parts)
+        return parts
+
+    def _store(self, path, parts):
+        import cadquery as cq
+        items = parts if isinstance(parts, tuple) else (parts,)
+        entry = cq.Compound.makeCompound([cq.Compound.makeCompound([v for v in i.vals() if isinstance(v, cq.Shape)]) for i in items])
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        entry.exportBrep(str(tmp))
+        size = tmp.stat().st_size
+        os.replace(tmp, path) # atomic, concurrent builds never see half written entries
+        if self._total is None: self._total = self.size()
+        else: self._total += size
+        if self._total > self.max_bytes: self.evict()
+
+    def _load(self, path):
+        import cadquery as cq
+        entry = cq.Shape.importBrep(str(path))
+        items = []
+        for item in entry:
+            children = list(item)
+            if not children: items.append(cq.Workplane("XY"))
+            elif len(children) == 1: items.append(cq.Workplane("XY").newObject(children))
+            else: items.append(cq.Workplane("XY").newObject([item]))
+        return items[0] if len(items) == 1 else tuple(items)
+
+    def _entries(self):
+        # (mtime, size, path) of every entry; entries another process removed since the glob are skipped
+        entries = []
+        for p in self.directory.glob("*.brep"):
+            try: st = p.stat()
+            except FileNotFoundError: continue
+            entries.append((st.st_mtime, st.st_size, p))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        while entries and total > self.max_bytes:
+            _, size, oldest = entries.pop(0)
+            total -= size
+            oldest.unlink(missing_ok=True)
+        self._total = total
+
+    def clear(self):
+        for p in self.directory.glob("*.brep"): p.unlink(missing_ok=True)
+        self._total = 0
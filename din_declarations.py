@@ -6,7 +6,9 @@
 # Copyright @infradom
 # ===========================================================================================
 
-from dataclasses import dataclass, field
+import hashlib
+import json
+from dataclasses import dataclass, field, fields, is_dataclass, make_dataclass
 
 @dataclass
 class Led:
@@ -17,19 +19,22 @@ class Led:
 # front board  : usb up orientation(if any) 
 # top board    : usb up orientation
 # bottom board : usb down orientation
+# leds of a front board shine through the front of the case, those of a top or bottom board through the lid;
+# x, y are then seen from the lid with the board in the orientation above (a bottom board is turned by 180 degrees)
 
 @dataclass
 class Board:
-    position:     str # either "top" | "bottom"| "front"
+    position:     str # either "top" | "bottom"| "front"; in Config.boards also "auto"
     board_width:  float  # excluding optional JST XH connectors
     length:       float
     thickness:    float = 1.5
     usb_height:   float | None = None   # center to under side of board; None if no usb required
     mount_height: float = 0 # from inner floor of case to under side of board
                             # id position = front: vertical board: front to upper side of board
+                            # in Config.boards: the least mount height, the placement may raise it
     jst_extrawidth_left:  float = 0     # jst xh connector may extend beyond border e.g. 2 mm
     jst_extrawidth_right: float = 0     # jst xh connector may extend beyond border e.e. 2 mm
-    leds:         list  | None = None   # list of Led declarations
+    leds:         list[Led] | None = None   # list of Led declarations
 
     @property
     def width(self): return self.board_width + self.jst_extrawidth_left + self.jst_extrawidth_right
@@ -44,20 +49,21 @@ class Board:
 @dataclass
 class Config: # DO NOTY MODIFY !!! adapt corresponding entries in config.py
     CONFIG_NAME:        str       = "modbus1"
-    board1:   callable = field(default_factory = lambda: Board("front",  board_width=16,   length=43.4, thickness=2.0, usb_height = None, mount_height = 12, # vertical board behind front
+    board1:   Board    = field(default_factory = lambda: Board("front",  board_width=16,   length=43.4, thickness=2.0, usb_height = None, mount_height = 12, # vertical board behind front
                          leds= [ Led( x=1.4, y=21.0, txt=""), Led( x=3.8, y=21.0, txt="")] )   )              # vertical board behind front
-    board2:   callable = field(default_factory = lambda: Board("top", board_width=26, length=35, thickness=2.0, usb_height = 1.8,  mount_height = 2.5, # mini C3 or S3 board
+    board2:   Board    = field(default_factory = lambda: Board("top", board_width=26, length=35, thickness=2.0, usb_height = 1.8,  mount_height = 2.5, # mini C3 or S3 board
                          jst_extrawidth_left = 0.0) )
-    board3:   callable = field(default_factory= lambda: Board("bottom",    board_width=18,   length=24, thickness=2.0, usb_height = 1.8,  mount_height = 1.5, # 23.2 length for C3 zero; 24 length for S3 zerp
+    board3:   Board    = field(default_factory= lambda: Board("bottom",    board_width=18,   length=24, thickness=2.0, usb_height = 1.8,  mount_height = 1.5, # 23.2 length for C3 zero; 24 length for S3 zerp
                          jst_extrawidth_right = 0.0) )
+    boards:   list[Board] | None = None # instead of board1..3: din_place puts them into the front, top and bottom slots; at most 3, one per slot
 
     BRAND:              str       = "@infradom"
 
     MODULE_NAME:        str       =  None # "modbus1"
     NR_WAGO_TOP:        int       =  0    # number of wago 221 at top
     NR_WAGO_BOTTOM:     int       =  2    # number of wago 221 at bottom
-    WAGO_UPPER_TEXT:    list      =  field(default_factory=lambda: []) # list of strings - single character strings recommended
-    WAGO_LOWER_TEXT:    list      =  field(default_factory=lambda: ["A", "B"]) #["5", "0", ] # list of strings - single character strings recommended
+    WAGO_UPPER_TEXT:    list[str] =  field(default_factory=lambda: []) # list of strings - single character strings recommended
+    WAGO_LOWER_TEXT:    list[str] =  field(default_factory=lambda: ["A", "B"]) #["5", "0", ] # list of strings - single character strings recommended
     CASE_WIDTH:         float     = 18    # standard unit = 18 mm - unless wago count makes it wider
     CASE_THICKNESS:     float     =  2    # untested if you modify this
 
@@ -97,3 +103,76 @@ class Config: # DO NOTY MODIFY !!! adapt corresponding entries in config.py
     LIGHT_CARRIER_DIAM:   float = LIGHT_GUIDE_DIAMETER+1.3
 
 
+# ============================= serialization, canonical hash and frozen copies =============
+#
+# config_to_dict / config_from_dict round trip a Config (or a frozen copy) through plain dicts and
+# lists, config_to_json / config_from_json through JSON. config_hash is the sha256 of a canonical
+# form: keys sorted, numbers as floats rounded to 1e-9, so 18 and 18.0 or a different field order
+# give the same hash. freeze_config returns an immutable, hashable copy (tuples instead of lists).
+
+def config_to_dict(obj):
+    if is_dataclass(obj): return {f.name: config_to_dict(getattr(obj, f.name)) for f in fields(obj)}
+    if isinstance(obj, (list, tuple)): return [config_to_dict(v) for v in obj]
+    return obj
+
+def _board_from_dict(d):
+    if isinstance(d, Board): return d
+    d = dict(d)
+    if d.get("leds") is not None: d["leds"] = [l if isinstance(l, Led) else Led(**l) for l in d["leds"]]
+    return Board(**d)
+
+def config_from_dict(d) -> Config:
+    # missing keys take the Config defaults; unknown keys raise TypeError
+    d = dict(d)
+    for name in ("board1", "board2", "board3"):
+        if name in d: d[name] = _board_from_dict(d[name])
+    if d.get("boards") is not None: d["boards"] = [_board_from_dict(b) for b in d["boards"]]
+    for name in ("WAGO_UPPER_TEXT", "WAGO_LOWER_TEXT"):
+        if name in d: d[name] = list(d[name])
+    return Config(**d)
+
+def config_to_json(c, **kwargs):
+    return json.dumps(config_to_dict(c), **kwargs)
+
+def config_from_json(text) -> Config:
+    return config_from_dict(json.loads(text))
+
+
+def _canonical(value):
+    if isinstance(value, bool) or value is None or isinstance(value, str): return value
+    if isinstance(value, (int, float)): return round(float(value), 9) + 0.0 # + 0.0: -0.0 becomes 0.0
+    if isinstance(value, dict): return {k: _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)): return [_canonical(v) for v in value]
+    if is_dataclass(value): return _canonical(config_to_dict(value))
+    raise TypeError(f"cannot hash {type(value).__name__}")
+
+def config_hash(c) -> str:
+    blob = json.dumps(_canonical(c), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _frozen(cls):
+    # frozen dataclass with the fields (without defaults) and properties of cls
+    props = {k: v for k, v in vars(cls).items() if isinstance(v, property)}
+    frozen = make_dataclass("Frozen" + cls.__name__, [(f.name, f.type) for f in fields(cls)], frozen=True, namespace=props)
+    frozen.__module__ = __name__ # so it pickles to worker processes
+    return frozen
+
+FrozenLed    = _frozen(Led)
+FrozenBoard  = _frozen(Board)
+FrozenConfig = _frozen(Config)
+
+def freeze_config(c):
+    def board(b):
+        leds = None if b.leds is None else tuple(FrozenLed(**config_to_dict(l)) for l in b.leds)
+        return FrozenBoard(**dict(config_to_dict(b), leds=leds))
+    if isinstance(c, FrozenConfig): return c
+    d = {f.name: getattr(c, f.name) for f in fields(c)}
+    for name in ("board1", "board2", "board3"): d[name] = board(d[name])
+    if d["boards"] is not None: d["boards"] = tuple(board(b) for b in d["boards"])
+    for name in ("WAGO_UPPER_TEXT", "WAGO_LOWER_TEXT"): d[name] = tuple(d[name])
+    return FrozenConfig(**d)
+
+def thaw_config(c) -> Config:
+    # mutable Config from a frozen (or any) config
+    return config_from_dict(config_to_dict(c))
@@ -11,47 +11,300 @@ from din_declarations import *
 # copyright @infradom
         
 # ========================== import cadquery ===========================
+# cadquery is imported by generate_enclosure, not here: declarations, validation and
+# planning code can import this module without paying for the OCP load
         
-import cadquery as cq
-from cadquery.func import *
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+import hashlib
 import os
+import threading
+import time
 
+from din_cache import PartCache
+from din_graph import BuildGraph
+from din_profile import Profiler
+from din_export import PRESETS, Tolerance, export_all, step_bytes, stl_bytes, threemf_bytes, to_shape
+from din_layout import layout, CLIP_GAP, CLIP_THICKNESS, WAGO_FIX_HEIGHT, WAGO_FIX_EXTRUDE, CARRIER_X, CARRIER_Y, USB_TAPER
 
+FONT = "Arial" # of the engraved text, resolved by OCCT to an installed font
 
 
-def generate_enclosure(c: Config):
+@lru_cache(maxsize=1)
+def _source_digest():
+    # cached parts are only valid for the code, the geometry constants (din_layout), the cadquery
+    # version and the font files that generated them
+    import cadquery as cq
+    from OCP.Font import Font_FontMgr, Font_FontAspect_Regular, Font_FontAspect_Bold
+    from OCP.TCollection import TCollection_AsciiString
+    digest = hashlib.sha256()
+    for path in (Path(__file__), Path(__file__).with_name("din_layout.py")): digest.update(path.read_bytes())
+    digest.update(cq.__version__.encode())
+    for aspect in (Font_FontAspect_Regular, Font_FontAspect_Bold):
+        font = Font_FontMgr.GetInstance_s().FindFont(TCollection_AsciiString(FONT), aspect)
+        path = Path(font.FontPath(aspect).ToCString()) if font is not None else None
+        if path and path.is_file(): digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+
+# ======================== batch booleans ==================================
+
+def _tool_shapes(tools):
+    # the shapes carried by a list of workplanes: every solid, but a compound (the glyphs of a text,
+    # the LED guides of a board) stays one tool, so the tool count does not grow with its members
+    shapes = []
+    for t in tools:
+        for v in t.vals():
+            kind = v.ShapeType() if hasattr(v, "ShapeType") else None
+            if kind == "Compound" and v.Solids(): shapes.append(v)
+            elif kind == "Solid": shapes.append(v)
+            elif kind is not None: shapes += v.Solids()
+    return shapes
+
+def _bbox_overlap(a, b):
+    a, b = a.BoundingBox(), b.BoundingBox()
+    return (a.xmin <= b.xmax and b.xmin <= a.xmax and a.ymin <= b.ymax and b.ymin <= a.ymax
+            and a.zmin <= b.zmax and b.zmin <= a.zmax)
+
+def chain_boolean(base, steps, profiler = None):
+    # the plain pairwise chain: one Workplane.union / cut per tool
+    profiler = profiler or Profiler(enabled=False)
+    for kind, tools in steps:
+        for name, tool in tools.items():
+            with profiler.stage(f"{kind} {name}") as st:
+                st.result = base = base.union(tool) if kind == "add" else base.cut(tool)
+    return base
+
+def batch_boolean(base, steps, profiler = None):
+    # steps: ("add" | "cut", {name: workplane}) in the order of the equivalent pairwise chain.
+    # A point ends up in the result if it is in the base or in an added tool, and in none of the
+    # cutouts that come after it. So the base is cut once by all cutouts, every added tool only by
+    # the (overlapping) cutouts that follow it, and everything is fused in one multi-argument fuse.
+    # This avoids re-solving every tool against an ever growing solid.
+    profiler = profiler or Profiler(enabled=False)
+    shape = base.findSolid()
+    cuts = [t for kind, tools in steps if kind == "cut" for t in _tool_shapes(tools.values())]
+    pieces, later = [], []
+    for kind, tools in reversed(steps):
+        if kind == "cut":
+            later = _tool_shapes(tools.values()) + later
+            continue
+        for name, tool in tools.items():
+            for a in _tool_shapes([tool]):
+                hits = [t for t in later if _bbox_overlap(a, t)]
+                if hits:
+                    with profiler.stage(f"trim {name}") as st: st.result = a = a.cut(*hits)
+                pieces.append(a)
+    if cuts:
+        with profiler.stage(f"cut {len(cuts)} tools") as st: st.result = shape = shape.cut(*cuts)
+    if pieces:
+        with profiler.stage(f"fuse {len(pieces)} tools") as st: st.result = shape = shape.fuse(*pieces)
+    with profiler.stage("clean") as st: st.result = shape = shape.clean()
+    return base.newObject([shape])
+
+
+# ======================== engraved text ===================================
+
+@lru_cache(maxsize=512)
+def glyph(txt, size, depth, font = FONT, kind = "regular", halign = "center"):
+    # text solid on the XY plane at the origin; every placement of the same string shares it
+    import cadquery as cq
+    return cq.Compound.makeText(txt, size, depth, font=font, kind=kind, halign=halign).clean()
+
+def engrave(wp, items, extra = ()):
+    # items: (x, y, txt, size, depth, kind, halign) in the coordinates of workplane wp;
+    # returns one compound of located glyphs (plus the extra shapes) instead of a chain of unions
+    import cadquery as cq
+    base = cq.Location(wp.plane)
+    shapes = [ glyph(txt, size, depth, kind=kind, halign=halign).moved(base * cq.Location(cq.Vector(x, y, 0)))
+               for (x, y, txt, size, depth, kind, halign) in items ]
+    return wp.newObject([cq.Compound.makeCompound(shapes + list(extra))])
+
+
+# output file names; {module}: this module's name, {config}: CONFIG_NAME, {part}: output name
+# or "assbly" / "compound" for the STEP files and "parts" for the 3MF file, {ext}: "stl", "step" or "3mf"
+FILENAME = "{module}_{config}_{part}.{ext}"
+FORMATS = ("stl", "step") # written by default; "3mf" adds one print-ready file of all pieces
+DETAILS = ("full", "draft")  # draft: no text, fillets, chamfers or tapers, plain boxes for the clip and the screw blocks
+
+STEP_PARTS = ("case", "bottom_wago_fix", "top_wago_fix", "lid", "clip")
+SMALL_PARTS = ("clip", "top_wago_fix", "bottom_wago_fix", "screw_block_clip2", "screw_block_clip3") # the small_parts compound, in order
+
+@dataclass
+class Enclosure:
+    config:      Config  # the resolved copy the parts are built from: placed boards, widened CASE_WIDTH, padded wago texts
+    config_hash: str     # of the config as passed in
+    parts:       dict    # name: workplane in build coordinates (case, lid, clip, top_wago_fix, bottom_wago_fix)
+    outputs:     dict    # name: shape as placed for printing, the content of the STL files (parts + small_parts)
+    files:       list    # paths written, empty without export
+    warnings:    list
+    rebuilt:     list    # build graph nodes evaluated by this build
+    seconds:     float   # of the build, without the export
+    cadquery:    str     # version
+    detail:      str = "full"
+    placement:   object = None # din_place.Placement of a config with a boards list
+    cache_hits:   int = 0 # parts this build loaded from the part cache
+    cache_misses: int = 0 # parts this build built and stored into it
+
+    # encoded on demand in memory (STEP goes through a temporary file)
+
+    def stl(self, name, tolerance: Tolerance | None = None) -> bytes:
+        return stl_bytes(self.outputs[name], tolerance)
+
+    def step(self, assembly: bool = False) -> bytes:
+        # the parts in build coordinates, as assembly or merged into one compound
+        return step_bytes([to_shape(self.parts[n]) for n in STEP_PARTS], assembly)
+
+    def printables(self, min_volume = 1.0):
+        # (part, shape) of every piece that goes on the print bed: case, lid and the members of small_parts;
+        # min_volume drops the placeholders of absent wago fixes
+        shapes = [("case", self.outputs["case"]), ("lid", self.outputs["lid"])] + list(zip(SMALL_PARTS, self.outputs["small_parts"]))
+        return [(part, s) for part, s in shapes if s.Volume() >= min_volume]
+
+    def threemf_items(self, names = None):
+        # the printables (default: all of them) as din_export.write_3mf items, named and tagged with config and part
+        name = self.config.CONFIG_NAME
+        return [(s, None, {"name": f"{name}/{part}", "config": name, "part": part})
+                for part, s in self.printables() if names is None or part in names]
+
+    def threemf(self, names = None, tolerance: Tolerance | None = None) -> bytes:
+        return threemf_bytes(self.threemf_items(names), tolerance, {"Title": self.config.CONFIG_NAME})
+
+    def interference(self, radius = 1.0, tolerance = 0.03):
+        # din_interference.Pair of every two assembled parts closer than radius (mm), interferences first
+        from din_interference import check_parts
+        return check_parts({n: to_shape(self.parts[n]) for n in STEP_PARTS}, radius, tolerance)
+
+    def export_jobs(self, output_dir = ".", filename: str = FILENAME, export_preset: str = "print",
+                    tolerances: dict[str, Tolerance] | None = None, formats = FORMATS):
+        # (path, kind, shapes, tolerance) of the files of the given formats, for din_export.export_all:
+        # stl: one per output, step: assembly and compound, 3mf: the printables
+        import cadquery as cq
+        def path(part, ext):
+            return str(Path(output_dir) / filename.format(module=Path(__file__).stem, config=self.config.CONFIG_NAME, part=part, ext=ext))
+        def tolerance(name): return (tolerances or {}).get(name, PRESETS[export_preset])
+        jobs = []
+        if "stl" in formats: jobs += [ (path(i, "stl"), "stl", [self.outputs[i]], tolerance(i)) for i in self.outputs ]
+        if "step" in formats:
+            # one set of shapes for both STEP files: the assembly keeps the parts apart, the compound merges them
+            parts = [to_shape(self.parts[n]) for n in STEP_PARTS]
+            jobs.append( (path("assbly", "step"), "assembly", parts, None) )
+            jobs.append( (path("compound", "step"), "step", [cq.Compound.makeCompound(parts)], None) )
+        if "3mf" in formats: jobs.append( (path("parts", "3mf"), "3mf", self.threemf_items(), PRESETS[export_preset]) )
+        return jobs
+
+    def write(self, output_dir = ".", filename: str = FILENAME, export_preset: str = "print",
+              tolerances: dict[str, Tolerance] | None = None, workers: int | None = None, profiler: Profiler | None = None,
+              formats = FORMATS):
+        # writes the files (creating output_dir) and returns their paths
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        self.files = export_all(self.export_jobs(output_dir, filename, export_preset, tolerances, formats), workers, profiler)
+        return self.files
+
+
+_BUILD_LOCK = threading.Lock() # one build at a time per process, see generate_enclosure
+
+def generate_enclosure(c: Config, batch_booleans: bool = True, cache: PartCache | None = None,
+                       export_preset: str = "print", tolerances: dict[str, Tolerance] | None = None, export_workers: int | None = None,
+                       graph: BuildGraph | None = None, profiler: Profiler | None = None, export: bool = True,
+                       output_dir = ".", filename: str = FILENAME, formats = FORMATS, detail: str = "full") -> Enclosure:
+    # graph: keep one BuildGraph between calls to only rebuild the sub-parts whose config fields changed
+    # export_preset: "preview" or "print" STL tessellation; tolerances overrides it per output
+    # ("case", "lid", "clip", "top_wago_fix", "bottom_wago_fix", "small_parts")
+    # profiler: records every node, boolean and export as a stage
+    # export=False builds without writing files; the placed output shapes are returned either way and
+    # result.stl(name) / result.step() / result.threemf() encode them on demand
+    # output_dir, filename: where the files go, see FILENAME for the fields of the template
+    # formats: any of "stl", "step", "3mf"
+    # detail: "full", or "draft" for quick previews while tuning a config (e.g. in cq-editor): every
+    # dimension that matters for the fit of boards, wagos, clip and lid is kept, see DETAILS; a draft is
+    # never written, its parts are not meant for printing
+    #
+    # Thread-safe, but not concurrent: c is not modified and no module state is written, yet one
+    # module-level lock serializes every build in the process, so threads calling this wait for
+    # each other and gain no throughput (cadquery's selector parser, pyparsing, is not thread-safe
+    # and OCCT holds the GIL anyway). Only the export runs outside the lock. Builds run in parallel
+    # only in separate processes, as din_batch and din_service do.
+    if detail not in DETAILS: raise ValueError(f"unknown detail {detail!r}, one of {', '.join(DETAILS)}")
+    graph = graph or BuildGraph() # one-off build, everything is evaluated
+    with _BUILD_LOCK:
+        result = _build_enclosure(c, batch_booleans, cache, graph, profiler or Profiler(enabled=False), detail)
+    if export and result.detail != "draft": result.write(output_dir, filename, export_preset, tolerances, export_workers, profiler, formats)
+    return result
+
+def _build_enclosure(source, batch_booleans, cache, graph, profiler, detail = "full"):
+    start = time.perf_counter()
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0) # the counters of a shared cache run on
+    with profiler.stage("import cadquery"):
+        import cadquery as cq
+    from cadquery.func import box
     print(cq.__version__)
-    global case, lid, clip, top_wago_fix, bottom_wago_fix
 
     # ============================ Sanity checks ===========================
         
+    c = thaw_config(source) # private copy, resolved below
+    warnings = []
+    def warning(msg):
+        print(f"Warning: {msg}")
+        warnings.append(msg)
+
+    placement = None
+    if c.boards is not None: # boards list: fill in board1..3 as din_place puts them
+        from din_place import place
+        placement = place(c)
+        c = placement.config
         
-    WAGO_POS_DEPTH_UPPER = c.board2.width+2*c.CASE_THICKNESS # from front of rail
-    WAGO_POS_DEPTH_LOWER = c.board3.width+2*c.CASE_THICKNESS # from front of rail
+    lay = layout(c)
+    WAGO_POS_DEPTH_UPPER = lay.WAGO_POS_DEPTH_UPPER # from front of rail
+    WAGO_POS_DEPTH_LOWER = lay.WAGO_POS_DEPTH_LOWER # from front of rail
         
         
-    if ((c.NR_WAGO_BOTTOM*c.WAGO_OFFSET + c.CASE_THICKNESS > c.CASE_WIDTH) or 
-        (c.NR_WAGO_TOP*c.WAGO_OFFSET + c.CASE_THICKNESS > c.CASE_WIDTH)):
-        print(f"Warning: extending case width to support more WAGO's")
-        c.CASE_WIDTH = max(c.NR_WAGO_BOTTOM, c.NR_WAGO_TOP)*c.WAGO_OFFSET + c.CASE_THICKNESS
+    if lay.CASE_WIDTH != c.CASE_WIDTH:
+        warning(f"extending case width to support more WAGO's")
+        c.CASE_WIDTH = lay.CASE_WIDTH
             
     if (len(c.WAGO_UPPER_TEXT) < c.NR_WAGO_TOP) or (len(c.WAGO_LOWER_TEXT) < c.NR_WAGO_BOTTOM):
-        print(f"Warning: please extend WAGO_UPPER_TEXT or WAGO_LOWER_TEXT lists")
+        warning(f"please extend WAGO_UPPER_TEXT or WAGO_LOWER_TEXT lists")
     while len(c.WAGO_UPPER_TEXT) < c.NR_WAGO_TOP:    c.WAGO_UPPER_TEXT.append("U") # Undefined
     while len(c.WAGO_LOWER_TEXT) < c.NR_WAGO_BOTTOM: c.WAGO_LOWER_TEXT.append("U") # Undefined
     
+    # ======================== build graph =====================================
+    # every sub-part is a node: fields are the Config/Board/Led values it reads, inputs the nodes it is built from
+    
+    graph.begin()
+    
+    def node(name, build, fields = (), inputs = (), extra = (), persist = False):
+        # persist: also keep the part in the on-disk cache (for the expensive ones)
+        return graph.node(c, name, build, fields, inputs, (_source_digest(), detail) + tuple(extra), cache if persist else None, profiler)
+    
+    draft = detail == "draft"
+    
+    CLIP_FIELDS   = ("CASE_WIDTH", "CASE_THICKNESS", "DIN_HEIGHT", "DIN_RAIL_LOWER")
+    INNER_FIELDS  = ("CASE_WIDTH", "CASE_THICKNESS", "DIN_HEIGHT", "board2.width", "board3.width", "WAGO_LIP_LENGTH", "DIN_DEEP_LOW", "DIN_DEEP_HIGH", "DIN_NARROW_HEIGHT")
+    OUTER_FIELDS  = INNER_FIELDS + ("DIN_RAIL_UPPER", "DIN_RAIL_LOWER")
+    SCREW_FIELDS  = ("CASE_WIDTH", "CASE_THICKNESS", "SCREW_LID_EXTRA", "SCREW_BLOCK_SIZE")
+    PLACE_FIELDS  = ("board2", "board3", "CASE_THICKNESS", "NR_WAGO_TOP", "NR_WAGO_BOTTOM", "WAGO_HEIGHT", "SCREW_BLOCK_SIZE", "DIN_HEIGHT", "WAGO_LIP_LENGTH") # screw positions
+    BOARD1_FIELDS = ("board1.width", "board1.length", "board1.thickness", "board1.mount_height", "CASE_WIDTH", "CASE_THICKNESS", "DIN_DEEP_HIGH", "DIN_HEIGHT", "WAGO_LIP_LENGTH")
+    LED_FIELDS    = BOARD1_FIELDS + ("board1.position", "board1.leds", "LIGHT_CARRIER_DIAM", "LIGHT_GUIDE_DIAMETER")
+    USB_FIELDS    = ("USB_WIDTH", "USB_HEIGHT")
+    def wago_fields(count): # a wago row and its fixation, count is "NR_WAGO_TOP" or "NR_WAGO_BOTTOM"
+        return (count, "board2.width" if count == "NR_WAGO_TOP" else "board3.width", "CASE_WIDTH", "CASE_THICKNESS", "DIN_HEIGHT",
+                "WAGO_HEIGHT", "WAGO_LENGTH", "WAGO_LIP_LENGTH", "WAGO_OFFSET", "WAGO_FIX_WIDTH")
+    
     
     # ======================== dummy cutout (or union) object ==================
     # at a harmless place
     
-    dummy_cutout = cq.Workplane("XY").box(0.1 , 0.1 , 0.1).translate((-0.1, c.DIN_HEIGHT/2 - 10, 5))
+    dummy_cutout = node("dummy", lambda: cq.Workplane("XY").box(0.1 , 0.1 , 0.1).translate((-0.1, c.DIN_HEIGHT/2 - 10, 5)), ("DIN_HEIGHT",))
+    
+    def text(wp, items, extra = ()): # engraved text, left out of a draft
+        return dummy_cutout if draft else engrave(wp, items, extra)
     
     # ======================== DIN rail clip ===================================
     
-    CLIP_GAP   = 0.1
     CLIP_WIDTH = c.CASE_WIDTH - 2*c.CASE_THICKNESS - 2*CLIP_GAP
-    CLIP_THICKNESS = 3.5
     CLIP_SLOT_DEPTH = CLIP_THICKNESS
     CLIP_HIDDEN_LENGTH = c.DIN_HEIGHT/2 - c.DIN_RAIL_LOWER + CLIP_SLOT_DEPTH
     CLIP_TOP_HEIGHT = 8
@@ -71,7 +324,9 @@ def generate_enclosure(c: Config):
     CLIP_SLOT_TAPER = 3
     
     
-    clip = ( cq.Workplane("front")
+    def build_clip():
+        if draft: clip = cq.Workplane("front").center(0, (CLIP_HIDDEN_LENGTH - CLIP_BASE_HEIGHT)/2).rect(CLIP_WIDTH, CLIP_HIDDEN_LENGTH + CLIP_BASE_HEIGHT).extrude(CLIP_THICKNESS)
+        else: clip = ( cq.Workplane("front")
         .moveTo(0, -CLIP_BASE_HEIGHT)
         .hLine(CLIP_WIDTH/2.0)
         .vLine(CLIP_LEG_LENGTH + CLIP_BASE_HEIGHT - 2*CLIP_LEG_RADIUS)
@@ -93,57 +348,60 @@ def generate_enclosure(c: Config):
         .faces(">Y").workplane()
         .center(0,  (CLIP_THICKNESS-CLIP_SLOT_WIDTH/2+0.18))
         .rect(CLIP_WIDTH+3, CLIP_SLOT_WIDTH)
-        .extrude(-CLIP_SLOT_DEPTH , combine='s', taper=CLIP_SLOT_TAPER)
-        .rotate((0, 0, 0), (0, 1, 0), 90)
-        .translate( (-(CLIP_THICKNESS + CLIP_GAP), -c.DIN_HEIGHT/2, c.CASE_WIDTH/2) )
-    )
+        .extrude(-CLIP_SLOT_DEPTH , combine='s', taper=CLIP_SLOT_TAPER) )
+        return ( clip.rotate((0, 0, 0), (0, 1, 0), 90)
+        .translate( (-(CLIP_THICKNESS + CLIP_GAP), -c.DIN_HEIGHT/2, c.CASE_WIDTH/2) ) )
+    clip = node("clip", build_clip, CLIP_FIELDS, persist=True)
     
     
     CLIP_CUTOUT_HEIGHT = c.DIN_HEIGHT/2 - c.DIN_RAIL_LOWER
-    clip_cutout = cq.Workplane("XY").box(CLIP_THICKNESS + 2*CLIP_GAP, CLIP_CUTOUT_HEIGHT, CLIP_WIDTH + 2*CLIP_GAP)
-    
-    clip_cutout = ( clip_cutout.faces("<X").workplane() 
+    def build_clip_cutout():
+        clip_cutout = cq.Workplane("XY").box(CLIP_THICKNESS + 2*CLIP_GAP, CLIP_CUTOUT_HEIGHT, CLIP_WIDTH + 2*CLIP_GAP)
+        
+        if not draft: clip_cutout = ( clip_cutout.faces("<X").workplane() 
           .center(-CLIP_CUTOUT_HEIGHT/2 + CLIP_UPPER_LOCK, -CLIP_WIDTH/2) #  mm below DIN rail space
-          .circle(CLIP_LEG_RADIUS+CLIP_GAP) # upper clip slot 1
-          .center(0, CLIP_WIDTH)
-          .circle(CLIP_LEG_RADIUS+CLIP_GAP) # uppor clip slot 2
-          .center(CLIP_LOCK_DISTANCE, 0)
-          .circle(CLIP_LEG_RADIUS+CLIP_GAP) # lower clip slot 1
-          .center(0, -CLIP_WIDTH)
-          .circle(CLIP_LEG_RADIUS+CLIP_GAP) # lower clip slot 2
-          .extrude(-CLIP_THICKNESS - 2*CLIP_GAP)
-          )
-    clip_cutout = clip_cutout.translate((-CLIP_THICKNESS/2-CLIP_GAP, -CLIP_CUTOUT_HEIGHT/2 -c.DIN_RAIL_LOWER, c.CASE_WIDTH/2) )
+              .circle(CLIP_LEG_RADIUS+CLIP_GAP) # upper clip slot 1
+              .center(0, CLIP_WIDTH)
+              .circle(CLIP_LEG_RADIUS+CLIP_GAP) # uppor clip slot 2
+              .center(CLIP_LOCK_DISTANCE, 0)
+              .circle(CLIP_LEG_RADIUS+CLIP_GAP) # lower clip slot 1
+              .center(0, -CLIP_WIDTH)
+              .circle(CLIP_LEG_RADIUS+CLIP_GAP) # lower clip slot 2
+              .extrude(-CLIP_THICKNESS - 2*CLIP_GAP)
+              )
+        return clip_cutout.translate((-CLIP_THICKNESS/2-CLIP_GAP, -CLIP_CUTOUT_HEIGHT/2 -c.DIN_RAIL_LOWER, c.CASE_WIDTH/2) )
+    clip_cutout = node("clip_cutout", build_clip_cutout, CLIP_FIELDS, persist=True)
     
     # ======================== wago fixation parts =================
     
-    WAGO_FIX_HEIGHT = 2.5
-    WAGO_FIX_EXTRUDE = 1.25
-    def wago_fix(count, x, y, z):
-        wago_221_fix    = cq.Workplane("front").box(c.CASE_WIDTH, c.WAGO_FIX_WIDTH, WAGO_FIX_HEIGHT).edges("#X").fillet(0.4)
+    def wago_fix(name, count_field, x, y, z):
+        count = getattr(c, count_field)
+        if count <= 0: return node(name, lambda: (dummy_cutout, dummy_cutout), inputs=("dummy",))
+        return node(name, lambda: build_wago_fix(count, x, y, z), wago_fields(count_field), persist=True)
+    def build_wago_fix(count, x, y, z):
+        wago_221_fix    = cq.Workplane("front").box(c.CASE_WIDTH, c.WAGO_FIX_WIDTH, WAGO_FIX_HEIGHT)
+        if not draft: wago_221_fix = wago_221_fix.edges("#X").fillet(0.4)
         wago_fix_cutout = cq.Workplane("front").box(c.CASE_WIDTH +4, c.WAGO_FIX_WIDTH+0.1, WAGO_FIX_HEIGHT+0.1)
-        wago_221_fix = wago_221_fix.center(-c.WAGO_OFFSET * (count - 1) / 2, 0).rect(4.0, 2.5).extrude(WAGO_FIX_EXTRUDE*2)
-        for i in range(1, count): wago_221_fix = wago_221_fix.center(c.WAGO_OFFSET, 0).rect(4.0, 2.5).extrude(WAGO_FIX_EXTRUDE*2)
+        tab = cq.Workplane("front").rect(4.0, 2.5).extrude(WAGO_FIX_EXTRUDE*2).val() # one tab per wago, placed as copies
+        tabs = [ tab.moved(cq.Location(cq.Vector(-c.WAGO_OFFSET * (count - 1) / 2 + i*c.WAGO_OFFSET, 0, 0))) for i in range(count) ]
+        wago_221_fix = wago_221_fix.union(cq.Workplane("front").newObject(tabs))
         wago_221_fix =    wago_221_fix.rotate((0, 0, 0), (0, 1, 0), -90).translate((x, y, z))
         wago_fix_cutout = wago_fix_cutout.rotate((0, 0, 0), (0, 1, 0), -90).translate((x, y, z))
         return wago_221_fix, wago_fix_cutout
     
-    if c.NR_WAGO_BOTTOM > 0:
-        bottom_wago_fix, bottom_wago_fix_cutout = wago_fix(c.NR_WAGO_BOTTOM,
+    bottom_wago_fix, bottom_wago_fix_cutout = wago_fix("bottom_wago_fix", "NR_WAGO_BOTTOM",
             WAGO_POS_DEPTH_LOWER + c.WAGO_HEIGHT + WAGO_FIX_HEIGHT/2+WAGO_FIX_EXTRUDE - WAGO_FIX_EXTRUDE,
             -c.DIN_HEIGHT/2 + c.WAGO_LIP_LENGTH +c.WAGO_FIX_WIDTH/2 + c.CASE_THICKNESS,
             c.CASE_WIDTH/2 )
-    else: bottom_wago_fix =  bottom_wago_fix_cutout = dummy_cutout
-    if c.NR_WAGO_TOP > 0:
-        top_wago_fix, top_wago_fix_cutout   = wago_fix(c.NR_WAGO_TOP,
+    top_wago_fix, top_wago_fix_cutout   = wago_fix("top_wago_fix", "NR_WAGO_TOP",
             WAGO_POS_DEPTH_UPPER + c.WAGO_HEIGHT + WAGO_FIX_HEIGHT/2+WAGO_FIX_EXTRUDE - WAGO_FIX_EXTRUDE,
             c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - c.WAGO_FIX_WIDTH/2 - c.CASE_THICKNESS,
             c.CASE_WIDTH/2 )
-    else: top_wago_fix = top_wago_fix_cutout = dummy_cutout
     
     # ====================== main case =========================
     
-    sketch_outer = ( cq.Sketch()
+    def make_sketch_outer():
+        sketch = ( cq.Sketch()
         .segment( (0, c.DIN_RAIL_UPPER),(-0.8, c.DIN_RAIL_UPPER) )
         .segment( (-3.2, c.DIN_RAIL_UPPER - 3.2) )
         .segment( (-5, c.DIN_RAIL_UPPER - 3.2) )
@@ -162,7 +420,9 @@ def generate_enclosure(c: Config):
         .segment( (-5, -c.DIN_RAIL_LOWER) )
         .segment( (0, -c.DIN_RAIL_LOWER) )
         .close()
-        .assemble(tag="outerface")
+        .assemble(tag="outerface") )
+        if draft: return sketch
+        return ( sketch
         .edges("|Z" and "<X", tag="outerface")
         .vertices()
         .fillet(0.5)
@@ -172,7 +432,8 @@ def generate_enclosure(c: Config):
         .clean()
         )
     
-    sketch_inner = ( cq.Sketch()
+    def make_sketch_inner():
+        sketch = ( cq.Sketch()
         .segment( (c.CASE_THICKNESS, 0), (c.CASE_THICKNESS, c.DIN_HEIGHT/2 - c.CASE_THICKNESS) )
         .segment( (c.board2.width+c.CASE_THICKNESS, c.DIN_HEIGHT/2-c.CASE_THICKNESS))
         .segment( (c.board2.width+c.CASE_THICKNESS, c.DIN_HEIGHT/2-c.WAGO_LIP_LENGTH-c.CASE_THICKNESS) )
@@ -187,26 +448,48 @@ def generate_enclosure(c: Config):
         .segment( (c.board3.width+c.CASE_THICKNESS,-c.DIN_HEIGHT/2+c.CASE_THICKNESS))
         .segment( ( c.CASE_THICKNESS, -c.DIN_HEIGHT/2 + c.CASE_THICKNESS) )
         .close()                
-        .assemble(tag="innerface")
+        .assemble(tag="innerface") )
+        if draft: return sketch
+        return ( sketch
         .vertices()
         .fillet(0.6)
         .clean()
         )
     
-    outer  = cq.Workplane("XY").placeSketch(sketch_outer).extrude(c.CASE_WIDTH)
-    inner = cq.Workplane("XY",( 0.0, 0.0, c.CASE_WIDTH)).placeSketch(sketch_inner).extrude(-(c.CASE_WIDTH-c.CASE_THICKNESS))
-    
-    def case_screw_block(x, y):
+    # walls that run from the floor to the lid are composed into the cavity profile, so the shell
+    # comes with them; only the features that are truly 3D are added or cut as solids afterwards
+    def wall_rects(): # (x, y, width, height) of the cross section
+        rects = []
+        if c.NR_WAGO_TOP > 0:    rects.append((WAGO_POS_DEPTH_UPPER - c.CASE_THICKNESS/2,  c.DIN_HEIGHT/2-c.WAGO_LENGTH/2, c.CASE_THICKNESS, c.WAGO_LENGTH)) # upper wago support
+        if c.NR_WAGO_BOTTOM > 0: rects.append((WAGO_POS_DEPTH_LOWER - c.CASE_THICKNESS/2, -c.DIN_HEIGHT/2+c.WAGO_LENGTH/2, c.CASE_THICKNESS, c.WAGO_LENGTH)) # lower wago support
+        return rects
+    
+    def make_sketch_cavity():
+        sketch = make_sketch_inner().reset()
+        for (x, y, w, h) in wall_rects(): sketch = sketch.push([(x, y)]).rect(w, h, mode="s").reset()
+        return sketch.clean()
+    
+    CAVITY_FIELDS = INNER_FIELDS + ("NR_WAGO_TOP", "NR_WAGO_BOTTOM", "WAGO_LENGTH")
+    outer = node("outer", lambda: cq.Workplane("XY").placeSketch(make_sketch_outer()).extrude(c.CASE_WIDTH), OUTER_FIELDS, persist=True)
+    inner = node("inner", lambda: cq.Workplane("XY",( 0.0, 0.0, c.CASE_WIDTH)).placeSketch(make_sketch_cavity()).extrude(-(c.CASE_WIDTH-c.CASE_THICKNESS)), CAVITY_FIELDS, persist=True)
+    
+    # the screw blocks are built once at x = y = 0 and placed at every screw position as located copies
+    def case_screw_block():
         z = c.CASE_WIDTH-2*c.CASE_THICKNESS-c.SCREW_LID_EXTRA
-        return ( cq.Workplane("XY").box(c.SCREW_BLOCK_SIZE, c.SCREW_BLOCK_SIZE, z).faces(">Z").cboreHole(c.SCREW_HOLE_DIAM, c.SCREW_INSERT_DIAM, c.SCREW_INSERT_DEPTH, c.SCREW_HOLE_DEPTH)
-        .translate((x, y , z/2+c.CASE_THICKNESS))
-        .edges("|Z").fillet(1) )
+        if draft: return node("case_screw_block", lambda: cq.Workplane("XY").box(c.SCREW_BLOCK_SIZE, c.SCREW_BLOCK_SIZE, z).translate((0, 0 , z/2+c.CASE_THICKNESS)), SCREW_FIELDS)
+        return node("case_screw_block", lambda: ( cq.Workplane("XY").box(c.SCREW_BLOCK_SIZE, c.SCREW_BLOCK_SIZE, z).faces(">Z").cboreHole(c.SCREW_HOLE_DIAM, c.SCREW_INSERT_DIAM, c.SCREW_INSERT_DEPTH, c.SCREW_HOLE_DEPTH)
+        .translate((0, 0 , z/2+c.CASE_THICKNESS))
+        .edges("|Z").fillet(1) ), SCREW_FIELDS + ("SCREW_HOLE_DIAM", "SCREW_INSERT_DIAM", "SCREW_INSERT_DEPTH", "SCREW_HOLE_DEPTH"), persist=True)
     
-    def lid_screw_block(x, y):
+    def lid_screw_block():
         z = c.CASE_THICKNESS + c.SCREW_LID_EXTRA
-        return ( cq.Workplane("XY").box(c.SCREW_BLOCK_SIZE, c.SCREW_BLOCK_SIZE, z)
-        .translate((x, y , c.CASE_WIDTH - z/2))
-        .edges("|Z").fillet(1) )
+        block = lambda: cq.Workplane("XY").box(c.SCREW_BLOCK_SIZE, c.SCREW_BLOCK_SIZE, z).translate((0, 0 , c.CASE_WIDTH - z/2))
+        if draft: return node("lid_screw_block", block, SCREW_FIELDS)
+        return node("lid_screw_block", lambda: block().edges("|Z").fillet(1), SCREW_FIELDS, persist=True)
+    
+    def placed(prototype, positions):
+        shape = prototype.val()
+        return [ cq.Workplane("XY").newObject([shape.moved(cq.Location(cq.Vector(x, y, 0)))]) for (x, y,) in positions ]
     
     def screw_block_clip(board, x, y):
         z = c.CASE_WIDTH-2*c.CASE_THICKNESS-c.SCREW_LID_EXTRA-board.mount_height-board.thickness-1.5
@@ -230,61 +513,43 @@ def generate_enclosure(c: Config):
         if rotate: fix = fix.rotate((centerX+c.BOARD_FIX_WIDTH/2, centerY, 0), (centerX+c.BOARD_FIX_WIDTH/2, centerY, 1), 180)
         return fix
     
-    board_fixes = ( board_fix(c.board2, c.board2.width + c.CASE_THICKNESS -3-c.board2.jst_extrawidth_right,  c.DIN_HEIGHT/2-c.CASE_THICKNESS-c.board2.length, False)
+    board_fixes = node("board_fixes", lambda: board_fix(c.board2, c.board2.width + c.CASE_THICKNESS -3-c.board2.jst_extrawidth_right,  c.DIN_HEIGHT/2-c.CASE_THICKNESS-c.board2.length, False)
                     .union(board_fix(c.board2, c.CASE_THICKNESS +3+c.board2.jst_extrawidth_left,  c.DIN_HEIGHT/2-c.CASE_THICKNESS-c.board2.length, False))
                     .union(board_fix(c.board3, c.board3.width + c.CASE_THICKNESS -3+c.board3.jst_extrawidth_right, -c.DIN_HEIGHT/2+c.CASE_THICKNESS+c.board3.length, True))
-                    .union(board_fix(c.board3, c.CASE_THICKNESS +3+c.board3.jst_extrawidth_left, -c.DIN_HEIGHT/2+c.CASE_THICKNESS+c.board3.length, True))
-                  )
-    if c.NR_WAGO_TOP >0:
-        wago_support_upper = ( cq.Workplane("XY").box(c.CASE_THICKNESS, c.WAGO_LENGTH, c.CASE_WIDTH-2*c.CASE_THICKNESS)
-            .translate((WAGO_POS_DEPTH_UPPER - c.CASE_THICKNESS/2, c.DIN_HEIGHT/2-c.WAGO_LENGTH/2 , c.CASE_WIDTH/2)) )
-    else: wago_support_upper = dummy_cutout
-    if c.NR_WAGO_BOTTOM >0:
-        wago_support_lower = ( cq.Workplane("XY").box(c.CASE_THICKNESS, c.WAGO_LENGTH, c.CASE_WIDTH-2*c.CASE_THICKNESS)
-            .translate((WAGO_POS_DEPTH_LOWER - c.CASE_THICKNESS/2, -c.DIN_HEIGHT/2+c.WAGO_LENGTH/2 , c.CASE_WIDTH/2)) )
-    else: wago_support_lower = dummy_cutout
-    
-    if c.NR_WAGO_TOP == 0: wago_height_t = 0 
-    else: wago_height_t = c.WAGO_HEIGHT + WAGO_FIX_HEIGHT
-    if c.NR_WAGO_BOTTOM == 0: wago_height_b = 0 
-    else: wago_height_b = c.WAGO_HEIGHT + WAGO_FIX_HEIGHT
-    screw_positions = [ 
-               (WAGO_POS_DEPTH_UPPER + wago_height_t + c.SCREW_BLOCK_SIZE/2,  c.DIN_HEIGHT/2-c.WAGO_LIP_LENGTH - c.CASE_THICKNESS - c.SCREW_BLOCK_SIZE/2, ),
-               (WAGO_POS_DEPTH_LOWER + wago_height_b + c.SCREW_BLOCK_SIZE/2, -c.DIN_HEIGHT/2+c.WAGO_LIP_LENGTH + c.CASE_THICKNESS + c.SCREW_BLOCK_SIZE/2, ),
-               (c.board2.width/2 + c.CASE_THICKNESS, c.DIN_HEIGHT/2-c.CASE_THICKNESS-c.board2.length - c.SCREW_BLOCK_SIZE/2, ),
-               (c.board3.width/2 + c.CASE_THICKNESS, -c.DIN_HEIGHT/2+c.CASE_THICKNESS+c.board3.length + c.SCREW_BLOCK_SIZE/2,),
-        ]
-    
-    case_screw_blocks = []
-    lid_screw_blocks  = []
-    for (x, y,) in screw_positions: case_screw_blocks.append(case_screw_block(x, y))
-    for (x, y,) in screw_positions: lid_screw_blocks.append(lid_screw_block(x, y))
+                    .union(board_fix(c.board3, c.CASE_THICKNESS +3+c.board3.jst_extrawidth_left, -c.DIN_HEIGHT/2+c.CASE_THICKNESS+c.board3.length, True)),
+                  ("board2", "board3", "CASE_THICKNESS", "DIN_HEIGHT", "BOARD_FIX_WIDTH") )
+    
+    screw_positions = lay.screw_positions
+    
+    case_screw_block_proto = case_screw_block()
+    lid_screw_block_proto  = lid_screw_block()
+    case_screw_blocks = node("case_screw_blocks", lambda: placed(case_screw_block_proto, screw_positions), PLACE_FIELDS, ("case_screw_block",))
+    lid_screw_blocks  = node("lid_screw_blocks", lambda: placed(lid_screw_block_proto, screw_positions), PLACE_FIELDS, ("lid_screw_block",))
     
     screw_block_clip2 = screw_block_clip(c.board2, 0, -20)
     screw_block_clip3 = screw_block_clip(c.board3, 0, -30)
     
     
     
-    if c.NR_WAGO_TOP > 0:
-        wago_upper_cutout = cq.Workplane("XY", (WAGO_POS_DEPTH_UPPER + c.WAGO_HEIGHT/2, c.DIN_HEIGHT/2-c.WAGO_LENGTH/2 , c.CASE_WIDTH/2)).box(c.WAGO_HEIGHT, c.WAGO_LENGTH, c.WAGO_OFFSET*c.NR_WAGO_TOP)
-        wago_upper_lid_addon = cq.Workplane("XY", (WAGO_POS_DEPTH_UPPER + c.WAGO_HEIGHT/2, c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - c.CASE_THICKNESS/2 , c.CASE_WIDTH/2 + 0*c.CASE_THICKNESS + c.NR_WAGO_TOP*c.WAGO_OFFSET/2)).box(c.WAGO_HEIGHT, c.CASE_THICKNESS, c.CASE_WIDTH - c.NR_WAGO_TOP*c.WAGO_OFFSET)
-    else: 
-        wago_upper_cutout = dummy_cutout
-        wago_upper_lid_addon = dummy_cutout
-    if c.NR_WAGO_BOTTOM > 0:
-        wago_lower_cutout = cq.Workplane("XY", (WAGO_POS_DEPTH_LOWER + c.WAGO_HEIGHT/2, -c.DIN_HEIGHT/2+c.WAGO_LENGTH/2 , c.CASE_WIDTH/2)).box(c.WAGO_HEIGHT, c.WAGO_LENGTH, c.WAGO_OFFSET*c.NR_WAGO_BOTTOM)
-        wago_lower_lid_addon = cq.Workplane("XY", (WAGO_POS_DEPTH_LOWER + c.WAGO_HEIGHT/2, -c.DIN_HEIGHT/2 + c.WAGO_LIP_LENGTH + c.CASE_THICKNESS/2 , c.CASE_WIDTH/2 + 0*c.CASE_THICKNESS + c.NR_WAGO_BOTTOM*c.WAGO_OFFSET/2)).box(c.WAGO_HEIGHT, c.CASE_THICKNESS, c.CASE_WIDTH - c.NR_WAGO_BOTTOM*c.WAGO_OFFSET)
-    else: 
-        wago_lower_cutout = dummy_cutout
-        wago_lower_lid_addon = dummy_cutout
-    
-    b1_carrier_height = c.CASE_WIDTH - c.board1.width - c.CASE_THICKNESS
-    if b1_carrier_height>0:
-        board1_carrier = cq.Workplane("XY", (c.DIN_DEEP_HIGH-c.board1.mount_height, c.DIN_HEIGHT/2 -c.WAGO_LIP_LENGTH -c.board1.length/2 -c.CASE_THICKNESS/2, c.CASE_THICKNESS + b1_carrier_height/2)).box(c.board1.thickness+3, c.board1.length + c.CASE_THICKNESS, b1_carrier_height)
-    else: board1_carrier = dummy_cutout
+    def build_wago_upper():
+        if c.NR_WAGO_TOP <= 0: return dummy_cutout, dummy_cutout
+        return (cq.Workplane("XY", (WAGO_POS_DEPTH_UPPER + c.WAGO_HEIGHT/2, c.DIN_HEIGHT/2-c.WAGO_LENGTH/2 , c.CASE_WIDTH/2)).box(c.WAGO_HEIGHT, c.WAGO_LENGTH, c.WAGO_OFFSET*c.NR_WAGO_TOP),
+                cq.Workplane("XY", (WAGO_POS_DEPTH_UPPER + c.WAGO_HEIGHT/2, c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - c.CASE_THICKNESS/2 , c.CASE_WIDTH/2 + 0*c.CASE_THICKNESS + c.NR_WAGO_TOP*c.WAGO_OFFSET/2)).box(c.WAGO_HEIGHT, c.CASE_THICKNESS, c.CASE_WIDTH - c.NR_WAGO_TOP*c.WAGO_OFFSET))
+    def build_wago_lower():
+        if c.NR_WAGO_BOTTOM <= 0: return dummy_cutout, dummy_cutout
+        return (cq.Workplane("XY", (WAGO_POS_DEPTH_LOWER + c.WAGO_HEIGHT/2, -c.DIN_HEIGHT/2+c.WAGO_LENGTH/2 , c.CASE_WIDTH/2)).box(c.WAGO_HEIGHT, c.WAGO_LENGTH, c.WAGO_OFFSET*c.NR_WAGO_BOTTOM),
+                cq.Workplane("XY", (WAGO_POS_DEPTH_LOWER + c.WAGO_HEIGHT/2, -c.DIN_HEIGHT/2 + c.WAGO_LIP_LENGTH + c.CASE_THICKNESS/2 , c.CASE_WIDTH/2 + 0*c.CASE_THICKNESS + c.NR_WAGO_BOTTOM*c.WAGO_OFFSET/2)).box(c.WAGO_HEIGHT, c.CASE_THICKNESS, c.CASE_WIDTH - c.NR_WAGO_BOTTOM*c.WAGO_OFFSET))
+    wago_upper_cutout, wago_upper_lid_addon = node("wago_upper", build_wago_upper, wago_fields("NR_WAGO_TOP"), ("dummy",))
+    wago_lower_cutout, wago_lower_lid_addon = node("wago_lower", build_wago_lower, wago_fields("NR_WAGO_BOTTOM"), ("dummy",))
     
-    board1_carrier = board1_carrier.union(cq.Workplane("XY", (c.DIN_DEEP_HIGH-c.board1.mount_height + c.board1.thickness/2 , c.DIN_HEIGHT/2 -c.WAGO_LIP_LENGTH -c.board1.length-c.CASE_THICKNESS/2 -0, c.CASE_WIDTH/2+b1_carrier_height/2)).box(c.CASE_THICKNESS+2, c.CASE_THICKNESS, c.board1.width-c.CASE_THICKNESS/2))
-    board1_cutout = cq.Workplane("XY", (c.DIN_DEEP_HIGH-c.board1.mount_height,c.DIN_HEIGHT/2 -c.WAGO_LIP_LENGTH -c.board1.length/2 -c.CASE_THICKNESS/2, c.CASE_WIDTH/2+b1_carrier_height/2)).box(c.board1.thickness, c.board1.length, c.board1.width)
+    b1_carrier_height = lay.b1_carrier_height
+    def build_board1_carrier():
+        if b1_carrier_height>0:
+            board1_carrier = cq.Workplane("XY", (c.DIN_DEEP_HIGH-c.board1.mount_height, c.DIN_HEIGHT/2 -c.WAGO_LIP_LENGTH -c.board1.length/2 -c.CASE_THICKNESS/2, c.CASE_THICKNESS + b1_carrier_height/2)).box(c.board1.thickness+3, c.board1.length + c.CASE_THICKNESS, b1_carrier_height)
+        else: board1_carrier = dummy_cutout
+        return board1_carrier.union(cq.Workplane("XY", (c.DIN_DEEP_HIGH-c.board1.mount_height + c.board1.thickness/2 , c.DIN_HEIGHT/2 -c.WAGO_LIP_LENGTH -c.board1.length-c.CASE_THICKNESS/2 -0, c.CASE_WIDTH/2+b1_carrier_height/2)).box(c.CASE_THICKNESS+2, c.CASE_THICKNESS, c.board1.width-c.CASE_THICKNESS/2))
+    board1_carrier = node("board1_carrier", build_board1_carrier, BOARD1_FIELDS, ("dummy",))
+    board1_cutout = node("board1_cutout", lambda: cq.Workplane("XY", (c.DIN_DEEP_HIGH-c.board1.mount_height,c.DIN_HEIGHT/2 -c.WAGO_LIP_LENGTH -c.board1.length/2 -c.CASE_THICKNESS/2, c.CASE_WIDTH/2+b1_carrier_height/2)).box(c.board1.thickness, c.board1.length, c.board1.width), BOARD1_FIELDS)
     
     def usb_cutout(workplane, x, y, z, extrude):
         return ( cq.Workplane(workplane, (x, y, z))
@@ -295,115 +560,155 @@ def generate_enclosure(c: Config):
             .threePointArc((-c.USB_WIDTH/2, 0), (-c.USB_WIDTH/2 + c.USB_HEIGHT/2, +c.USB_HEIGHT/2))
             .hLine(c.USB_WIDTH/2 - c.USB_HEIGHT/2)
             .close()
-            .extrude(extrude, taper = -30) )
+            .extrude(extrude, taper = 0 if draft else -USB_TAPER) )
     
     
-    if c.board1.usb_height is None: usb_front_cutout = dummy_cutout
-    else: usb_front_cutout = usb_cutout("ZX", c.DIN_DEEP_HIGH + c.board1.usb_height + c.board1.thickness/2 - c.board1.mount_height, c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH, c.CASE_WIDTH/2+b1_carrier_height/2 - c.board1.usb_offset, -c.CASE_THICKNESS)
-    if c.board2.usb_height is None: usb_upper_cutout = dummy_cutout
-    else: usb_upper_cutout = usb_cutout("XZ", c.CASE_THICKNESS+c.board2.width/2+c.board2.usb_offset,  c.DIN_HEIGHT/2, c.CASE_THICKNESS+c.board2.usb_height+c.board2.mount_height+c.board2.thickness/2, c.CASE_THICKNESS )
-    if c.board3.usb_height is None: usb_lower_cutout = dummy_cutout
-    else: usb_lower_cutout = usb_cutout("XZ",c.CASE_THICKNESS+c.board3.width/2+c.board3.usb_offset, -c.DIN_HEIGHT/2, c.CASE_THICKNESS+c.board3.usb_height+c.board3.mount_height+c.board3.thickness/2, -c.CASE_THICKNESS)
+    def build_usb_front():
+        if c.board1.usb_height is None: return dummy_cutout
+        return usb_cutout("ZX", c.DIN_DEEP_HIGH + c.board1.usb_height + c.board1.thickness/2 - c.board1.mount_height, c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH, c.CASE_WIDTH/2+b1_carrier_height/2 - c.board1.usb_offset, -c.CASE_THICKNESS)
+    def build_usb_upper():
+        if c.board2.usb_height is None: return dummy_cutout
+        return usb_cutout("XZ", c.CASE_THICKNESS+c.board2.width/2+c.board2.usb_offset,  c.DIN_HEIGHT/2, c.CASE_THICKNESS+c.board2.usb_height+c.board2.mount_height+c.board2.thickness/2, c.CASE_THICKNESS )
+    def build_usb_lower():
+        if c.board3.usb_height is None: return dummy_cutout
+        return usb_cutout("XZ",c.CASE_THICKNESS+c.board3.width/2+c.board3.usb_offset, -c.DIN_HEIGHT/2, c.CASE_THICKNESS+c.board3.usb_height+c.board3.mount_height+c.board3.thickness/2, -c.CASE_THICKNESS)
+    usb_front_cutout = node("usb_front_cutout", build_usb_front, BOARD1_FIELDS + ("board1.usb_height", "board1.usb_offset") + USB_FIELDS, ("dummy",))
+    usb_upper_cutout = node("usb_upper_cutout", build_usb_upper, ("board2", "CASE_THICKNESS", "DIN_HEIGHT") + USB_FIELDS, ("dummy",))
+    usb_lower_cutout = node("usb_lower_cutout", build_usb_lower, ("board3", "CASE_THICKNESS", "DIN_HEIGHT") + USB_FIELDS, ("dummy",))
     
     
     
-    CARRIER_X = 7
-    CARRIER_Y = 2
-    board2_carriers =  ( cq.Workplane("XY", (0, -c.CASE_THICKNESS, c.CASE_THICKNESS))
+    board2_carriers = node("board2_carriers", lambda: cq.Workplane("XY", (0, -c.CASE_THICKNESS, c.CASE_THICKNESS))
             .pushPoints([ (c.CASE_THICKNESS + c.board2.width/2 + c.board2.usb_offset, c.DIN_HEIGHT/2 -CARRIER_Y/2),
                           (c.CASE_THICKNESS + c.board2.width/2, c.DIN_HEIGHT/2 -c.board2.length+CARRIER_Y/2) ])
             .rect(CARRIER_X, CARRIER_Y)
-            .extrude(c.board2.mount_height) )
-    board3_carriers = ( cq.Workplane("XY", (0, +c.CASE_THICKNESS, c.CASE_THICKNESS))
+            .extrude(c.board2.mount_height), ("board2", "CASE_THICKNESS", "DIN_HEIGHT") )
+    board3_carriers = node("board3_carriers", lambda: cq.Workplane("XY", (0, +c.CASE_THICKNESS, c.CASE_THICKNESS))
             .pushPoints( [(c.CASE_THICKNESS + c.board3.width/2 + c.board3.usb_offset, -c.DIN_HEIGHT/2 + CARRIER_Y/2 ),
                        (c.CASE_THICKNESS + c.board3.width/2, -c.DIN_HEIGHT/2 +c.board3.length -CARRIER_Y/2) ])
             .rect(CARRIER_X, CARRIER_Y)
-            .extrude(c.board3.mount_height) )
-    
-    def ledcarrier(board):
-        if board.position == "front": # currently only supported case
-            carrier = cq.Workplane("ZY", (c.DIN_DEEP_HIGH, c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - c.CASE_THICKNESS/2 - board.length, c.CASE_WIDTH - c.CASE_THICKNESS/2,)).transformed(rotate = cq.Vector(0, 180, 0))
-            for led in board.leds:
-                #c1 = carrier.moveTo((c.CASE_WIDTH-c.CASE_THICKNESS)/2, led.y).rect(c.CASE_WIDTH-2*c.CASE_THICKNESS, c.LIGHT_CARRIER_DIAM).extrude(-board.mount_height +4) 
-                cr = carrier.moveTo(led.x, led.y).rect(c.LIGHT_CARRIER_DIAM, c.LIGHT_CARRIER_DIAM).extrude(-board.mount_height + board.thickness/2+0.4) # 0.4: dont touch the led'
-                carrier = carrier.union(cr)
-            return carrier
-    
-    
-    def ledcutout(board):
-        if board.position == "front": # currently only supported case
-            carrier = cq.Workplane("ZY", (c.DIN_DEEP_HIGH, c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - c.CASE_THICKNESS/2 - board.length, c.CASE_WIDTH - c.CASE_THICKNESS/2,)).transformed(rotate = cq.Vector(0, 180, 0))
-            lidwp   = cq.Workplane("ZY", (c.DIN_DEEP_HIGH, c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - c.CASE_THICKNESS/2 - board.length, c.CASE_WIDTH - c.CASE_THICKNESS/2,)).transformed(rotate = cq.Vector(0, 180, 0))
-            txtwp   = cq.Workplane("ZY", (c.DIN_DEEP_HIGH, c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - c.CASE_THICKNESS/2 - board.length, c.CASE_WIDTH - c.CASE_THICKNESS/2,)).transformed(rotate = cq.Vector(0, 180, 0))
-            txt = txtwp.union(dummy_cutout)
-            lid = lidwp
-            for led in board.leds:
-                cr  = carrier.moveTo(led.x, led.y).circle(c.LIGHT_GUIDE_DIAMETER/2).extrude(-board.mount_height + 0.2)
-                cl = carrier.moveTo(led.x, led.y).rect(c.LIGHT_CARRIER_DIAM+0.1, c.LIGHT_CARRIER_DIAM+0.25 ).extrude(-board.mount_height -0.2 )
-                carrier = carrier.union(cr)
-                lid     = lid.union(cl)
-                if led.txt: txt     = txt.union(txtwp.center(led.x, led.y+2.7).text(led.txt, 2.7, -0.3))
+            .extrude(c.board3.mount_height), ("board3", "CASE_THICKNESS", "DIN_HEIGHT") )
+    
+    def led_fields(which):
+        if which == "board1": return LED_FIELDS
+        return (which, "CASE_WIDTH", "CASE_THICKNESS", "DIN_HEIGHT", "LIGHT_CARRIER_DIAM", "LIGHT_GUIDE_DIAMETER")
+    
+    def ledcarrier(which):
+        return node(f"{which}_ledcarrier", lambda: build_ledcarrier(getattr(c, which)), led_fields(which), ("dummy",), persist=True)
+    
+    def ledcutout(which):
+        return node(f"{which}_ledcutout", lambda: build_ledcutout(getattr(c, which)), led_fields(which), ("dummy",), persist=True)
+    
+    # every LED feature is one sketch (fused in 2D) and one extrude, the labels one compound
+    def led_workplane(board):
+        if board.position in ("top", "bottom"): return cq.Workplane("XY", (0, 0, c.CASE_WIDTH)) # the outside of the lid
+        return cq.Workplane("ZY", (c.DIN_DEEP_HIGH, c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - c.CASE_THICKNESS/2 - board.length, c.CASE_WIDTH - c.CASE_THICKNESS/2,)).transformed(rotate = cq.Vector(0, 180, 0))
+    
+    def led_points(board):
+        t = c.CASE_THICKNESS
+        if board.position == "top":    return [(t + led.x, c.DIN_HEIGHT/2 - t - board.length + led.y) for led in board.leds]
+        if board.position == "bottom": return [(t + board.width - led.x, -c.DIN_HEIGHT/2 + t + board.length - led.y) for led in board.leds] # turned by 180 degrees
+        return [(led.x, led.y) for led in board.leds]
+    
+    def led_sketch(board, shape, *size):
+        return getattr(cq.Sketch().push(led_points(board)), shape)(*size)
+    
+    def build_ledcarrier(board):
+        # without LEDs the dummy, which the dummy in the LED cutouts and labels takes away again
+        carrier = led_workplane(board)
+        if not board.leds: return dummy_cutout
+        if board.position == "front":
+            #c1 = carrier.moveTo((c.CASE_WIDTH-c.CASE_THICKNESS)/2, led.y).rect(c.CASE_WIDTH-2*c.CASE_THICKNESS, c.LIGHT_CARRIER_DIAM).extrude(-board.mount_height +4) 
+            return carrier.placeSketch(led_sketch(board, "rect", c.LIGHT_CARRIER_DIAM, c.LIGHT_CARRIER_DIAM)).extrude(-board.mount_height + board.thickness/2+0.4) # 0.4: dont touch the led'
+        # top / bottom: a tube from the lid down to just above the led
+        depth = c.CASE_WIDTH - c.CASE_THICKNESS - (c.CASE_THICKNESS + board.mount_height + board.thickness + 0.4)
+        if depth <= 0: return dummy_cutout # the board is right below the lid
+        return carrier.workplane(offset = -c.CASE_THICKNESS/2).placeSketch(led_sketch(board, "rect", c.LIGHT_CARRIER_DIAM, c.LIGHT_CARRIER_DIAM)).extrude(-depth - c.CASE_THICKNESS/2)
+    
+    
+    def build_ledcutout(board):
+        # (cut from the case, cut from the lid, labels); a front board shines through the case, a top or bottom board through the lid
+        labels = [ (x, y+2.7, led.txt, 2.7, -0.3, "regular", "center") for (x, y), led in zip(led_points(board) if board.leds else [], board.leds or []) if led.txt ]
+        txt = text(led_workplane(board), labels, dummy_cutout.vals())
+        if not board.leds: return (dummy_cutout, dummy_cutout, txt)
+        if board.position == "front":
+            carrier = led_workplane(board).placeSketch(led_sketch(board, "circle", c.LIGHT_GUIDE_DIAMETER/2)).extrude(-board.mount_height + 0.2)
+            lid     = led_workplane(board).placeSketch(led_sketch(board, "rect", c.LIGHT_CARRIER_DIAM+0.1, c.LIGHT_CARRIER_DIAM+0.25)).extrude(-board.mount_height -0.2 )
             return (carrier, lid, txt) #carrier.union(txt)
+        holes = led_workplane(board).placeSketch(led_sketch(board, "circle", c.LIGHT_GUIDE_DIAMETER/2)).extrude(-(c.CASE_WIDTH - c.CASE_THICKNESS - board.mount_height - board.thickness - 0.2))
+        return (dummy_cutout, holes, txt)
     
-    board1_ledcarrier = ledcarrier(c.board1)
-    (case_ledcutout, lid_ledcutout, led_txtcutout)  = ledcutout(c.board1)
+    board1_ledcarrier = ledcarrier("board1")
+    (case_ledcutout, lid_ledcutout, led_txtcutout)  = ledcutout("board1")
+    board2_ledcarrier, board3_ledcarrier = ledcarrier("board2"), ledcarrier("board3")
+    board2_ledcutout,  board3_ledcutout  = ledcutout("board2"),  ledcutout("board3")
     
     # ========================== case text ======================================
     
-    text_brand  = cq.Workplane("YX").center(0,12).text(c.BRAND, 8, -0.3)
-    if c.MODULE_NAME: text_name = cq.Workplane("YZ", (c.DIN_DEEP_HIGH, -c.DIN_NARROW_HEIGHT/2+2.5, 5)).text(c.MODULE_NAME, 6, -0.3, kind="bold", halign="left")
-    else: text_name = dummy_cutout
+    text_brand  = node("text_brand", lambda: text(cq.Workplane("YX"), [(0, 12, c.BRAND, 8, -0.3, "regular", "center")]), ("BRAND",), ("dummy",), persist=True)
+    def build_text_name():
+        if not c.MODULE_NAME: return dummy_cutout
+        return text(cq.Workplane("YZ", (c.DIN_DEEP_HIGH, -c.DIN_NARROW_HEIGHT/2+2.5, 5)), [(0, 0, c.MODULE_NAME, 6, -0.3, "bold", "left")])
+    text_name = node("text_name", build_text_name, ("MODULE_NAME", "DIN_DEEP_HIGH", "DIN_NARROW_HEIGHT"), ("dummy",), persist=True)
     
     #text_upper = case.faces("<X[2]").workplane().transformed(rotate=(0, 0, -90))
     
-    wp = cq.Workplane("ZY", (c.DIN_DEEP_LOW, c.DIN_NARROW_HEIGHT/2+2.6, c.CASE_WIDTH/2) ).transformed(rotate = cq.Vector(0, 180, 0))
-    text_upper = wp
-    for i in range(0, c.NR_WAGO_TOP) :
-        text_upper = text_upper.union( wp.center( - (c.NR_WAGO_TOP-1)*c.WAGO_OFFSET/2 + i*c.WAGO_OFFSET, 0).text(c.WAGO_UPPER_TEXT[i], c.WAGO_TXT_SIZE, -0.3) )
-    if c.NR_WAGO_TOP <=0: text_upper = dummy_cutout
+    def wago_text(y, count, texts):
+        wp = cq.Workplane("ZY", (c.DIN_DEEP_LOW, y, c.CASE_WIDTH/2) ).transformed(rotate = cq.Vector(0, 180, 0))
+        return text(wp, [ (- (count-1)*c.WAGO_OFFSET/2 + i*c.WAGO_OFFSET, 0, texts[i], c.WAGO_TXT_SIZE, -0.3, "regular", "center")
+                             for i in range(0, count) ])
     
-    wp = cq.Workplane("ZY", (c.DIN_DEEP_LOW, -c.DIN_NARROW_HEIGHT/2-2.8, c.CASE_WIDTH/2) ).transformed(rotate = cq.Vector(0, 180, 0))
-    text_lower = wp
-    for i in range(0, c.NR_WAGO_BOTTOM) :
-        text_lower = text_lower.union( wp.center( - (c.NR_WAGO_BOTTOM-1)*c.WAGO_OFFSET/2 + i*c.WAGO_OFFSET, 0).text(c.WAGO_LOWER_TEXT[i], c.WAGO_TXT_SIZE, -0.3) )
-    if c.NR_WAGO_BOTTOM <=0: text_lower = dummy_cutout
+    WAGO_TEXT_FIELDS = ("DIN_NARROW_HEIGHT", "DIN_DEEP_LOW", "CASE_WIDTH", "WAGO_OFFSET", "WAGO_TXT_SIZE")
+    text_upper = node("text_upper", lambda: wago_text(c.DIN_NARROW_HEIGHT/2+2.6, c.NR_WAGO_TOP, c.WAGO_UPPER_TEXT) if c.NR_WAGO_TOP > 0 else dummy_cutout,
+                      ("NR_WAGO_TOP", "WAGO_UPPER_TEXT") + WAGO_TEXT_FIELDS, ("dummy",), persist=True)
+    text_lower = node("text_lower", lambda: wago_text(-c.DIN_NARROW_HEIGHT/2-2.8, c.NR_WAGO_BOTTOM, c.WAGO_LOWER_TEXT) if c.NR_WAGO_BOTTOM > 0 else dummy_cutout,
+                      ("NR_WAGO_BOTTOM", "WAGO_LOWER_TEXT") + WAGO_TEXT_FIELDS, ("dummy",), persist=True)
     
     
     
     # ========================== lid =========================================
     
-    lid = ( cq.Workplane("XY", (0, 0, c.CASE_WIDTH)).placeSketch(sketch_inner.copy().wires().offset(1)).extrude(-c.CASE_THICKNESS)
-        .cut(board1_cutout).cut(lid_ledcutout) )
-    for l in lid_screw_blocks: lid = lid.union(l, clean= True)
-    for (x, y,) in screw_positions: 
-        lid = lid.moveTo(x, y).cboreHole(c.SCREW_HOLE_DIAM+0.4, c.SCREW_HEAD_DIAM, c.SCREW_HEAD_DEPTH, c.SCREW_HOLE_DEPTH) 
-    lid = ( lid.union(wago_lower_lid_addon).union(wago_upper_lid_addon)
-               .cut(top_wago_fix_cutout).cut(bottom_wago_fix_cutout)
-               .cut(wago_upper_cutout).cut(wago_lower_cutout) )
+    lid_plate = node("lid_plate", lambda: cq.Workplane("XY", (0, 0, c.CASE_WIDTH)).placeSketch(make_sketch_inner().copy().wires().offset(1)).extrude(-c.CASE_THICKNESS),
+                     INNER_FIELDS, persist=True)
+    def build_lid():
+        lid = cq.Workplane("XY", (0, 0, c.CASE_WIDTH)).add(lid_plate.vals()).cut(board1_cutout).cut(lid_ledcutout) # screw holes are drilled from this plane
+        carriers = [v for b, carrier in ((c.board2, board2_ledcarrier), (c.board3, board3_ledcarrier)) if b.leds for v in carrier.vals()] # light guide tubes of top / bottom boards
+        lid = lid.union(cq.Workplane("XY").newObject([b.val() for b in lid_screw_blocks] + carriers), clean= True) # one fuse for all blocks
+        for (x, y,) in screw_positions: 
+            if draft: lid = lid.moveTo(x, y).hole(c.SCREW_HOLE_DIAM+0.4, c.SCREW_HOLE_DEPTH)
+            else:     lid = lid.moveTo(x, y).cboreHole(c.SCREW_HOLE_DIAM+0.4, c.SCREW_HEAD_DIAM, c.SCREW_HEAD_DEPTH, c.SCREW_HOLE_DEPTH) 
+        lid = ( lid.union(wago_lower_lid_addon).union(wago_upper_lid_addon)
+                   .cut(top_wago_fix_cutout).cut(bottom_wago_fix_cutout)
+                   .cut(wago_upper_cutout).cut(wago_lower_cutout) )
+        for board, (_, holes, txt) in ((c.board2, board2_ledcutout), (c.board3, board3_ledcutout)):
+            if board.leds: lid = lid.cut(holes).cut(txt)
+        return lid
+    lid = node("lid", build_lid, ("SCREW_HOLE_DIAM", "SCREW_HEAD_DIAM", "SCREW_HEAD_DEPTH", "SCREW_HOLE_DEPTH"),
+               ("lid_plate", "board1_cutout", "board1_ledcutout", "board2_ledcarrier", "board3_ledcarrier", "board2_ledcutout", "board3_ledcutout", "lid_screw_blocks", "wago_upper", "wago_lower", "top_wago_fix", "bottom_wago_fix"))
     
     # =========================== build case ==================================
     
     
-    case = ( outer.cut(inner)
-            .cut(clip_cutout)
-            .union(wago_support_upper).union(wago_support_lower)
-            .cut(wago_upper_cutout)
-            .cut(wago_lower_cutout)
-            .cut(text_brand).cut(text_name)
-            .cut(text_upper).cut(text_lower)
-            .cut(usb_lower_cutout).cut(usb_upper_cutout).cut(usb_front_cutout)
-            .union(board2_carriers).union(board3_carriers)
-            .union(board1_carrier)
-            .cut(board1_cutout)
-            .union(board1_ledcarrier)
-            .union(board_fixes)
-            .cut(case_ledcutout)
-            .cut(led_txtcutout)
-            .cut(lid)
-        )
-    for b in case_screw_blocks: case = case.union(b)
-    
-    case = case.cut(top_wago_fix_cutout).cut(bottom_wago_fix_cutout)
+    def build_case():
+        # the case chain; batch_boolean gives the same solid as the pairwise chain, faster
+        steps = [
+            ("cut", {"clip_cutout": clip_cutout}),
+            ("cut", {"wago_upper_cutout": wago_upper_cutout, "wago_lower_cutout": wago_lower_cutout,
+                     "text_brand": text_brand, "text_name": text_name, "text_upper": text_upper, "text_lower": text_lower,
+                     "usb_lower_cutout": usb_lower_cutout, "usb_upper_cutout": usb_upper_cutout, "usb_front_cutout": usb_front_cutout}),
+            ("add", {"board2_carriers": board2_carriers, "board3_carriers": board3_carriers, "board1_carrier": board1_carrier}),
+            ("cut", {"board1_cutout": board1_cutout}),
+            ("add", {"board1_ledcarrier": board1_ledcarrier, "board_fixes": board_fixes}),
+            ("cut", {"case_ledcutout": case_ledcutout, "led_txtcutout": led_txtcutout, "lid": lid}),
+            ("add", {f"screw_block{i+1}": b for i, b in enumerate(case_screw_blocks)}),
+            ("cut", {"top_wago_fix_cutout": top_wago_fix_cutout, "bottom_wago_fix_cutout": bottom_wago_fix_cutout}),
+            ]
+        with profiler.stage("shell") as st: st.result = shell = outer.cut(inner)
+        return (batch_boolean if batch_booleans else chain_boolean)(shell, steps, profiler)
+    case = node("case", build_case, (), ("outer", "inner", "clip_cutout", "wago_upper", "wago_lower",
+                                          "text_brand", "text_name", "text_upper", "text_lower", "usb_front_cutout", "usb_upper_cutout", "usb_lower_cutout",
+                                          "board2_carriers", "board3_carriers", "board1_carrier", "board1_cutout", "board1_ledcarrier", "board_fixes",
+                                          "board1_ledcutout", "lid", "case_screw_blocks", "top_wago_fix", "bottom_wago_fix"), (batch_booleans,))
     
     
     # ================================= Final packaging ======================
@@ -442,43 +747,32 @@ def generate_enclosure(c: Config):
     clipz  = clip_r.val().BoundingBox().zmin
     tfixz  = tfix_r.val().BoundingBox().zmin
     bfixz  = bfix_r.val().BoundingBox().zmin
-    small_parts = ( cq.Assembly(clip_r.translate( (0, 40, -clipz)  ) )
-            .add( tfix_r.translate(( 0, -20, -tfixz) ))
-            .add( bfix_r.translate(( 0, 20, -bfixz) ))
-            .add(screw_block_clip2)
-            .add(screw_block_clip3)
-        ).toCompound()
-    
+    with profiler.stage("small_parts") as st: st.result = small_parts = cq.Compound.makeCompound([ to_shape(clip_r.translate( (0, 40, -clipz) )),
+            to_shape(tfix_r.translate(( 0, -20, -tfixz) )),
+            to_shape(bfix_r.translate(( 0, 20, -bfixz) )),
+            screw_block_clip2,
+            screw_block_clip3 ])
     
     
     
+    outputs = {}
     for i in results: 
         print(f"{i}: \n {results[i]} \n ")
-        results[i].rotate(*rotations[i]).translate(*translations[i]).export(Path(os.path.basename(__file__)).stem+"_"+c.CONFIG_NAME+"_"+i+".stl")
-    small_parts.export(Path(os.path.basename(__file__)).stem+"_"+c.CONFIG_NAME+"_small_parts.stl")
-    
-    
-    
-    result = (
-        cq.Assembly(case)
-            .add(bottom_wago_fix)
-            .add(top_wago_fix)
-            .add(lid)
-            .add(clip)
-        )
-    
-    
-    result.export(Path(os.path.basename(__file__)).stem+"_"+c.CONFIG_NAME+"_"+"assbly"+".step")
-    
-    compound = result.toCompound()
-    compound.export(Path(os.path.basename(__file__)).stem+"_"+c.CONFIG_NAME+"_"+"compound"+".step")
-    
-def show():
-    show_object(case)
-    show_object(clip)
-    show_object(bottom_wago_fix)
-    show_object(top_wago_fix)
-    show_object(lid.translate((0, 0, 50 )))
+        outputs[i] = to_shape(results[i].rotate(*rotations[i]).translate(*translations[i]))
+    outputs["small_parts"] = small_parts
+    
+    return Enclosure(config=c, config_hash=config_hash(source), parts=dict(results), outputs=outputs, files=[],
+                     warnings=warnings, rebuilt=list(graph.evaluated), seconds=time.perf_counter() - start, cadquery=cq.__version__, detail=detail, placement=placement,
+                     cache_hits=cache.hits - hits if cache is not None else 0, cache_misses=cache.misses - misses if cache is not None else 0)
+    
+def show(result: Enclosure):
+    if result.cache_hits or result.cache_misses: print(f"part cache: {result.cache_hits} hits, {result.cache_misses} misses")
+    print(f"build graph: {len(result.rebuilt)} nodes rebuilt")
+    show_object(result.parts["case"])
+    show_object(result.parts["clip"])
+    show_object(result.parts["bottom_wago_fix"])
+    show_object(result.parts["top_wago_fix"])
+    show_object(result.parts["lid"].translate((0, 0, 50 )))
     
     
     
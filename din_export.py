@@ -0,0 +1,250 @@
+# copyright @infradom
+# ======================= concurrent STL / STEP / 3MF export ===============
+#
+# OCCT holds the GIL while meshing, so the files are tessellated and written in worker
+# processes; shapes are pickled (BREP) to the workers.
+# cadquery is imported on first use so the presets can be read without loading it.
+#
+# STL files are written by stl_chunks: the triangles are converted face by face into binary
+# records and written in chunks of about 1 MB, to a file, any binary file-like object (e.g. an
+# HTTP response) or a bytes object. Only the OCCT triangulation is held in memory.
+# step_bytes and threemf_bytes encode in memory too (OCCT only writes STEP to a path, so that
+# goes through a temporary file).
+#
+# 3MF files are written by write_3mf: every distinct mesh is stored once and every placed copy
+# is a small object referencing it as a component with a transform, carrying its own name and
+# metadata (config, part). Meshes are stored relative to their bounding box corner, so copies of
+# a shape and equal shapes elsewhere or of other configs (same mesh text) cost a few bytes
+# instead of their triangles.
+
+import hashlib
+import io
+import os
+import struct
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from xml.sax.saxutils import escape, quoteattr
+
+from din_profile import Profiler
+
+
+@dataclass
+class Tolerance:
+    linear:  float  # deflection in mm, relative to the edge size (as CadQuery's STL exporter does)
+    angular: float  # deflection in radians
+
+PRESETS = {
+    "preview": Tolerance(linear=0.5, angular=0.5),  # coarse, fast meshes for a quick look
+    "print":   Tolerance(linear=0.1, angular=0.1),  # CadQuery's export defaults, used for the published STLs
+}
+
+
+def to_shape(w):
+    # a workplane may carry several shapes; export them as one compound like exporters.export does
+    import cadquery as cq
+    if isinstance(w, cq.Shape): return w
+    vals = [v for v in w.vals() if isinstance(v, cq.Shape)]
+    return vals[0] if len(vals) == 1 else cq.Compound.makeCompound(vals)
+
+
+STL_HEADER = b"binary STL written by din_export".ljust(80, b"\0")
+STL_RECORD = struct.Struct("<12fH") # normal, 3 vertices, attribute
+STL_CHUNK  = 1 << 20
+
+def _triangulate(shape, tolerance = None, relative = True):
+    # meshes the whole shape (shared edges get one discretization, so the mesh is watertight);
+    # returns [(face, triangulation, location)] and the triangle count.
+    # relative=False takes tolerance.linear in mm instead of relative to the edge size
+    from OCP.BRep import BRep_Tool
+    from OCP.BRepMesh import BRepMesh_IncrementalMesh
+    from OCP.TopLoc import TopLoc_Location
+    tolerance = tolerance or PRESETS["print"]
+    BRepMesh_IncrementalMesh(shape.wrapped, tolerance.linear, relative, tolerance.angular, True) # as Shape.exportStl meshes
+    faces, count = [], 0
+    for face in shape.Faces():
+        loc = TopLoc_Location()
+        poly = BRep_Tool.Triangulation_s(face.wrapped, loc)
+        if poly is None: continue
+        faces.append((face, poly, loc))
+        count += poly.NbTriangles()
+    return faces, count
+
+def _face_mesh(face, poly, loc):
+    # nodes (x, y, z) and triangles (0-based node indices, counter-clockwise seen from outside) of one face
+    from OCP.TopAbs import TopAbs_REVERSED
+    trsf = None if loc.IsIdentity() else loc.Transformation()
+    nodes = []
+    for i in range(1, poly.NbNodes() + 1):
+        p = poly.Node(i) if trsf is None else poly.Node(i).Transformed(trsf)
+        nodes.append((p.X(), p.Y(), p.Z()))
+    reverse = face.wrapped.Orientation() == TopAbs_REVERSED
+    triangles = []
+    for i in range(1, poly.NbTriangles() + 1):
+        a, b, c = poly.Triangle(i).Get()
+        triangles.append((a-1, c-1, b-1) if reverse else (a-1, b-1, c-1))
+    return nodes, triangles
+
+def stl_chunks(shape, tolerance = None, chunk_size = STL_CHUNK):
+    # binary STL of a shape as a sequence of bytes objects; the whole shape is meshed first
+    # because the header holds the triangle count
+    faces, count = _triangulate(shape, tolerance)
+    yield STL_HEADER + struct.pack("<I", count)
+    buf = bytearray()
+    for face in faces:
+        nodes, triangles = _face_mesh(*face)
+        for a, b, c in triangles:
+            (ax, ay, az), (bx, by, bz), (cx, cy, cz) = nodes[a], nodes[b], nodes[c]
+            ux, uy, uz, vx, vy, vz = bx - ax, by - ay, bz - az, cx - ax, cy - ay, cz - az
+            nx, ny, nz = uy*vz - uz*vy, uz*vx - ux*vz, ux*vy - uy*vx
+            length = (nx*nx + ny*ny + nz*nz) ** 0.5 or 1.0
+            buf += STL_RECORD.pack(nx/length, ny/length, nz/length, ax, ay, az, bx, by, bz, cx, cy, cz, 0)
+        if len(buf) >= chunk_size:
+            yield bytes(buf)
+            buf = bytearray()
+    if buf: yield bytes(buf)
+
+def write_stl(shape, target, tolerance = None):
+    # target: a path or a binary file-like object (only write() is used, it need not be seekable)
+    if hasattr(target, "write"):
+        for chunk in stl_chunks(shape, tolerance): target.write(chunk)
+        return target
+    with open(target, "wb") as f:
+        for chunk in stl_chunks(shape, tolerance): f.write(chunk)
+    return target
+
+def stl_bytes(shape, tolerance = None):
+    return write_stl(shape, io.BytesIO(), tolerance).getvalue()
+
+
+def step_bytes(shapes, assembly = False):
+    # one STEP file of all shapes: an assembly keeping them apart or a single compound
+    import cadquery as cq
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "shapes.step")
+        if assembly: write(path, "assembly", shapes)
+        else: write(path, "step", [cq.Compound.makeCompound(shapes)])
+        with open(path, "rb") as f: return f.read()
+
+THREEMF_CONTENT_TYPES = ('<?xml version="1.0" encoding="UTF-8"?>\n<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/></Types>')
+THREEMF_RELS = ('<?xml version="1.0" encoding="UTF-8"?>\n<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Target="/3D/3dmodel.model" Id="rel0" Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/></Relationships>')
+THREEMF_NAMESPACE = "urn:infradom:din_enclosure" # of the metadata names that are not in the 3MF core list
+THREEMF_CORE_METADATA = {"Title", "Designer", "Description", "Copyright", "LicenseTerms", "Rating", "CreationDate", "ModificationDate", "Application"}
+
+def _coordinate(v):
+    text = f"{v:.4f}"
+    return "0.0000" if text == "-0.0000" else text
+
+def mesh_xml(shape, tolerance = None):
+    # the <mesh> element of a shape; vertices are shared between faces, so the mesh is manifold
+    faces, _ = _triangulate(shape, tolerance)
+    index, vertices, triangles = {}, [], []
+    for face in faces:
+        nodes, face_triangles = _face_mesh(*face)
+        ids = []
+        for p in nodes:
+            key = tuple(_coordinate(v) for v in p) # merged as written, so equal points are one vertex
+            if key not in index:
+                index[key] = len(vertices)
+                vertices.append(key)
+            ids.append(index[key])
+        for a, b, c in face_triangles:
+            a, b, c = ids[a], ids[b], ids[c]
+            if a != b and b != c and a != c: triangles.append((a, b, c))
+    return "".join(["<mesh><vertices>\n", *(f'<vertex x="{x}" y="{y}" z="{z}"/>\n' for x, y, z in vertices),
+                    "</vertices><triangles>\n", *(f'<triangle v1="{a}" v2="{b}" v3="{c}"/>\n' for a, b, c in triangles),
+                    "</triangles></mesh>"])
+
+def _corner(shape):
+    # lower bounding box corner from the geometry; Shape.BoundingBox() uses the triangulation once a
+    # shape is meshed, which would move the corner of a copy meshed before and break the mesh sharing
+    import cadquery as cq
+    from OCP.Bnd import Bnd_Box
+    from OCP.BRepBndLib import BRepBndLib
+    box = Bnd_Box()
+    BRepBndLib.AddOptimal_s(shape.wrapped, box, False, False)
+    xmin, ymin, zmin, _, _, _ = box.Get()
+    return cq.Vector(xmin, ymin, zmin)
+
+def _transform(location):
+    # 3MF row vector matrix "m00 m01 m02 m10 ... m32" of a cq.Location
+    t = location.wrapped.Transformation()
+    return " ".join(f"{t.Value(row, col):.6g}" for col in (1, 2, 3, 4) for row in (1, 2, 3))
+
+def _metadata(values):
+    def name(key): return key if key in THREEMF_CORE_METADATA else "din:" + key
+    return "".join(f"<metadata name={quoteattr(name(k))}>{escape(str(v))}</metadata>" for k, v in values.items())
+
+def write_3mf(target, items, tolerance = None, metadata = None):
+    # target: a path or a binary file-like object
+    # items: shapes, or (shape, cq.Location or None, {metadata}) tuples; "name" in the metadata names the object
+    # metadata: of the whole model, e.g. {"Title": ...}
+    import cadquery as cq
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", THREEMF_CONTENT_TYPES)
+        z.writestr("_rels/.rels", THREEMF_RELS)
+        with z.open("3D/3dmodel.model", "w") as f:
+            f.write(('<?xml version="1.0" encoding="UTF-8"?>\n<model unit="millimeter" xml:lang="en-US" '
+                     f'xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02" xmlns:din="{THREEMF_NAMESPACE}">\n'
+                     + _metadata(dict({"Application": "din_enclosure"}, **(metadata or {}))) + "\n<resources>\n").encode())
+            meshes, by_shape, copies = {}, {}, [] # mesh digest: object id; id(shape): (object id, corner); (mesh id, location, metadata)
+            for item in items:
+                shape, location, info = item if isinstance(item, tuple) else (item, None, {})
+                if id(shape) not in by_shape:
+                    corner = _corner(shape)
+                    mesh = mesh_xml(shape.translate(-corner), tolerance)
+                    digest = hashlib.sha1(mesh.encode()).hexdigest()
+                    if digest not in meshes:
+                        meshes[digest] = len(meshes) + 1
+                        f.write(f'<object id="{meshes[digest]}" type="model">\n{mesh}\n</object>\n'.encode())
+                    by_shape[id(shape)] = (meshes[digest], cq.Location(corner))
+                mesh_id, corner = by_shape[id(shape)]
+                copies.append((mesh_id, corner if location is None else location * corner, info))
+            build = []
+            for n, (mesh_id, location, info) in enumerate(copies, len(meshes) + 1):
+                name = f" name={quoteattr(str(info['name']))}" if "name" in info else ""
+                transform = f' transform="{_transform(location)}"'
+                meta = {k: v for k, v in info.items() if k != "name"}
+                f.write((f'<object id="{n}" type="model"{name}>' + (f"<metadatagroup>{_metadata(meta)}</metadatagroup>" if meta else "")
+                         + f'<components><component objectid="{mesh_id}"{transform}/></components></object>\n').encode())
+                build.append(f'<item objectid="{n}"/>')
+            f.write(("</resources>\n<build>\n" + "\n".join(build) + "\n</build>\n</model>\n").encode())
+    return target
+
+def threemf_bytes(items, tolerance = None, metadata = None):
+    return write_3mf(io.BytesIO(), items, tolerance, metadata).getvalue()
+
+
+def write(path, kind, shapes, tolerance = None):
+    # kind: "stl" (one shape), "step" (one shape), "assembly" (STEP assembly of all shapes)
+    # or "3mf" (shapes or write_3mf items); path may be a binary file-like object for stl and 3mf
+    import cadquery as cq
+    if kind == "stl":
+        write_stl(shapes[0], path, tolerance)
+    elif kind == "step":
+        shapes[0].exportStep(path)
+    elif kind == "assembly":
+        assy = cq.Assembly(shapes[0])
+        for s in shapes[1:]: assy.add(s)
+        assy.export(path)
+    elif kind == "3mf":
+        write_3mf(path, shapes, tolerance)
+    else: raise ValueError(f"unknown export kind {kind}")
+    return path
+
+
+def export_all(jobs, workers = None, profiler = None):
+    # jobs: list of (path, kind, shapes, tolerance); workers=1 writes them in this process
+    profiler = profiler or Profiler(enabled=False)
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        paths = []
+        for job in jobs:
+            with profiler.stage(f"export {os.path.basename(job[0])}"): paths.append(write(*job))
+        return paths
+    with profiler.stage(f"export ({workers} workers)"), ProcessPoolExecutor(max_workers=workers) as pool:
+        return [f.result() for f in [pool.submit(write, *job) for job in jobs]]
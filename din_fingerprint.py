@@ -0,0 +1,121 @@
+# copyright @infradom
+# ======================= golden geometry fingerprints ======================
+#
+# usage: python din_fingerprint.py [root] [--update] [--jobs N]
+#
+# A fingerprint is a few numbers per exported part: volume, surface area, bounding box, center of
+# mass, inertia tensor and a histogram of the face types. They are stored as fingerprint.json next
+# to every config.py. The checker rebuilds each config without writing STL/STEP files and compares
+# the parts within TOLERANCES, which takes a fraction of a mesh diff. --update rewrites the files.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from din_batch import LIBRARY_DIR, find_configs, load_config
+
+FILENAME = "fingerprint.json"
+
+TOLERANCES = {
+    "volume":  1e-4, # relative
+    "area":    1e-4, # relative
+    "bbox":    1e-3, # mm
+    "center":  1e-3, # mm
+    "inertia": 1e-4, # relative to the largest tensor element
+}
+
+
+def fingerprint(shape):
+    faces = {}
+    for f in shape.Faces(): faces[f.geomType()] = faces.get(f.geomType(), 0) + 1
+    bb = shape.BoundingBox()
+    return {
+        "volume":  shape.Volume(),
+        "area":    shape.Area(),
+        "bbox":    [bb.xmin, bb.ymin, bb.zmin, bb.xmax, bb.ymax, bb.zmax],
+        "center":  list(shape.centerOfMass(shape).toTuple()),
+        "inertia": shape.matrixOfInertia(shape),
+        "faces":   dict(sorted(faces.items())),
+    }
+
+def compare(expected, actual, tolerances = TOLERANCES):
+    # list of differences between two fingerprints of one part
+    diffs = []
+    for key in ("volume", "area"):
+        e, a = expected[key], actual[key]
+        if abs(a - e) > tolerances[key] * max(abs(e), 1): diffs.append(f"{key} {e:.4f} -> {a:.4f}")
+    for key in ("bbox", "center"):
+        e, a = expected[key], actual[key]
+        if any(abs(x - y) > tolerances[key] for x, y in zip(e, a)):
+            diffs.append(f"{key} {[round(x, 3) for x in e]} -> {[round(y, 3) for y in a]}")
+    e, a = sum(expected["inertia"], []), sum(actual["inertia"], [])
+    scale = max(max(abs(x) for x in e), 1)
+    if any(abs(x - y) > tolerances["inertia"] * scale for x, y in zip(e, a)): diffs.append("inertia tensor")
+    if expected["faces"] != actual["faces"]: diffs.append(f"faces {expected['faces']} -> {actual['faces']}")
+    return diffs
+
+
+def dumps(fingerprints):
+    # one line per value, so a changed part shows up as a readable diff
+    parts = [f' "{name}": {{\n' + ",\n".join(f'  "{k}": {json.dumps(v)}' for k, v in fp.items()) + "\n }"
+             for name, fp in fingerprints.items()]
+    return "{\n" + ",\n".join(parts) + "\n}\n"
+
+
+def build(path):
+    # fingerprints of every output of the config at path, built without exporting
+    import din_enclosure
+    with contextlib.redirect_stdout(io.StringIO()):
+        shapes = din_enclosure.generate_enclosure(load_config(path), export=False).outputs
+    return {name: fingerprint(shape) for name, shape in shapes.items()}
+
+def check_one(path, update = False):
+    # runs in a worker process; returns (path, list of differences, error or None)
+    path = Path(path)
+    golden = path.parent / FILENAME
+    try:
+        actual = build(path)
+        if update or not golden.exists():
+            golden.write_text(dumps(actual))
+            return str(path), ["written"], None
+        expected = json.loads(golden.read_text())
+        diffs = [f"{name}: missing" for name in expected if name not in actual]
+        diffs += [f"{name}: new part" for name in actual if name not in expected]
+        for name in expected.keys() & actual.keys():
+            diffs += [f"{name}: {d}" for d in compare(expected[name], actual[name])]
+        return str(path), diffs, None
+    except Exception:
+        return str(path), [], traceback.format_exc()
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="compare the built parts with the stored geometry fingerprints")
+    parser.add_argument("root", nargs="?", default=LIBRARY_DIR, help="directory holding one sub-directory per config")
+    parser.add_argument("--update", action="store_true", help="store the current fingerprints")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    paths = find_configs(args.root)
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs or os.cpu_count()) as pool:
+        futures = [pool.submit(check_one, p, args.update) for p in paths]
+        for f in as_completed(futures):
+            path, diffs, error = f.result()
+            if error:
+                failed += 1
+                print(f"FAILED  {path}\n{error}")
+            elif diffs and diffs != ["written"]:
+                failed += 1
+                print(f"CHANGED {path}\n  " + "\n  ".join(diffs))
+            else:
+                print(f"{'written' if diffs else 'ok':7} {path}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# copyright @infradom
+# ======================= incremental build graph ==========================
+#
+# generate_enclosure builds its sub-parts as named nodes. Every node declares the Config fields
+# it reads ("CASE_WIDTH", "board2.width", "board1", ...) and the nodes it is built from.
+# Keep one BuildGraph between builds (e.g. in a CQ-editor session) and pass it to
+# generate_enclosure: a node is only re-evaluated when one of its fields or one of its inputs
+# changed, everything else is reused from the previous build.
+
+from din_cache import part_key
+from din_profile import Profiler
+
+
+def field_value(c, path):
+    # "board1.leds" -> c.board1.leds
+    value = c
+    for attr in path.split("."): value = getattr(value, attr)
+    return value
+
+def _related(a, b):
+    # "board1" covers "board1.leds" and the other way round
+    return a == b or a.startswith(b + ".") or b.startswith(a + ".")
+
+
+class BuildGraph:
+    def __init__(self):
+        self.nodes = {}      # name: (fields, inputs) as declared by the last build
+        self.keys = {}       # name: key of the last evaluation
+        self.values = {}     # name: result of the last evaluation
+        self.evaluated = []  # names of the nodes (re)built since begin()
+
+    def begin(self):
+        self.evaluated = []
+
+    def node(self, c, name, build, fields = (), inputs = (), extra = (), cache = None, profiler = None):
+        # inputs must have been evaluated before; extra: anything else the result depends on.
+        # The key only holds values and input keys, so it is stable across sessions and is also
+        # used as the key of the on-disk PartCache when one is given.
+        key = part_key(name, [[field_value(c, f) for f in fields], [self.keys[i] for i in inputs], list(extra)])
+        self.nodes[name] = (tuple(fields), tuple(inputs))
+        if self.keys.get(name) != key:
+            with (profiler or Profiler(enabled=False)).stage(name) as st:
+                st.result = self.values[name] = build() if cache is None else cache.get(name, (key,), build)
+            self.keys[name] = key
+            self.evaluated.append(name)
+        return self.values[name]
+
+    def downstream(self, names):
+        # the given nodes and every node built from them
+        result = set(names)
+        grown = True
+        while grown:
+            grown = False
+            for name, (fields, inputs) in self.nodes.items():
+                if name not in result and result.intersection(inputs):
+                    result.add(name)
+                    grown = True
+        return result
+
+    def affected(self, fields):
+        # nodes a change of the given config fields re-evaluates (as declared by the last build)
+        direct = [name for name, (declared, inputs) in self.nodes.items()
+                  if any(_related(f, d) for f in fields for d in declared)]
+        return self.downstream(direct)
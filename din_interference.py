@@ -0,0 +1,315 @@
+# copyright @infradom
+# ======================= interference and clearance check =================
+#
+# usage: python din_interference.py [config.py or directory ...] [--radius 1] [--tolerance 0.03]
+#
+# Checks the assembled parts (case, lid, clip, wago fixes in build coordinates) against each other
+# on their meshes instead of with OCCT booleans. Every part is triangulated with an absolute
+# deflection of MESH.linear; a BVH over the triangle boxes (Morton ordered, one numpy array per
+# level) is traversed for both parts at once, level by level, keeping the node pairs closer than
+# radius. The triangle pairs of the remaining leaves go through a vectorized narrow phase:
+# vertex-triangle distances for all of them, then edge-edge distances and edges crossing the other
+# triangle only for the pairs whose boxes are closer than the closest vertex.
+#
+# Per pair of parts within radius of each other:
+#   distance   smallest distance between the surfaces, 0 where they cross or touch
+#   depth      how far vertices of one part lie inside the other (sign from the closest triangle)
+#   status     "interference" (depth > tolerance), "contact" (distance <= tolerance, e.g. the lid
+#              resting on the case) or "clearance"
+# Distances are those of the meshes, within MESH.linear of the exact surfaces.
+
+import argparse
+import contextlib
+import io
+import itertools
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from din_batch import LIBRARY_DIR, find_configs, load_config
+from din_export import Tolerance, _face_mesh, _triangulate
+
+MESH      = Tolerance(linear=0.02, angular=0.2) # linear in mm, absolute
+RADIUS    = 1.0     # mm, pairs of parts farther apart are not reported
+TOLERANCE = 0.03    # mm, penetration or gap within the mesh error
+LEAF      = 8       # triangles per BVH leaf
+CHUNK     = 1 << 16 # triangle pairs per narrow phase batch
+
+
+@dataclass
+class Mesh:
+    name:      str
+    vertices:  np.ndarray # (n, 3)
+    triangles: np.ndarray # (m, 3) vertex indices, counter-clockwise seen from outside
+
+    @property
+    def corners(self): return self.vertices[self.triangles] # (m, 3, 3)
+
+@dataclass
+class BVH:
+    order: np.ndarray # triangle indices in leaf order, padded with -1 to LEAF per leaf
+    lo:    list       # per level (2**k, 3) box corners; level 0 is the root, the last level the leaves
+    hi:    list
+    tlo:   np.ndarray # (m, 3) box corners of every triangle
+    thi:   np.ndarray
+
+@dataclass
+class Pair:
+    a:        str
+    b:        str
+    distance: float
+    depth:    float   # inf: one part lies entirely inside the other
+    at:       tuple   # (x, y, z) of the deepest vertex, or of the closest spot without penetration
+    status:   str     # "interference" | "contact" | "clearance"
+
+    def __str__(self):
+        depth = "enclosed" if self.depth == np.inf else f"{self.depth:.3f} mm deep"
+        where = f"at ({self.at[0]:.1f}, {self.at[1]:.1f}, {self.at[2]:.1f})"
+        if self.status == "interference": return f"{self.a} / {self.b}: interference, {depth} {where}"
+        return f"{self.a} / {self.b}: {self.status}, {self.distance:.3f} mm {where}"
+
+
+def mesh(name, shape, tolerance = MESH):
+    # triangulates a copy, so the shape keeps the mesh its STL export uses
+    faces, _ = _triangulate(shape.copy(), tolerance, relative=False)
+    vertices, triangles = [], []
+    for face in faces:
+        nodes, face_triangles = _face_mesh(*face)
+        triangles += [(a + len(vertices), b + len(vertices), c + len(vertices)) for a, b, c in face_triangles]
+        vertices += nodes
+    return Mesh(name, np.array(vertices, float).reshape(-1, 3), np.array(triangles, np.int64).reshape(-1, 3))
+
+
+# ======================== broad phase ======================================
+
+def _spread(v):
+    # the 10 low bits of v moved to every third bit
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8))  & 0x0300F00F
+    v = (v | (v << 4))  & 0x030C30C3
+    return (v | (v << 2)) & 0x09249249
+
+def bvh(m: Mesh, leaf = LEAF):
+    # complete binary tree over the triangles in Morton order of their box centers
+    corners = m.corners
+    tlo, thi = corners.min(axis=1), corners.max(axis=1)
+    center = (tlo + thi)/2
+    span = np.maximum(center.max(axis=0) - center.min(axis=0), 1e-9)
+    q = ((center - center.min(axis=0))/span*1023).astype(np.int64)
+    order = np.argsort(_spread(q[:, 0]) | (_spread(q[:, 1]) << 1) | (_spread(q[:, 2]) << 2), kind="stable")
+    leaves = 1 << int(np.ceil(np.log2(max(1, -(-len(order)//leaf)))))
+    order = np.concatenate([order, np.full(leaves*leaf - len(order), -1)])
+    used = (order >= 0)[:, None]
+    lo = [np.where(used, tlo[order], np.inf).reshape(leaves, leaf, 3).min(axis=1)]
+    hi = [np.where(used, thi[order], -np.inf).reshape(leaves, leaf, 3).max(axis=1)]
+    while len(lo[0]) > 1:
+        lo.insert(0, lo[0].reshape(-1, 2, 3).min(axis=1))
+        hi.insert(0, hi[0].reshape(-1, 2, 3).max(axis=1))
+    return BVH(order, lo, hi, tlo, thi)
+
+def _box_gap(alo, ahi, blo, bhi):
+    # distance between axis aligned boxes, 0 if they overlap
+    d = np.maximum(np.maximum(alo - bhi, blo - ahi), 0)
+    return np.sqrt((d*d).sum(axis=-1))
+
+def candidates(a: BVH, b: BVH, radius):
+    # (i, j, gap) triangle pairs whose boxes are within radius, and the gap of their boxes; both trees descend together
+    ia, ib, ka, kb = np.zeros(1, np.int64), np.zeros(1, np.int64), 0, 0
+    while len(ia):
+        keep = _box_gap(a.lo[ka][ia], a.hi[ka][ia], b.lo[kb][ib], b.hi[kb][ib]) <= radius
+        ia, ib = ia[keep], ib[keep]
+        if ka == len(a.lo) - 1 and kb == len(b.lo) - 1: break
+        if ka < len(a.lo) - 1: ia, ib, ka = np.concatenate([2*ia, 2*ia + 1]), np.concatenate([ib, ib]), ka + 1
+        if kb < len(b.lo) - 1: ia, ib, kb = np.concatenate([ia, ia]), np.concatenate([2*ib, 2*ib + 1]), kb + 1
+    la, lb = a.order.reshape(len(a.lo[-1]), -1)[ia], b.order.reshape(len(b.lo[-1]), -1)[ib]
+    i = np.broadcast_to(la[:, :, None], (len(ia), la.shape[1], lb.shape[1])).ravel()
+    j = np.broadcast_to(lb[:, None, :], (len(ib), la.shape[1], lb.shape[1])).ravel()
+    keep = (i >= 0) & (j >= 0)
+    i, j = i[keep], j[keep]
+    gap = _box_gap(a.tlo[i], a.thi[i], b.tlo[j], b.thi[j])
+    keep = gap <= radius
+    return i[keep], j[keep], gap[keep]
+
+
+# ======================== narrow phase =====================================
+
+def _dot(u, v): return np.einsum("ij,ij->i", u, v)
+
+def _closest_on_triangle(p, a, b, c):
+    # closest point to p on triangle abc (Ericson, Real-Time Collision Detection 5.1.5), for arrays of them
+    ab, ac, ap, bp, cp = b - a, c - a, p - a, p - b, p - c
+    d1, d2, d3, d4, d5, d6 = _dot(ab, ap), _dot(ac, ap), _dot(ab, bp), _dot(ac, bp), _dot(ab, cp), _dot(ac, cp)
+    va, vb, vc = d3*d6 - d5*d4, d5*d2 - d1*d6, d1*d4 - d3*d2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = va + vb + vc
+        q = a + ab*(vb/denom)[:, None] + ac*(vc/denom)[:, None] # inside the face
+        # the regions in reverse order of the tests, so the first matching test wins
+        regions = [((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0), lambda: b + (c - b)*((d4 - d3)/((d4 - d3) + (d5 - d6)))[:, None]),
+                   ((vb <= 0) & (d2 >= 0) & (d6 <= 0),           lambda: a + ac*(d2/(d2 - d6))[:, None]),
+                   ((d6 >= 0) & (d5 <= d6),                      lambda: c),
+                   ((vc <= 0) & (d1 >= 0) & (d3 <= 0),           lambda: a + ab*(d1/(d1 - d3))[:, None]),
+                   ((d3 >= 0) & (d4 <= d3),                      lambda: b),
+                   ((d1 <= 0) & (d2 <= 0),                       lambda: a)]
+        for mask, point in regions:
+            if mask.any(): q = np.where(mask[:, None], point(), q)
+    return q
+
+def _closest_segments(p1, q1, p2, q2):
+    # closest points of segments p1q1 and p2q2 (Ericson 5.1.9), for arrays of them
+    d1, d2, r = q1 - p1, q2 - p2, p1 - p2
+    a, e, f, c, b = _dot(d1, d1), _dot(d2, d2), _dot(d2, r), _dot(d1, r), _dot(d1, d2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = a*e - b*b
+        s = np.where(denom > 1e-12, np.clip((b*f - c*e)/denom, 0, 1), 0)
+        t = np.where(e > 1e-12, (b*s + f)/e, 0)
+        s = np.where(t < 0, np.clip(-c/a, 0, 1), np.where(t > 1, np.clip((b - c)/a, 0, 1), s))
+        t = np.clip(t, 0, 1)
+    return p1 + d1*s[:, None], p2 + d2*t[:, None]
+
+def _crosses(p, q, a, b, c, eps = 1e-9):
+    # segment pq passes through the inside of triangle abc (touching an edge or lying in its plane does not count)
+    d, e1, e2 = q - p, b - a, c - a
+    h = np.cross(d, e2)
+    det = _dot(e1, h)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = 1/det
+        s = p - a
+        u = _dot(s, h)*inv
+        k = np.cross(s, e1)
+        v = _dot(d, k)*inv
+        t = _dot(e2, k)*inv
+        return (np.abs(det) > 1e-12) & (u > eps) & (v > eps) & (u + v < 1 - eps) & (t > eps) & (t < 1 - eps)
+
+def _vertices_to(points, ids, tri):
+    # distance of vertices to the triangles paired with them, and the sign seen from the triangle's normal;
+    # align ranks equally close triangles: on a shared edge the one facing the vertex decides the sign
+    q = _closest_on_triangle(points, tri[:, 0], tri[:, 1], tri[:, 2])
+    n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    n /= np.maximum(np.linalg.norm(n, axis=1), 1e-300)[:, None]
+    offset = points - q
+    d = np.linalg.norm(offset, axis=1)
+    side = _dot(offset, n)
+    return q, (ids, d, side, np.abs(side)/np.maximum(d, 1e-300))
+
+def _closer(best, at, p, q):
+    d = np.linalg.norm(p - q, axis=1)
+    better = d < best
+    return np.where(better, d, best), np.where(better[:, None], (p + q)/2, at)
+
+def narrow_vertices(ma: Mesh, mb: Mesh, i, j):
+    # per triangle pair: smallest vertex-triangle distance and the middle of its closest points; and the vertex entries of both sides
+    ta, tb = ma.corners[i], mb.corners[j]
+    best, at = np.full(len(i), np.inf), np.zeros((len(i), 3))
+    side_a, side_b = [], []
+    for k in range(3):
+        for points, ids, tri, entries in ((ta[:, k], ma.triangles[i, k], tb, side_a), (tb[:, k], mb.triangles[j, k], ta, side_b)):
+            q, entry = _vertices_to(points, ids, tri)
+            best, at = _closer(best, at, points, q)
+            entries.append(entry)
+    return best, at, [np.concatenate(x) for x in zip(*side_a)], [np.concatenate(x) for x in zip(*side_b)]
+
+def narrow_edges(ma: Mesh, mb: Mesh, i, j):
+    # per triangle pair: smallest edge-edge distance, 0 where an edge crosses the other triangle
+    ta, tb = ma.corners[i], mb.corners[j]
+    best, at = np.full(len(i), np.inf), np.zeros((len(i), 3))
+    crossing = np.zeros(len(i), bool)
+    for k in range(3):
+        for l in range(3):
+            best, at = _closer(best, at, *_closest_segments(ta[:, k], ta[:, (k + 1) % 3], tb[:, l], tb[:, (l + 1) % 3]))
+        crossing |= _crosses(ta[:, k], ta[:, (k + 1) % 3], tb[:, 0], tb[:, 1], tb[:, 2])
+        crossing |= _crosses(tb[:, k], tb[:, (k + 1) % 3], ta[:, 0], ta[:, 1], ta[:, 2])
+    return np.where(crossing, 0.0, best), at
+
+def _depth(vertices, ids, d, side, align):
+    # deepest vertex inside the other part: per vertex the closest triangle (the best facing one on ties)
+    if not len(ids): return 0.0, None
+    order = np.lexsort((-align, np.round(d, 9), ids))
+    first = np.r_[True, ids[order][1:] != ids[order][:-1]]
+    pick = order[first]
+    inside = (side[pick] < 0) & (d[pick] > 1e-9)
+    if not inside.any(): return 0.0, None
+    k = pick[inside][np.argmax(d[pick][inside])]
+    return float(d[k]), tuple(vertices[ids[k]].tolist())
+
+def _winding(p, corners):
+    # generalized winding number of a closed mesh around point p: 1 inside, 0 outside
+    a, b, c = corners[:, 0] - p, corners[:, 1] - p, corners[:, 2] - p
+    la, lb, lc = (np.linalg.norm(x, axis=1) for x in (a, b, c))
+    num = _dot(a, np.cross(b, c))
+    den = la*lb*lc + _dot(a, b)*lc + _dot(b, c)*la + _dot(c, a)*lb
+    return np.arctan2(num, den).sum()/(2*np.pi)
+
+
+# ======================== checks ===========================================
+
+def check_pair(ma: Mesh, a: BVH, mb: Mesh, b: BVH, radius = RADIUS, tolerance = TOLERANCE, chunk = CHUNK):
+    # Pair or None if the surfaces are farther apart than radius
+    i, j, gap = candidates(a, b, radius)
+    if not len(i):
+        # no surfaces nearby, but one part may still lie inside the other
+        for inner, outer in ((ma, mb), (mb, ma)):
+            lo, hi = outer.vertices.min(axis=0), outer.vertices.max(axis=0)
+            p = inner.vertices[0]
+            if (p > lo).all() and (p < hi).all() and _winding(p, outer.corners) > 0.5:
+                return Pair(ma.name, mb.name, 0.0, np.inf, tuple(p.tolist()), "interference")
+        return None
+    dist, at, side_a, side_b = [], [], [], []
+    for s in range(0, len(i), chunk):
+        d, p, ea, eb = narrow_vertices(ma, mb, i[s:s + chunk], j[s:s + chunk])
+        dist.append(d); at.append(p); side_a.append(ea); side_b.append(eb)
+    dist, at = np.concatenate(dist), np.concatenate(at)
+    k = int(np.argmin(dist))
+    distance, closest = float(dist[k]), tuple(at[k].tolist())
+    if distance > 1e-9:
+        # edges can only come closer where the triangle boxes are closer than the vertices: usually a handful of pairs
+        near = np.flatnonzero(gap < distance)
+        for s in range(0, len(near), chunk):
+            d, p = narrow_edges(ma, mb, i[near[s:s + chunk]], j[near[s:s + chunk]])
+            k = int(np.argmin(d))
+            if d[k] < distance: distance, closest = float(d[k]), tuple(p[k].tolist())
+    if distance > radius: return None
+    depth_a, at_a = _depth(ma.vertices, *[np.concatenate(x) for x in zip(*side_a)])
+    depth_b, at_b = _depth(mb.vertices, *[np.concatenate(x) for x in zip(*side_b)])
+    depth, deepest = (depth_a, at_a) if depth_a >= depth_b else (depth_b, at_b)
+    status = "interference" if depth > tolerance else "contact" if distance <= tolerance else "clearance"
+    return Pair(ma.name, mb.name, distance, depth, deepest if status == "interference" else closest, status)
+
+def check(meshes, radius = RADIUS, tolerance = TOLERANCE):
+    # every pair of parts within radius, interferences first, then by distance
+    trees = [bvh(m) for m in meshes]
+    pairs = [check_pair(ma, a, mb, b, radius, tolerance) for (ma, a), (mb, b) in itertools.combinations(zip(meshes, trees), 2)]
+    return sorted([p for p in pairs if p], key=lambda p: (p.status != "interference", p.distance))
+
+def check_parts(parts, radius = RADIUS, tolerance = TOLERANCE, mesh_tolerance = MESH, min_volume = 1.0):
+    # parts: name: cq.Shape; the placeholders of absent wago fixes (below min_volume) are left out
+    return check([mesh(name, s, mesh_tolerance) for name, s in parts.items() if s.Volume() >= min_volume], radius, tolerance)
+
+
+# ======================== command line ====================================
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="check the assembled parts for interference and clearance")
+    parser.add_argument("configs", nargs="*", default=[LIBRARY_DIR], help="config.py files or directories holding */config.py")
+    parser.add_argument("--radius", type=float, default=RADIUS, help="report pairs of parts closer than this (mm)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="penetration or gap counted as touching (mm)")
+    args = parser.parse_args(argv)
+
+    import din_enclosure
+    paths = []
+    for c in args.configs: paths += find_configs(c) if Path(c).is_dir() else [Path(c)]
+    failed = 0
+    for path in paths:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = din_enclosure.generate_enclosure(load_config(path), export=False)
+        start = time.perf_counter()
+        pairs = result.interference(args.radius, args.tolerance)
+        print(f"{path} ({time.perf_counter() - start:.2f}s)")
+        for p in pairs: print(f"  {p}")
+        failed += any(p.status == "interference" for p in pairs)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# copyright @infradom
+# ======================= derived dimensions of the enclosure ==============
+#
+# Pure python (no cadquery): shared by the geometry build and by the fast checks
+# that must not pay for importing cadquery. The formulas also take numpy arrays for the
+# config values (din_sweep evaluates them for many configs at once), so conditions go
+# through _where / _max instead of if / max.
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from din_declarations import *
+
+
+# fixed dimensions of the geometry build
+CLIP_GAP         = 0.1
+CLIP_THICKNESS   = 3.5
+WAGO_FIX_HEIGHT  = 2.5
+WAGO_FIX_EXTRUDE = 1.25
+CARRIER_X        = 7
+CARRIER_Y        = 2
+MIN_CARRIER      = 0.5  # least mount_height of a top / bottom board: its carriers are extruded by it
+USB_TAPER        = 30   # degrees, usb cutouts widen towards the inside of the case
+
+
+@dataclass
+class Layout:
+    CASE_WIDTH:           float  # after widening for the wago count
+    WAGO_POS_DEPTH_UPPER: float  # from front of rail
+    WAGO_POS_DEPTH_LOWER: float
+    wago_height_t:        float  # room taken by upper wago + fixation, 0 without upper wagos
+    wago_height_b:        float
+    screw_positions:      list   # (x, y) of the 4 screw blocks
+    b1_carrier_height:    float  # <= 0: board1 too wide for a carrier
+
+
+def _where(cond, a, b):
+    # a if cond else b, element-wise for arrays
+    return np.where(cond, a, b) if isinstance(cond, np.ndarray) else a if cond else b
+
+def _max(a, b):
+    return np.maximum(a, b) if isinstance(a, np.ndarray) or isinstance(b, np.ndarray) else max(a, b)
+
+
+def case_width(c: Config):
+    wide = ((c.NR_WAGO_BOTTOM*c.WAGO_OFFSET + c.CASE_THICKNESS > c.CASE_WIDTH) |
+            (c.NR_WAGO_TOP*c.WAGO_OFFSET + c.CASE_THICKNESS > c.CASE_WIDTH))
+    return _where(wide, _max(c.NR_WAGO_BOTTOM, c.NR_WAGO_TOP)*c.WAGO_OFFSET + c.CASE_THICKNESS, c.CASE_WIDTH)
+
+
+def layout(c: Config) -> Layout:
+    width = case_width(c)
+    WAGO_POS_DEPTH_UPPER = c.board2.width+2*c.CASE_THICKNESS
+    WAGO_POS_DEPTH_LOWER = c.board3.width+2*c.CASE_THICKNESS
+    wago_height_t = _where(c.NR_WAGO_TOP == 0, 0, c.WAGO_HEIGHT + WAGO_FIX_HEIGHT)
+    wago_height_b = _where(c.NR_WAGO_BOTTOM == 0, 0, c.WAGO_HEIGHT + WAGO_FIX_HEIGHT)
+    screw_positions = [
+               (WAGO_POS_DEPTH_UPPER + wago_height_t + c.SCREW_BLOCK_SIZE/2,  c.DIN_HEIGHT/2-c.WAGO_LIP_LENGTH - c.CASE_THICKNESS - c.SCREW_BLOCK_SIZE/2, ),
+               (WAGO_POS_DEPTH_LOWER + wago_height_b + c.SCREW_BLOCK_SIZE/2, -c.DIN_HEIGHT/2+c.WAGO_LIP_LENGTH + c.CASE_THICKNESS + c.SCREW_BLOCK_SIZE/2, ),
+               (c.board2.width/2 + c.CASE_THICKNESS, c.DIN_HEIGHT/2-c.CASE_THICKNESS-c.board2.length - c.SCREW_BLOCK_SIZE/2, ),
+               (c.board3.width/2 + c.CASE_THICKNESS, -c.DIN_HEIGHT/2+c.CASE_THICKNESS+c.board3.length + c.SCREW_BLOCK_SIZE/2,),
+        ]
+    return Layout(
+        CASE_WIDTH           = width,
+        WAGO_POS_DEPTH_UPPER = WAGO_POS_DEPTH_UPPER,
+        WAGO_POS_DEPTH_LOWER = WAGO_POS_DEPTH_LOWER,
+        wago_height_t        = wago_height_t,
+        wago_height_b        = wago_height_b,
+        screw_positions      = screw_positions,
+        b1_carrier_height    = width - c.board1.width - c.CASE_THICKNESS,
+    )
+
+
+def usb_growth(c: Config):
+    # extra half width of a tapered usb cutout at the inner side of the wall
+    return c.CASE_THICKNESS*math.tan(math.radians(USB_TAPER))
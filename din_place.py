@@ -0,0 +1,187 @@
+# copyright @infradom
+# ======================= automatic board placement =======================
+#
+# usage: python din_place.py [config.py] [--widths N] [--step 0.5]
+#
+# With Config.boards set, place(config) decides which board goes into which of the three existing
+# slots of the case, turns boards by 90 degrees where that is possible, raises their mount heights
+# and picks the case width; the result is a Config with board1..3 filled in, which generate_enclosure
+# builds. It fills slots, it does not pack modules: the case geometry is the same as with board1..3.
+#
+# The slots are "front" (board1, vertical behind the front), "top" (board2) and "bottom" (board3);
+# a list of more than three boards is rejected, slots without a board keep the boardN of the config.
+# A board with position "auto" may go into any slot, "front" / "top" / "bottom" pins it. Its
+# mount_height is the least room it needs below it (behind it for the front slot), the search may
+# raise it. Only boards without usb, LEDs and JST extras can be turned: those are tied to
+# the usb side of the board.
+#
+# Search, per assignment of boards to slots, orientation and case width (CASE_WIDTH, and with
+# widths > 1 that plus one or more DIN modules of 18 mm):
+#   1. bounding intervals: per board the mount heights that keep it, its usb cutout and its LEDs
+#      inside walls, floor and lid; a candidate with an empty interval is dropped unevaluated
+#   2. the mount heights on a grid within the intervals, every combination scored at once with the
+#      margins of din_sweep, the winner checked again with din_validate
+# Score: narrowest case, then the tightest clearance up to CLEARANCE (designed contacts, margin 0,
+# left out), then the least raise of the mount heights.
+
+import argparse
+import copy
+import itertools
+import sys
+import time
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from din_declarations import *
+from din_layout import MIN_CARRIER, case_width, usb_growth
+from din_sweep import evaluate
+from din_validate import EPS, validate
+
+SLOTS     = ("front", "top", "bottom") # board1, board2, board3
+MODULE    = 18    # mm, width of a DIN module
+CLEARANCE = 1.0   # mm, clearances beyond this do not make a layout better
+STEP      = 0.5   # mm, mount height grid
+MAX_STEPS = 16    # grid points per board at most
+
+
+@dataclass
+class Placement:
+    config:    Config # board1..3 filled in, boards None
+    slots:     dict   # slot: index into boards, None where the slot keeps its boardN
+    turned:    list   # per board: turned by 90 degrees
+    clearance: float  # tightest clearance of the layout, up to CLEARANCE
+    evaluated: int    # layouts scored
+    pruned:    int    # candidates dropped by their intervals
+    seconds:   float
+
+    def __str__(self):
+        c = self.config
+        lines = [f"CASE_WIDTH {c.CASE_WIDTH:g}, tightest clearance {self.clearance:.2f} mm; "
+                 f"{self.evaluated} layouts scored, {self.pruned} candidates pruned in {self.seconds:.3f}s"]
+        for n, (slot, i) in enumerate(self.slots.items(), 1):
+            b = getattr(c, f"board{n}")
+            what = "kept" if i is None else f"boards[{i}]" + (" turned" if self.turned[i] else "")
+            lines.append(f"  board{n} {slot:6} {what:17} {b.board_width:g} x {b.length:g} mm, mount_height {b.mount_height:g}")
+        return "\n".join(lines)
+
+
+def turnable(b: Board):
+    return b.usb_height is None and not b.leds and not b.jst_extrawidth_left and not b.jst_extrawidth_right and b.board_width != b.length
+
+def interval(c: Config, b: Board, slot, width):
+    # (lo, hi) of the mount heights of b in slot at case width, or None; only bounds that do not depend on the other boards
+    t, h, w = c.CASE_THICKNESS, c.DIN_HEIGHT, width
+    g = usb_growth(c)
+    lo, hi = b.mount_height, np.inf
+    if slot == "front":
+        top1 = h/2 - c.WAGO_LIP_LENGTH - t/2
+        if b.width > w - t or top1 - b.length < -h/2 + t: return None
+        lo, hi = max(lo, t + b.thickness/2), c.DIN_DEEP_HIGH - t - b.thickness/2
+        if b.usb_height is not None:
+            z = w/2 + (w - b.width - t)/2 - b.usb_offset
+            if z - c.USB_WIDTH/2 - g < t or z + c.USB_WIDTH/2 + g > w - t: return None
+            lo = max(lo, c.DIN_DEEP_HIGH + b.usb_height + b.thickness/2 + c.USB_HEIGHT/2 + g - c.DIN_DEEP_LOW + t)
+        r = c.LIGHT_CARRIER_DIAM/2
+        for led in b.leds or []:
+            if not (0 <= led.x <= b.width and 0 <= led.y <= b.length): return None
+            if abs(top1 - b.length + led.y) + r > c.DIN_NARROW_HEIGHT/2 - t + EPS: return None
+    else:
+        lip = h/2 - c.WAGO_LIP_LENGTH - t
+        if b.width > c.DIN_DEEP_LOW - 2*t or b.length > h/2 - t + lip: return None
+        lo, hi = max(lo, MIN_CARRIER), w - 2*t - b.thickness # the carriers below a horizontal board need some height
+        if b.usb_height is not None:
+            x = b.width/2 + b.usb_offset
+            if x < c.USB_WIDTH/2 + g or x > b.width - c.USB_WIDTH/2 - g: return None
+            lo = max(lo, c.USB_HEIGHT/2 + g - b.usb_height - b.thickness/2)
+            hi = min(hi, w - 2*t - b.usb_height - b.thickness/2 - c.USB_HEIGHT/2 - g)
+        for led in b.leds or []:
+            if not (0 <= led.x <= b.width and 0 <= led.y <= b.length): return None
+    return (lo, hi) if hi >= lo - EPS else None
+
+def _grid(lo, hi, step):
+    # lo and multiples of step above it up to hi; the step grows by whole steps beyond MAX_STEPS points
+    step *= max(1, int(np.ceil((hi - lo)/step/(MAX_STEPS - 1) - EPS)))
+    return lo + step*np.arange(int(np.floor((hi - lo)/step + EPS)) + 1)
+
+
+def candidates(c: Config, widths = 2):
+    # (slots, turned, width, boards with their slot position, intervals) that survive the interval bounds; and the pruned count
+    boards = list(c.boards)
+    result, pruned = [], 0
+    for taken in itertools.permutations(range(len(SLOTS)), len(boards)):
+        if any(b.position != "auto" and b.position != SLOTS[s] for b, s in zip(boards, taken)): continue
+        for turned in itertools.product(*[(False, True) if turnable(b) else (False,) for b in boards]):
+            for width in [c.CASE_WIDTH + k*MODULE for k in range(widths)]:
+                cw = case_width(replace(c, CASE_WIDTH=width))
+                placed, bounds = {}, {}
+                for i, (b, s, turn) in enumerate(zip(boards, taken, turned)):
+                    b = replace(b, position=SLOTS[s], **({"board_width": b.length, "length": b.board_width} if turn else {}))
+                    bounds[s] = interval(c, b, SLOTS[s], cw)
+                    placed[s] = (i, b)
+                if any(v is None for v in bounds.values()):
+                    pruned += 1
+                    continue
+                result.append((taken, turned, width, placed, bounds))
+    return result, pruned
+
+def score(c: Config, placed, bounds, step = STEP):
+    # every grid combination of the mount heights: (mount heights per slot, feasible, clearance, raise, CASE_WIDTH)
+    slots = sorted(placed)
+    heights = dict(zip(slots, (a.ravel() for a in np.meshgrid(*[_grid(*bounds[s], step) for s in slots], indexing="ij"))))
+    d, m = evaluate(c, {f"board{s + 1}.mount_height": heights[s] for s in slots})
+    stack = np.stack(list(m.values()))
+    feasible = stack.min(axis=0) >= -EPS
+    clearance = np.minimum(np.where(stack > EPS, stack, np.inf).min(axis=0), CLEARANCE)
+    raised = sum(heights[s] - placed[s][1].mount_height for s in slots)
+    return heights, feasible, clearance, raised, d["CASE_WIDTH"]
+
+
+def place(c: Config, widths = 2, step = STEP) -> Placement:
+    # raises ValueError if the boards do not fit in any layout
+    if not c.boards: raise ValueError("config has no boards to place")
+    if len(c.boards) > len(SLOTS):
+        raise ValueError(f"{len(c.boards)} boards, but the case has {len(SLOTS)} slots ({', '.join(SLOTS)})")
+    for b in c.boards:
+        if b.position not in SLOTS + ("auto",): raise ValueError(f"board position '{b.position}' is not one of {', '.join(SLOTS)}, auto")
+    start = time.perf_counter()
+    found, pruned = candidates(c, widths)
+    winners, evaluated = [], 0
+    for taken, turned, width, placed, bounds in found:
+        base = copy.deepcopy(c)
+        base.boards, base.CASE_WIDTH = None, width
+        for s, (_, b) in placed.items(): setattr(base, f"board{s + 1}", b)
+        heights, feasible, clearance, raised, widths = score(base, placed, bounds, step)
+        evaluated += len(feasible)
+        if not feasible.any(): continue
+        k = np.flatnonzero(feasible)[np.lexsort((raised[feasible], -clearance[feasible]))[0]]
+        for s, (_, b) in placed.items(): setattr(base, f"board{s + 1}", replace(b, mount_height=round(float(heights[s][k]), 3)))
+        winners.append(((float(widths[k]), -float(clearance[k]), float(raised[k])), base, taken, turned))
+    for key, base, taken, turned in sorted(winners, key=lambda w: w[0]):
+        if any(i.level == "error" for i in validate(base)): continue # the interval and grid model is exact, this is a safety net
+        slots = {slot: (taken.index(n) if n in taken else None) for n, slot in enumerate(SLOTS)}
+        return Placement(base, slots, list(turned), -key[1], evaluated, pruned, time.perf_counter() - start)
+    raise ValueError(f"the boards fit in none of {evaluated} layouts ({pruned} candidates pruned by their size)")
+
+
+# ======================== command line ====================================
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="put the boards of a config into the front, top and bottom slots of the case")
+    parser.add_argument("config", help="config.py with a boards list")
+    parser.add_argument("--widths", type=int, default=2, help="case widths to try, one DIN module (18 mm) apart")
+    parser.add_argument("--step", type=float, default=STEP, help="mount height grid in mm")
+    args = parser.parse_args(argv)
+
+    from din_batch import load_config
+    try:
+        result = place(load_config(args.config), args.widths, args.step)
+    except ValueError as e:
+        print(e)
+        return 1
+    print(result)
+    print(f"{result.evaluated/result.seconds:.0f} layouts per second")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
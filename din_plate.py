@@ -0,0 +1,201 @@
+# copyright @infradom
+# ======================= print bed packing ================================
+#
+# usage: python din_plate.py [config.py or directory ...] [--copies N] [--bed 220x220] [--spacing 5]
+#                            [--margin 5] [--no-rotate] [--out DIR] [--format stl|3mf] [--preset print|preview] [--jobs N]
+#
+# Builds every config (without writing its own files), takes the printable pieces of each
+# enclosure - case, lid, and the clip, wago fixes and screw block clips of small_parts - and
+# packs their bounding box footprints onto as few beds as possible (MaxRects, best short side
+# fit, largest pieces first, optionally turned by 90 degrees). Writes one STL or 3MF per bed and
+# prints the fill of every plate. Pieces lie as they are exported: flat side down.
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from din_batch import LIBRARY_DIR, find_configs, load_config
+from din_export import PRESETS, Tolerance, export_all
+
+PLATE_FILENAME = "plate_{n:02d}.stl"
+
+
+@dataclass
+class Piece:
+    name:   str     # config name / part
+    shape:  object  # cq.Shape, lowered onto z=0 with its footprint starting at x=0, y=0
+    width:  float   # footprint along x
+    depth:  float   # footprint along y
+
+@dataclass
+class Placement:
+    piece:   Piece
+    x:       float  # of the footprint corner on the bed
+    y:       float
+    rotated: bool   # turned by 90 degrees around z
+
+@dataclass
+class Plate:
+    width:      float
+    depth:      float
+    placements: list = field(default_factory=list)
+    free:       list = field(default_factory=list) # MaxRects free rectangles (x, y, w, h), spacing included
+
+    def fill(self):
+        return sum(p.piece.width*p.piece.depth for p in self.placements) / (self.width*self.depth)
+
+
+def piece(name, shape):
+    import cadquery as cq
+    bb = shape.BoundingBox()
+    return Piece(name, shape.translate(cq.Vector(-bb.xmin, -bb.ymin, -bb.zmin)), bb.xlen, bb.ylen)
+
+def pieces(result, name = None):
+    # the printable pieces of an Enclosure
+    name = name or result.config.CONFIG_NAME
+    return [piece(f"{name}/{part}", s) for part, s in result.printables()]
+
+
+# ======================== MaxRects packing =================================
+
+def _fits(w, h, rect):
+    return w <= rect[2] + 1e-9 and h <= rect[3] + 1e-9
+
+def _split(free, used):
+    # free rectangles of `free` that remain around `used`, maximal and possibly overlapping
+    fx, fy, fw, fh = free
+    ux, uy, uw, uh = used
+    if ux >= fx + fw or ux + uw <= fx or uy >= fy + fh or uy + uh <= fy: return [free]
+    result = []
+    if ux > fx:           result.append((fx, fy, ux - fx, fh))
+    if ux + uw < fx + fw: result.append((ux + uw, fy, fx + fw - ux - uw, fh))
+    if uy > fy:           result.append((fx, fy, fw, uy - fy))
+    if uy + uh < fy + fh: result.append((fx, uy + uh, fw, fy + fh - uy - uh))
+    return result
+
+def _contained(a, b):
+    return a[0] >= b[0] and a[1] >= b[1] and a[0] + a[2] <= b[0] + b[2] and a[1] + a[3] <= b[1] + b[3]
+
+def _place(plate, w, h, rotate):
+    # best short side fit over the free rectangles of one plate: (score, x, y, rotated) or None
+    best = None
+    for rect in plate.free:
+        for rotated, (pw, ph) in ((False, (w, h)), (True, (h, w))):
+            if rotated and (not rotate or w == h): continue
+            if not _fits(pw, ph, rect): continue
+            score = (min(rect[2] - pw, rect[3] - ph), max(rect[2] - pw, rect[3] - ph))
+            if best is None or score < best[0]: best = (score, rect[0], rect[1], rotated)
+    return best
+
+def pack(items, bed = (220, 220), spacing = 5, margin = 5, rotate = True):
+    # items: list of Piece -> list of Plate; spacing: gap between pieces, margin: free border of the bed
+    usable = (bed[0] - 2*margin + spacing, bed[1] - 2*margin + spacing) # every piece reserves spacing at its far sides
+    plates = []
+    for p in sorted(items, key=lambda p: (-max(p.width, p.depth), -p.width*p.depth)):
+        w, h = p.width + spacing, p.depth + spacing
+        if not (_fits(w, h, (0, 0) + usable) or (rotate and _fits(h, w, (0, 0) + usable))):
+            raise ValueError(f"{p.name} ({p.width:.1f} x {p.depth:.1f} mm) does not fit on a {bed[0]} x {bed[1]} mm bed")
+        for plate in plates:
+            spot = _place(plate, w, h, rotate)
+            if spot: break
+        else:
+            plate = Plate(bed[0], bed[1], free=[(0, 0) + usable])
+            plates.append(plate)
+            spot = _place(plate, w, h, rotate)
+        _, x, y, rotated = spot
+        used = (x, y) + ((h, w) if rotated else (w, h))
+        free = [r for f in plate.free for r in _split(f, used)]
+        plate.free = [r for i, r in enumerate(free)
+                      if not any(j != i and _contained(r, o) and (r != o or j < i) for j, o in enumerate(free))]
+        plate.placements.append(Placement(p, x + margin, y + margin, rotated))
+    return plates
+
+
+def location(placement):
+    # moves the piece's shape to its place on the bed
+    import cadquery as cq
+    loc = cq.Location(cq.Vector(placement.x, placement.y, 0))
+    if placement.rotated: loc = loc * cq.Location(cq.Vector(placement.piece.depth, 0, 0), cq.Vector(0, 0, 1), 90)
+    return loc
+
+def plate_shape(plate):
+    # all pieces of a plate moved to their place, as one compound
+    import cadquery as cq
+    return cq.Compound.makeCompound([pl.piece.shape.moved(location(pl)) for pl in plate.placements])
+
+def plate_items(plate):
+    # din_export.write_3mf items: copies of a piece share its mesh
+    return [(pl.piece.shape, location(pl), {"name": pl.piece.name, "config": pl.piece.name.split("/")[0], "part": pl.piece.name.split("/")[-1]})
+            for pl in plate.placements]
+
+def write_plates(plates, output_dir = ".", filename: str = PLATE_FILENAME, tolerance: Tolerance | None = None, workers = None):
+    # one STL or 3MF (by the extension of filename) per plate; returns the paths
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    kind = "3mf" if filename.endswith(".3mf") else "stl"
+    jobs = [(str(Path(output_dir) / filename.format(n=n)), kind, plate_items(p) if kind == "3mf" else [plate_shape(p)], tolerance)
+            for n, p in enumerate(plates, 1)]
+    return export_all(jobs, workers)
+
+
+# ======================== command line ====================================
+
+def build_pieces(path):
+    # runs in a worker process; returns (path, pieces, error or None)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import din_enclosure # imported here so the parent process never loads cadquery
+            config = load_config(path)
+            result = din_enclosure.generate_enclosure(config, export=False)
+        return str(path), pieces(result, Path(path).parent.name), None
+    except Exception:
+        return str(path), [], traceback.format_exc()
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="pack the parts of many enclosures onto print beds")
+    parser.add_argument("configs", nargs="*", default=[LIBRARY_DIR], help="config.py files or directories holding */config.py")
+    parser.add_argument("--copies", type=int, default=1, help="enclosures of every config")
+    parser.add_argument("--bed", default="220x220", help="bed size in mm, WIDTHxDEPTH")
+    parser.add_argument("--spacing", type=float, default=5, help="gap between pieces in mm")
+    parser.add_argument("--margin", type=float, default=5, help="free border of the bed in mm")
+    parser.add_argument("--no-rotate", action="store_true", help="do not turn pieces by 90 degrees")
+    parser.add_argument("--out", default="plates", help="output directory")
+    parser.add_argument("--format", choices=("stl", "3mf"), default="stl", help="plate files; 3mf stores every distinct piece once")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="print", help="mesh tessellation")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+    bed = tuple(float(v) for v in args.bed.lower().split("x"))
+
+    paths = []
+    for c in args.configs: paths += find_configs(c) if Path(c).is_dir() else [Path(c)]
+    if not paths:
+        print(f"no config found in {' '.join(map(str, args.configs))}")
+        return 1
+    start = time.perf_counter()
+    items, failed = [], 0
+    with ProcessPoolExecutor(max_workers=args.jobs or os.cpu_count()) as pool:
+        for f in as_completed([pool.submit(build_pieces, p) for p in paths]):
+            path, built, error = f.result()
+            if error:
+                failed += 1
+                print(f"FAILED  {path}\n{error}")
+                continue
+            print(f"{'ok':7} {path}: {len(built)} pieces", flush=True)
+            items += built*args.copies # copies share the shape, it is only moved
+    if failed: return 1
+
+    plates = pack(items, bed, args.spacing, args.margin, not args.no_rotate)
+    files = write_plates(plates, args.out, PLATE_FILENAME.replace(".stl", "." + args.format), PRESETS[args.preset], args.jobs)
+    for path, plate in zip(files, plates):
+        print(f"{path}: {len(plate.placements)} pieces, {plate.fill():.0%} of the bed")
+    print(f"{len(items)} pieces on {len(plates)} plates in {time.perf_counter() - start:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
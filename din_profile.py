@@ -0,0 +1,110 @@
+# copyright @infradom
+# ======================= build profiler ===================================
+#
+# Records wall time, peak RSS and the face/edge count of the result of every named stage of a
+# build: the graph nodes, the booleans of the case, every export. Stages nest (the booleans run
+# inside the "case" node). The report is written as JSON and as folded stacks, the input format
+# of flamegraph.pl, inferno and speedscope.
+#
+# usage: p = Profiler(); generate_enclosure(config, profiler=p, export_workers=1)
+#        p.write_json("profile.json"); p.write_folded("profile.folded"); print(p.table())
+# With export worker processes the exports show up as a single "export" stage.
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+try:
+    import resource
+except ImportError: # windows: no peak RSS
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None: return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024**2 if sys.platform == "darwin" else rss / 1024 # bytes on macOS, KiB on linux
+
+
+def topology(result):
+    # (faces, edges) of a workplane, a shape or a tuple/list of them; None for anything else
+    if isinstance(result, (tuple, list)):
+        counts = [topology(r) for r in result]
+        if any(n is None for n in counts): return None
+        return sum(n[0] for n in counts), sum(n[1] for n in counts)
+    shapes = result.vals() if hasattr(result, "vals") else [result]
+    if not all(hasattr(s, "Faces") for s in shapes): return None
+    return sum(len(s.Faces()) for s in shapes), sum(len(s.Edges()) for s in shapes)
+
+
+@dataclass
+class Stage:
+    name:         str
+    path:         str           # names of the enclosing stages and this one, joined by ";"
+    start:        float         # seconds since the profiler was created
+    seconds:      float = 0.0
+    self_seconds: float = 0.0   # without nested stages
+    peak_rss_mb:  float | None = None
+    faces:        int | None = None
+    edges:        int | None = None
+    result:       object = field(default=None, repr=False) # set inside the with block to count its topology
+
+
+class Profiler:
+    def __init__(self, enabled = True, count_topology = True):
+        self.enabled = enabled
+        self.count_topology = count_topology
+        self.stages = []
+        self._stack = [] # [stage, seconds spent in nested stages]
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield Stage(name, name, 0.0)
+            return
+        start = time.perf_counter()
+        st = Stage(name, ";".join([s.name for s, _ in self._stack] + [name]), start - self._t0)
+        self.stages.append(st)
+        self._stack.append([st, 0.0])
+        try:
+            yield st
+        finally:
+            st.seconds = time.perf_counter() - start
+            _, nested = self._stack.pop()
+            st.self_seconds = st.seconds - nested
+            if self._stack: self._stack[-1][1] += st.seconds
+            st.peak_rss_mb = peak_rss_mb()
+            if self.count_topology and st.result is not None:
+                counts = topology(st.result)
+                if counts: st.faces, st.edges = counts
+            st.result = None # do not keep the geometry alive
+
+    def total(self):
+        return sum(s.seconds for s in self.stages if ";" not in s.path)
+
+    def report(self):
+        return {"total_seconds": self.total(), "peak_rss_mb": peak_rss_mb(),
+                "stages": [{k: v for k, v in asdict(s).items() if k != "result"} for s in self.stages]}
+
+    def write_json(self, path):
+        with open(path, "w") as f: json.dump(self.report(), f, indent=1)
+
+    def folded(self):
+        # one "a;b;c <microseconds>" line per stack, self time only as flamegraph.pl expects
+        totals = {}
+        for s in self.stages: totals[s.path] = totals.get(s.path, 0) + s.self_seconds
+        return "".join(f"{p} {round(t*1e6)}\n" for p, t in totals.items())
+
+    def write_folded(self, path):
+        with open(path, "w") as f: f.write(self.folded())
+
+    def table(self, n = 20):
+        # the n stages with the most self time
+        lines = [f"{'self s':>8} {'total s':>8} {'faces':>6} {'edges':>6}  stage"]
+        for s in sorted(self.stages, key=lambda s: -s.self_seconds)[:n]:
+            lines.append(f"{s.self_seconds:8.3f} {s.seconds:8.3f} {s.faces if s.faces is not None else '':>6} "
+                         f"{s.edges if s.edges is not None else '':>6}  {s.path}")
+        return "\n".join(lines)
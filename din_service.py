@@ -0,0 +1,244 @@
+# copyright @infradom
+# ======================= enclosure generation service ======================
+#
+# usage: python din_service.py [--host H] [--port P | --unix PATH] [--workers N] [--queue N] [--cache]
+#
+# A long-lived HTTP server (TCP or unix socket) around generate_enclosure. The worker processes
+# import cadquery and load the fonts once at start, and keep a BuildGraph so a request that only
+# differs in a few fields from the previous one rebuilds only the affected sub-parts.
+# Throughput comes from the worker processes only: a process runs one build at a time
+# (generate_enclosure serializes builds with a lock), the http threads just wait for results.
+#
+#   POST /fingerprint     Config as JSON -> JSON fingerprints of all parts
+#   POST /stl/<part>      Config as JSON -> binary STL (case, lid, clip, top_wago_fix, bottom_wago_fix, small_parts)
+#   POST /step            Config as JSON -> STEP of all parts as one compound
+#   POST /3mf             Config as JSON -> 3MF of all printable pieces, named and tagged with config and part
+#   POST /zip             Config as JSON -> zip with every STL and the STEP file
+#   GET  /health          worker / queue statistics
+#
+# ?preset=preview|print selects the STL / 3MF tessellation, ?detail=draft a quick build without text,
+# fillets and tapers (see din_enclosure.DETAILS). Configs are validated before they are
+# queued (422 with the errors). Identical requests in flight share one build; at most --queue
+# distinct builds wait or run at a time, more are refused with 503.
+# A worker that dies (an OCCT crash) breaks the whole process pool; the scheduler then starts a
+# new, warmed pool and runs the builds that were lost once more.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+LIBRARY_DIR = Path(__file__).resolve().parent
+if str(LIBRARY_DIR) not in sys.path: sys.path.insert(0, str(LIBRARY_DIR))
+
+from din_cache import part_key
+from din_declarations import *
+from din_enclosure import DETAILS
+from din_export import PRESETS
+from din_validate import validate
+
+PARTS = ("case", "lid", "clip", "top_wago_fix", "bottom_wago_fix", "small_parts")
+
+
+# ======================== worker process ==================================
+
+_graph = None
+_cache = None
+
+def _warm(use_cache):
+    # runs once per worker: pay for the cadquery import and the font loading before the first request
+    global _graph, _cache
+    import din_enclosure
+    from din_graph import BuildGraph
+    _graph = BuildGraph()
+    if use_cache:
+        from din_cache import PartCache
+        _cache = PartCache()
+    din_enclosure.glyph("0", 4, -0.3)
+
+def render(config, kind, part = None, preset = "print", detail = "full"):
+    # config: Config; kind: "fingerprint" | "stl" | "step" | "3mf" | "zip"; returns bytes
+    import din_enclosure
+    from din_fingerprint import fingerprint
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = din_enclosure.generate_enclosure(config, export=False, graph=_graph, cache=_cache, detail=detail)
+    if kind == "fingerprint":
+        return json.dumps({name: fingerprint(s) for name, s in result.outputs.items()}).encode()
+    if kind == "stl":
+        return result.stl(part, PRESETS[preset])
+    if kind == "3mf":
+        return result.threemf(tolerance=PRESETS[preset])
+    step = result.step()
+    if kind == "step": return step
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        for name in result.outputs: z.writestr(name + ".stl", result.stl(name, PRESETS[preset]))
+        z.writestr("enclosure.step", step)
+    return buf.getvalue()
+
+
+# ======================== scheduler =======================================
+
+class Busy(Exception): pass
+
+class Scheduler:
+    def __init__(self, workers = None, queue = 16, use_cache = False):
+        self.workers = workers or os.cpu_count()
+        self.use_cache = use_cache
+        self.pool = self._start()
+        self.queue = queue
+        self.inflight = {} # request key: future
+        self.lock = threading.Lock()
+        self.stats = {"builds": 0, "shared": 0, "refused": 0, "failed": 0, "restarts": 0}
+
+    def _start(self):
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm, initargs=(self.use_cache,))
+        for _ in range(self.workers): pool.submit(int) # start (and warm) every worker now, not on the first request
+        return pool
+
+    def _restart(self, broken):
+        # every build that was on the broken pool comes here, only the first one replaces it
+        with self.lock:
+            if self.pool is not broken: return
+            self.pool = self._start()
+            self.stats["restarts"] += 1
+        broken.shutdown(wait=False)
+
+    def submit(self, config, kind, part = None, preset = "print", detail = "full"):
+        key = part_key(kind, [config_hash(config), part, preset, detail]) # same config in another field order or 18 vs 18.0: same build
+        with self.lock:
+            future = self.inflight.get(key)
+            if future is not None:
+                self.stats["shared"] += 1
+                return future
+            if len(self.inflight) >= self.queue:
+                self.stats["refused"] += 1
+                raise Busy()
+            future = Future() # outlives the pool the build runs on
+            self.inflight[key] = future
+            self.stats["builds"] += 1
+        self._run(key, future, (config, kind, part, preset, detail))
+        return future
+
+    def _run(self, key, future, args, retries = 1):
+        pool = self.pool
+        try:
+            job = pool.submit(render, *args)
+        except BrokenProcessPool as e: # broken by a build that crashed before this one
+            job = Future()
+            job.set_exception(e)
+        job.add_done_callback(lambda j: self._done(key, future, args, pool, j, retries))
+
+    def _done(self, key, future, args, pool, job, retries):
+        error = None if job.cancelled() else job.exception()
+        if isinstance(error, BrokenProcessPool) and retries:
+            self._restart(pool)
+            return self._run(key, future, args, retries - 1)
+        with self.lock:
+            self.inflight.pop(key, None)
+            if error is not None: self.stats["failed"] += 1
+        if job.cancelled(): future.cancel()
+        elif error is not None: future.set_exception(error)
+        else: future.set_result(job.result())
+
+    def health(self):
+        with self.lock: return dict(self.stats, inflight=len(self.inflight), queue=self.queue, workers=self.workers)
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+# ======================== http front end ==================================
+
+CONTENT_TYPES = {"fingerprint": "application/json", "stl": "model/stl", "step": "application/step", "3mf": "model/3mf", "zip": "application/zip"}
+
+class Handler(BaseHTTPRequestHandler):
+    scheduler: Scheduler = None
+    protocol_version = "HTTP/1.1"
+
+    def address_string(self): # unix sockets have no client address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def reply(self, status, body, content_type = "application/json"):
+        if isinstance(body, (dict, list)): body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health": return self.reply(200, self.scheduler.health())
+        self.reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        route = url.path.strip("/").split("/")
+        kind, part = route[0], (route[1] if len(route) > 1 else None)
+        query = parse_qs(url.query)
+        preset = query.get("preset", ["print"])[0]
+        detail = query.get("detail", ["full"])[0]
+        if kind not in CONTENT_TYPES or (kind == "stl") != (part is not None) or len(route) > 2:
+            return self.reply(404, {"error": "not found"})
+        if kind == "stl" and part not in PARTS: return self.reply(404, {"error": f"unknown part {part}, one of {', '.join(PARTS)}"})
+        if preset not in PRESETS: return self.reply(400, {"error": f"unknown preset {preset}"})
+        if detail not in DETAILS: return self.reply(400, {"error": f"unknown detail {detail}"})
+        try:
+            config = config_from_json(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            errors = [i.message for i in validate(config) if i.level == "error"]
+        except (ValueError, TypeError) as e:
+            return self.reply(400, {"error": f"invalid config: {e}"})
+        if errors: return self.reply(422, {"errors": errors})
+        try:
+            body = self.scheduler.submit(config, kind, part, preset, detail).result()
+        except Busy:
+            return self.reply(503, {"error": "too many builds queued"})
+        except Exception as e:
+            return self.reply(500, {"error": f"{type(e).__name__}: {e}"})
+        self.reply(200, body, CONTENT_TYPES[kind])
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(scheduler, host = "127.0.0.1", port = 8765, unix = None):
+    Handler.scheduler = scheduler
+    if unix:
+        with contextlib.suppress(FileNotFoundError): os.unlink(unix)
+        server = ThreadingUnixHTTPServer(unix, Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), Handler)
+    print(f"serving on {unix or f'http://{host}:{port}'}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        scheduler.shutdown()
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="serve generate_enclosure over http with warm workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this unix socket instead of tcp")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--queue", type=int, default=16, help="distinct builds queued or running before 503")
+    parser.add_argument("--cache", action="store_true", help="use the on-disk part cache")
+    args = parser.parse_args(argv)
+    serve(Scheduler(args.workers, args.queue, args.cache), args.host, args.port, args.unix)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# copyright @infradom
+# ======================= vectorized feasibility sweep ======================
+#
+# usage: python din_sweep.py [config.py] --axis board2.width=18:40:2 --axis NR_WAGO_TOP=0,2,4 ...
+#                            [--csv FILE] [--check N]
+#
+# Evaluates the derived dimensions of din_layout and the error checks of din_validate for every
+# combination of the given axes at once with numpy: no cadquery, no geometry, a million
+# combinations in a few seconds. din_layout.layout and din_validate.boxes run on the arrays
+# themselves (the swept fields are arrays, see _Values); the checks on those boxes are the array
+# form of din_validate.validate, kept in step with it by tests/test_sweep.py. Every check becomes a
+# margin in mm (>= 0: fits, < 0: by how much it fails), the feasibility mask is "no margin below -EPS":
+#
+#   board1 carrier        CASE_WIDTH left for board1 (din_layout b1_carrier_height)
+#   <board> carrier       mount height of board2/3 above din_layout MIN_CARRIER
+#   <box> in case         how far a board or screw block can grow before it leaves the cavity
+#   <board> below lid     room between board2/3 and the lid
+#   <usb> wall / floor    room of a usb cutout inside the wall and between floor and lid
+#   <a> / <b>             clearance between two boxes of din_validate.boxes (negative: overlap)
+#   led N ...             LED on board1, light guide within the front, carrier between floor and lid
+#   boardN led N ...      LED on board2/3, its carrier under the lid inside the cavity and clear of the other boxes
+#
+# An axis is a Config field or a board field ("CASE_WIDTH", "board3.length", "board2.width" sets the
+# width including the JST extras), given as start:stop:step (stop included) or a comma separated list.
+# Combinations are evaluated in chunks; beyond 200000 of them only the mask, the smallest margin
+# and the check it belongs to are kept per combination (per check: failing count, min and max).
+# --check N recomputes N random combinations with din_layout.layout and din_validate.validate.
+
+import argparse
+import copy
+import itertools
+import sys
+import time
+from dataclasses import dataclass, is_dataclass
+
+import numpy as np
+
+from din_declarations import *
+from din_layout import layout, MIN_CARRIER
+from din_validate import EPS, validate, boxes as validate_boxes
+
+
+class _Values:
+    # attribute access like a Config or Board where the swept fields are arrays; properties
+    # (Board.width, Board.usb_offset) are evaluated on the arrays too
+    def __init__(self, obj, swept, prefix = ""):
+        self._obj, self._swept, self._prefix = obj, swept, prefix
+
+    def __getattr__(self, name):
+        path = self._prefix + name
+        if path in self._swept: return self._swept[path]
+        attr = getattr(type(self._obj), name, None)
+        if isinstance(attr, property): return attr.fget(self)
+        value = getattr(self._obj, name)
+        return _Values(value, self._swept, path + ".") if is_dataclass(value) else value
+
+
+def _field(path):
+    # "board2.width" is swept as board_width, the width without the JST extras
+    board, _, name = path.rpartition(".")
+    return (board + ".board_width", True) if board and name == "width" else (path, False)
+
+def _set(c, path, value):
+    # sets one swept value on a (copied) Config, as the sweep interprets it
+    target, width = _field(path)
+    *parents, name = target.split(".")
+    obj = c
+    for p in parents: obj = getattr(obj, p)
+    if width: value = value - obj.jst_extrawidth_left - obj.jst_extrawidth_right
+    setattr(obj, name, value.item() if hasattr(value, "item") else value)
+
+
+# ======================== derived dimensions ==============================
+
+def derived(lay):
+    # the din_layout.layout of _Values as name: array
+    result = {name: getattr(lay, name) for name in ("CASE_WIDTH", "WAGO_POS_DEPTH_UPPER", "WAGO_POS_DEPTH_LOWER",
+                                                    "wago_height_t", "wago_height_b", "b1_carrier_height")}
+    for i, (x, y) in enumerate(lay.screw_positions, 1):
+        result[f"screw {i} x"], result[f"screw {i} y"] = x, y
+    return result
+
+
+# ======================== checks ==========================================
+
+def boxes(c, lay):
+    # din_validate.boxes of _Values: name: (x0, x1, y0, y1, z0, z1, present)
+    return {b.name: (b.x0, b.x1, b.y0, b.y1, b.z0, b.z1, b.present) for b in validate_boxes(c, lay)}
+
+def obstacles(c):
+    # the outside of din_validate.cavity as (x0, x1, y0, y1) open rectangles, some possibly empty
+    t, h, inf = c.CASE_THICKNESS, c.DIN_HEIGHT, np.inf
+    lip = h/2 - c.WAGO_LIP_LENGTH - t
+    front = c.DIN_NARROW_HEIGHT/2 - t
+    low = c.DIN_DEEP_LOW - t
+    slot2, slot3 = c.board2.width + t, c.board3.width + t
+    return [
+        (-inf, t, -inf, inf), (c.DIN_DEEP_HIGH - t, inf, -inf, inf),      # behind the back wall, beyond the front
+        (-inf, inf, h/2 - t, inf), (-inf, inf, -inf, -h/2 + t),            # above the top, below the bottom
+        (slot2, inf, np.maximum(lip, front), inf), (slot2, low, lip, front), # beside the upper slot
+        (slot3, inf, -inf, -np.maximum(lip, front)), (slot3, low, -front, -lip),
+        (low, inf, front, lip), (low, inf, -lip, -front),                  # beside the narrow front
+    ]
+
+def _gap(a0, a1, b0, b1):
+    # distance between two intervals, negative: overlap
+    return np.maximum(a0 - b1, b0 - a1)
+
+def inside(box, obs):
+    # how far box (x0, x1, y0, y1) can grow on all sides before it enters one of the obstacles
+    margin = np.inf
+    for o in obs:
+        g = np.maximum(_gap(box[0], box[1], o[0], o[1]), _gap(box[2], box[3], o[2], o[3]))
+        empty = (np.asarray(o[1]) <= o[0]) | (np.asarray(o[3]) <= o[2])
+        margin = np.minimum(margin, np.where(empty, np.inf, g))
+    return margin
+
+
+def margins(c, lay):
+    # check name: margin in mm, see the module comment
+    t, w = c.CASE_THICKNESS, lay.CASE_WIDTH
+    result = {"board1 position": 0.0 if c.board1.position == "front" else -np.inf,
+              "board2 position": 0.0 if c.board2.position == "top" else -np.inf,
+              "board3 position": 0.0 if c.board3.position == "bottom" else -np.inf,
+              "board1 carrier": lay.b1_carrier_height,
+              "board2 carrier": c.board2.mount_height - MIN_CARRIER,
+              "board3 carrier": c.board3.mount_height - MIN_CARRIER}
+    all_boxes = boxes(c, lay)
+    obs = obstacles(c)
+    for name in ("board1", "board2", "board3", "screw block 1", "screw block 2", "screw block 3", "screw block 4"):
+        result[f"{name} in case"] = inside(all_boxes[name], obs)
+    for name in all_boxes:
+        if " led " in name: result[f"{name} in case"] = inside(all_boxes[name], obs)
+    for name in ("board2", "board3"):
+        result[f"{name} below lid"] = w - t - all_boxes[name][5]
+    for name, lo, hi in (("board2 usb", t, t + c.board2.width), ("board3 usb", t, t + c.board3.width),
+                         ("board1 usb", c.board2.width + t, c.DIN_DEEP_LOW - t)):
+        if name not in all_boxes: continue
+        x0, x1, _, _, z0, z1, _ = all_boxes[name]
+        result[f"{name} wall"] = np.minimum(x0 - lo, hi - x1)
+        result[f"{name} floor / lid"] = np.minimum(z0 - t, w - t - z1)
+    for (na, a), (nb, b) in itertools.combinations(all_boxes.items(), 2):
+        gap = np.maximum(np.maximum(_gap(a[0], a[1], b[0], b[1]), _gap(a[2], a[3], b[2], b[3])), _gap(a[4], a[5], b[4], b[5]))
+        result[f"{na} / {nb}"] = np.where(np.asarray(a[6]) & np.asarray(b[6]), gap, np.inf)
+    top1 = c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - t/2
+    r = c.LIGHT_CARRIER_DIAM/2
+    for i, led in enumerate(c.board1.leds or [], 1):
+        y = top1 - c.board1.length + led.y
+        z = w - t/2 - led.x
+        result[f"led {i} on board1"] = np.minimum(np.minimum(led.x, c.board1.width - led.x), np.minimum(led.y, c.board1.length - led.y))
+        result[f"led {i} in front"] = c.DIN_NARROW_HEIGHT/2 - t - (np.abs(y) + r)
+        result[f"led {i} carrier"] = np.minimum(z - r - t, w - (z + r))
+    for name, b in (("board2", c.board2), ("board3", c.board3)):
+        for i, led in enumerate(b.leds or [], 1):
+            result[f"{name} led {i} on {name}"] = np.minimum(np.minimum(led.x, b.width - led.x), np.minimum(led.y, b.length - led.y))
+    return result
+
+
+CHUNK = 1 << 16 # combinations evaluated at once
+
+@dataclass
+class Sweep:
+    axes:     dict        # path: values of the axis
+    checks:   list        # names of the checks, see margins()
+    feasible: np.ndarray  # bool per combination, in grid order (last axis varying fastest)
+    margin:   np.ndarray  # float32, smallest margin per combination
+    binding:  np.ndarray  # index into checks of that smallest margin
+    summary:  dict        # check: (failing combinations, smallest margin, largest margin)
+    derived:  dict | None = None  # with detail: din_layout dimension: array per combination
+    margins:  dict | None = None  # with detail: check: float32 array per combination
+
+    @property
+    def shape(self): return tuple(len(v) for v in self.axes.values()) # feasible.reshape(shape) is the feasibility map
+
+    def params(self, index = None):
+        # path: swept value of the given combinations (default: all of them)
+        index = np.arange(len(self.feasible)) if index is None else np.asarray(index)
+        return {path: np.asarray(v)[i] for (path, v), i in zip(self.axes.items(), np.unravel_index(index, self.shape))}
+
+    def table(self):
+        # check, failing combinations, smallest and largest margin; failing checks first, absent boxes left out
+        rows = [(name, failing, low, high) for name, (failing, low, high) in self.summary.items() if low != np.inf]
+        return sorted(rows, key=lambda r: (-r[1], r[2]))
+
+
+def evaluate(base: Config, params: dict):
+    # derived dimensions and margins of the combinations params = {path: array}
+    n = len(next(iter(params.values()))) if params else 1
+    swept = {}
+    for path, values in params.items():
+        target, width = _field(path)
+        board = getattr(base, target.split(".")[0]) if width else None
+        swept[target] = values - board.jst_extrawidth_left - board.jst_extrawidth_right if width else values
+    c = _Values(base, swept)
+    lay = layout(c)
+    d = {k: np.broadcast_to(v, (n,)) for k, v in derived(lay).items()}
+    m = {k: np.broadcast_to(np.asarray(v, dtype=np.float32), (n,)) for k, v in margins(c, lay).items()}
+    return d, m
+
+def sweep(base: Config, axes: dict, detail: bool | None = None, chunk = CHUNK) -> Sweep:
+    # axes: {path: values}; every combination of the values, the other fields from base.
+    # detail keeps every derived dimension and margin of every combination (about 4 bytes per check
+    # and combination), by default up to 200000 combinations
+    axes = {path: np.asarray(v) for path, v in axes.items()}
+    n = int(np.prod([len(v) for v in axes.values()]))
+    detail = n <= 200000 if detail is None else detail
+    feasible, margin, binding = np.empty(n, dtype=bool), np.empty(n, dtype=np.float32), np.empty(n, dtype=np.uint16)
+    summary, derived_all, margins_all, checks = {}, {}, {}, None
+    shape = tuple(len(v) for v in axes.values())
+    for start in range(0, n, chunk):
+        index = np.arange(start, min(start + chunk, n))
+        params = {path: v[i] for (path, v), i in zip(axes.items(), np.unravel_index(index, shape))}
+        d, m = evaluate(base, params)
+        checks = checks or list(m)
+        stack = np.stack([m[k] for k in checks])
+        rows = slice(start, start + len(index))
+        binding[rows] = np.argmin(stack, axis=0)
+        margin[rows] = stack.min(axis=0)
+        feasible[rows] = margin[rows] >= -EPS
+        for k in checks:
+            failing, low, high = summary.get(k, (0, np.inf, -np.inf))
+            summary[k] = (failing + int((m[k] < -EPS).sum()), min(low, float(m[k].min())), max(high, float(m[k].max())))
+        if detail:
+            for k, v in d.items(): derived_all.setdefault(k, []).append(np.array(v))
+            for k, v in m.items(): margins_all.setdefault(k, []).append(np.array(v))
+    result = Sweep(axes, checks, feasible, margin, binding, summary)
+    if detail:
+        result.derived = {k: np.concatenate(v) for k, v in derived_all.items()}
+        result.margins = {k: np.concatenate(v) for k, v in margins_all.items()}
+    return result
+
+
+def check(result: Sweep, base: Config, n = 100, seed = 0):
+    # compares n random combinations with din_layout.layout and din_validate.validate; list of mismatches
+    rng = np.random.default_rng(seed)
+    index = rng.choice(len(result.feasible), size=min(n, len(result.feasible)), replace=False)
+    params = result.params(index)
+    derived_values, margin_values = evaluate(base, params)
+    mismatches = []
+    for row, i in enumerate(index):
+        c = copy.deepcopy(base)
+        values = {path: v[row].item() for path, v in params.items()}
+        for path, v in values.items(): _set(c, path, v)
+        lay = layout(c)
+        expected = {"CASE_WIDTH": lay.CASE_WIDTH, "WAGO_POS_DEPTH_UPPER": lay.WAGO_POS_DEPTH_UPPER, "WAGO_POS_DEPTH_LOWER": lay.WAGO_POS_DEPTH_LOWER,
+                    "b1_carrier_height": lay.b1_carrier_height}
+        for j, (x, y) in enumerate(lay.screw_positions, 1): expected[f"screw {j} x"], expected[f"screw {j} y"] = x, y
+        for k, v in expected.items():
+            if abs(derived_values[k][row] - v) > 1e-6: mismatches.append(f"{values}: {k} {derived_values[k][row]} != {v}")
+        errors = [e.message for e in validate(c) if e.level == "error"]
+        if bool(result.feasible[i]) == bool(errors):
+            failing = [k for k, m in margin_values.items() if m[row] < -EPS]
+            mismatches.append(f"{values}: sweep {'feasible' if result.feasible[i] else 'fails ' + ', '.join(failing)}, validate: {errors or 'ok'}")
+    return mismatches
+
+
+# ======================== command line ====================================
+
+def parse_axis(text):
+    # "path=start:stop:step" (stop included) or "path=v1,v2,..."
+    path, _, spec = text.partition("=")
+    if ":" in spec:
+        start, stop, step = (float(v) for v in spec.split(":"))
+        values = np.arange(start, stop + step/2, step)
+    else:
+        values = np.array([float(v) for v in spec.split(",")])
+    if path.split(".")[-1].startswith("NR_"): values = values.astype(int)
+    return path, values
+
+def feasibility_map(result, axes):
+    # text map of the first two axes ("#": every combination of the other axes fits, "+": some, ".": none)
+    names = list(axes)
+    grid = result.feasible.reshape(result.shape).reshape(result.shape[0], result.shape[1], -1)
+    lines = [f"{names[0]} down, {names[1]} across: {' '.join(f'{v:g}' for v in axes[names[1]])}"]
+    for v, row in zip(axes[names[0]], grid):
+        lines.append(f"{v:8g}  " + "".join("#" if r.all() else "+" if r.any() else "." for r in row))
+    return "\n".join(lines)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="feasibility of every combination of config values, without building geometry")
+    parser.add_argument("config", nargs="?", help="config.py whose config is the base (default: Config())")
+    parser.add_argument("--axis", action="append", default=[], help="path=start:stop:step or path=v1,v2,...")
+    parser.add_argument("--csv", help="write every combination with its derived dimensions, margins and feasibility")
+    parser.add_argument("--check", type=int, default=0, help="compare N random combinations with din_validate")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        from din_batch import load_config
+        base = load_config(args.config)
+    else:
+        base = Config()
+    axes = dict(parse_axis(a) for a in args.axis)
+    start = time.perf_counter()
+    result = sweep(base, axes, detail=True if args.csv else None)
+    seconds = time.perf_counter() - start
+    total = len(result.feasible)
+    print(f"{total} combinations, {int(result.feasible.sum())} feasible ({result.feasible.mean():.1%}) in {seconds:.2f}s")
+    print(f"{'failing':>9} {'min mm':>8} {'max mm':>8}  check")
+    for name, failing, low, high in result.table(): # structural contacts (margin 0 everywhere) left out
+        if failing or EPS < low < 1: print(f"{failing:9} {low:8.2f} {high:8.2f}  {name}")
+    counts = np.bincount(result.binding[~result.feasible], minlength=len(result.checks))
+    if counts.any():
+        print("infeasible combinations by their worst check:")
+        for i in np.argsort(-counts)[:10]:
+            if counts[i]: print(f"{counts[i]:9}  {result.checks[i]}")
+    if len(axes) >= 2: print(feasibility_map(result, axes))
+    if args.csv:
+        columns = {**result.params(), **result.derived, **result.margins, "feasible": result.feasible}
+        with open(args.csv, "w") as f:
+            f.write(",".join(f'"{k}"' for k in columns) + "\n")
+            np.savetxt(f, np.column_stack([np.asarray(v, dtype=float) for v in columns.values()]), delimiter=",", fmt="%.6g")
+    if args.check:
+        mismatches = check(result, base, args.check)
+        for m in mismatches: print("MISMATCH", m)
+        print(f"checked {min(args.check, total)} combinations against din_validate: {len(mismatches)} mismatches")
+        return 1 if mismatches else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# copyright @infradom
+# ======================= geometry-free config validation ==================
+#
+# validate(config) checks a Config with axis aligned boxes and intervals only: boards, screw blocks,
+# wago rows, usb cutouts, the clip slot and the LED light guides. It does not import cadquery and
+# runs well below a millisecond, so bad configs can be rejected before a build is queued.
+# A config with a boards list is validated as din_place places it (the search takes longer).
+#
+# boxes() also takes numpy arrays for the config values (din_sweep reuses it).
+#
+# Coordinates are those of generate_enclosure: x = depth from the front of the rail,
+# y = height (0 = middle of the front), z = across the case width (0 = bottom, CASE_WIDTH = lid).
+
+from dataclasses import dataclass
+
+from din_declarations import *
+from din_layout import layout, usb_growth, _max, CLIP_GAP, CLIP_THICKNESS, CARRIER_X, MIN_CARRIER
+
+EPS = 1e-6
+
+
+@dataclass
+class Issue:
+    level:   str  # "error" | "warning"
+    message: str
+
+    def __str__(self): return f"{self.level}: {self.message}"
+
+
+@dataclass
+class Box:
+    name: str
+    x0: float
+    x1: float
+    y0: float
+    y1: float
+    z0: float
+    z1: float
+    present: bool = True # False: the feature is absent (no wagos in the row, no room for a carrier)
+
+    def overlaps(self, o):
+        return (min(self.x1, o.x1) - max(self.x0, o.x0) > EPS and
+                min(self.y1, o.y1) - max(self.y0, o.y0) > EPS and
+                min(self.z1, o.z1) - max(self.z0, o.z0) > EPS)
+
+
+def cavity(c: Config, width):
+    # inside of the case as a union of (x0, x1, y0, y1) rectangles, z runs from CASE_THICKNESS to width-CASE_THICKNESS
+    t = c.CASE_THICKNESS
+    lip = c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - t
+    return [
+        (t, c.board2.width + t,      lip, c.DIN_HEIGHT/2 - t),                       # upper slot (board2)
+        (t, c.DIN_DEEP_LOW - t,     -lip, lip),                                      # main body
+        (c.DIN_DEEP_LOW - t - EPS, c.DIN_DEEP_HIGH - t, -c.DIN_NARROW_HEIGHT/2 + t, c.DIN_NARROW_HEIGHT/2 - t), # front
+        (t, c.board3.width + t,     -c.DIN_HEIGHT/2 + t, -lip),                      # lower slot (board3)
+    ]
+
+def _covered(b, rects):
+    # a rectangle is covered if the center of every cell of the grid formed by all rectangle edges is
+    xs = sorted({b.x0, b.x1} | {v for r in rects for v in r[0:2] if b.x0 < v < b.x1})
+    ys = sorted({b.y0, b.y1} | {v for r in rects for v in r[2:4] if b.y0 < v < b.y1})
+    for xa, xb in zip(xs, xs[1:]):
+        for ya, yb in zip(ys, ys[1:]):
+            x, y = (xa + xb)/2, (ya + yb)/2
+            if not any(r[0] - EPS <= x <= r[1] + EPS and r[2] - EPS <= y <= r[3] + EPS for r in rects): return False
+    return True
+
+
+def lid_leds(c: Config, b: Board):
+    # (x, y) of the LEDs of a top or bottom board, which shine through the lid; a bottom board is turned by 180 degrees
+    t, h = c.CASE_THICKNESS, c.DIN_HEIGHT
+    if b.position == "top":    return [(t + led.x, h/2 - t - b.length + led.y) for led in b.leds or []]
+    if b.position == "bottom": return [(t + b.width - led.x, -h/2 + t + b.length - led.y) for led in b.leds or []]
+    return []
+
+
+def boxes(c: Config, lay = None):
+    # named boxes of everything that must not collide
+    lay = lay or layout(c)
+    t, w, h = c.CASE_THICKNESS, lay.CASE_WIDTH, c.DIN_HEIGHT
+    b1, b2, b3 = c.board1, c.board2, c.board3
+    g = usb_growth(c)
+    top1 = h/2 - c.WAGO_LIP_LENGTH - t/2
+    result = [ # board1 sits half a wall thickness deep in slots in the wall, floor and lid; only the part inside the cavity is kept
+        Box("board1", c.DIN_DEEP_HIGH - b1.mount_height - b1.thickness/2, c.DIN_DEEP_HIGH - b1.mount_height + b1.thickness/2,
+                      top1 - b1.length, top1 - t/2, _max(t, w - b1.width - t/2), w - t),
+        Box("board2", t, t + b2.width, h/2 - t - b2.length, h/2 - t, t + b2.mount_height, t + b2.mount_height + b2.thickness),
+        Box("board3", t, t + b3.width, -h/2 + t, -h/2 + t + b3.length, t + b3.mount_height, t + b3.mount_height + b3.thickness),
+    ]
+    for i, (x, y) in enumerate(lay.screw_positions):
+        s = c.SCREW_BLOCK_SIZE/2
+        result.append(Box(f"screw block {i+1}", x - s, x + s, y - s, y + s, t, w))
+    # wago row: support wall, wago body and fixation
+    result.append(Box("upper wago row", lay.WAGO_POS_DEPTH_UPPER - t, lay.WAGO_POS_DEPTH_UPPER + lay.wago_height_t,
+                      h/2 - c.WAGO_LENGTH, h/2, w/2 - c.NR_WAGO_TOP*c.WAGO_OFFSET/2, w/2 + c.NR_WAGO_TOP*c.WAGO_OFFSET/2, c.NR_WAGO_TOP > 0))
+    result.append(Box("lower wago row", lay.WAGO_POS_DEPTH_LOWER - t, lay.WAGO_POS_DEPTH_LOWER + lay.wago_height_b,
+                      -h/2, -h/2 + c.WAGO_LENGTH, w/2 - c.NR_WAGO_BOTTOM*c.WAGO_OFFSET/2, w/2 + c.NR_WAGO_BOTTOM*c.WAGO_OFFSET/2, c.NR_WAGO_BOTTOM > 0))
+    clip_width = w - 2*t - 2*CLIP_GAP
+    result.append(Box("clip slot", -CLIP_THICKNESS - 2*CLIP_GAP, 0, -h/2, -c.DIN_RAIL_LOWER, w/2 - clip_width/2 - CLIP_GAP, w/2 + clip_width/2 + CLIP_GAP))
+    if b1.usb_height is not None:
+        x = c.DIN_DEEP_HIGH + b1.usb_height + b1.thickness/2 - b1.mount_height
+        z = w/2 + lay.b1_carrier_height/2 - b1.usb_offset
+        result.append(Box("board1 usb", x - c.USB_HEIGHT/2 - g, x + c.USB_HEIGHT/2 + g, h/2 - c.WAGO_LIP_LENGTH - t, h/2 - c.WAGO_LIP_LENGTH,
+                          z - c.USB_WIDTH/2 - g, z + c.USB_WIDTH/2 + g))
+    for name, b, y0, y1 in (("board2 usb", b2, h/2 - t, h/2), ("board3 usb", b3, -h/2, -h/2 + t)):
+        if b.usb_height is None: continue
+        x = t + b.width/2 + b.usb_offset
+        z = t + b.usb_height + b.mount_height + b.thickness/2
+        result.append(Box(name, x - c.USB_WIDTH/2 - g, x + c.USB_WIDTH/2 + g, y0, y1, z - c.USB_HEIGHT/2 - g, z + c.USB_HEIGHT/2 + g))
+    # LEDs of a top / bottom board: light guide carrier from the lid down to just above the led, none without room below the lid
+    r = c.LIGHT_CARRIER_DIAM/2
+    for name, b in (("board2", b2), ("board3", b3)):
+        for i, (x, y) in enumerate(lid_leds(c, b), 1):
+            z0 = t + b.mount_height + b.thickness + 0.4
+            result.append(Box(f"{name} led {i}", x - r, x + r, y - r, y + r, z0, w - t, w - t > z0))
+    return result
+
+
+def validate(c: Config) -> list[Issue]:
+    if c.boards is not None:
+        from din_place import place
+        try:
+            c = place(c).config
+        except ValueError as e:
+            return [Issue("error", str(e))]
+    issues = []
+    def error(msg):   issues.append(Issue("error", msg))
+    def warning(msg): issues.append(Issue("warning", msg))
+
+    lay = layout(c)
+    t, w = c.CASE_THICKNESS, lay.CASE_WIDTH
+    if w != c.CASE_WIDTH: warning(f"CASE_WIDTH will be extended from {c.CASE_WIDTH} to {w:.2f} to fit the wagos")
+    if len(c.WAGO_UPPER_TEXT) < c.NR_WAGO_TOP:    warning("WAGO_UPPER_TEXT has fewer entries than NR_WAGO_TOP, padding with 'U'")
+    if len(c.WAGO_LOWER_TEXT) < c.NR_WAGO_BOTTOM: warning("WAGO_LOWER_TEXT has fewer entries than NR_WAGO_BOTTOM, padding with 'U'")
+    if c.board1.position != "front": error(f"board1 position '{c.board1.position}' is not supported, only 'front'")
+    if c.board2.position != "top":    error(f"board2 position '{c.board2.position}' is not supported, only 'top'")
+    if c.board3.position != "bottom": error(f"board3 position '{c.board3.position}' is not supported, only 'bottom'")
+    if lay.b1_carrier_height < -EPS: error(f"board1 ({c.board1.width} mm) is too wide for the case ({w:.2f} mm)")
+
+    all_boxes = [b for b in boxes(c, lay) if b.present]
+    by_name = {b.name: b for b in all_boxes}
+    rects = cavity(c, w)
+
+    # parts inside the case
+    for b in all_boxes:
+        if not (b.name.startswith("board") and "usb" not in b.name) and not b.name.startswith("screw block"): continue
+        if not _covered(b, rects): error(f"{b.name} does not fit inside the case")
+        elif b.name in ("board2", "board3") and b.z1 > w - t + EPS: error(f"{b.name} reaches into the lid (top at {b.z1:.2f}, lid at {w - t:.2f})")
+
+    # usb cutouts must go through the wall inside the cavity, between floor and lid
+    for name, (lo, hi) in (("board2 usb", (t, t + c.board2.width)), ("board3 usb", (t, t + c.board3.width)),
+                           ("board1 usb", (c.board2.width + t, c.DIN_DEEP_LOW - t))):
+        b = by_name.get(name)
+        if b is None: continue
+        if b.x0 < lo - EPS or b.x1 > hi + EPS: error(f"{name} cutout ({b.x0:.2f}..{b.x1:.2f}) extends beyond the inner wall ({lo:.2f}..{hi:.2f})")
+        if b.z0 < t - EPS or b.z1 > w - t + EPS: error(f"{name} cutout ({b.z0:.2f}..{b.z1:.2f}) extends into the floor or lid")
+
+    for i, a in enumerate(all_boxes):
+        for b in all_boxes[i+1:]:
+            if a.overlaps(b): error(f"{a.name} collides with {b.name}")
+
+    # carriers and LED light guides
+    for name, b in (("board2", c.board2), ("board3", c.board3)):
+        if b.mount_height < MIN_CARRIER - EPS: error(f"{name} mount_height {b.mount_height} is below {MIN_CARRIER}, its carriers cannot be built")
+        if b.board_width < CARRIER_X: warning(f"{name} carriers ({CARRIER_X} mm) are wider than the board ({b.board_width} mm)")
+    leds = c.board1.leds or []
+    top1 = c.DIN_HEIGHT/2 - c.WAGO_LIP_LENGTH - t/2
+    r = c.LIGHT_CARRIER_DIAM/2
+    for i, led in enumerate(leds):
+        if not (0 <= led.x <= c.board1.width and 0 <= led.y <= c.board1.length):
+            error(f"led {i+1} ({led.x}, {led.y}) is outside board1")
+        y = top1 - c.board1.length + led.y
+        z = w - t/2 - led.x
+        if abs(y) + r > c.DIN_NARROW_HEIGHT/2 - t + EPS: error(f"led {i+1} light guide is outside the front face")
+        if z - r < t - EPS or z + r > w + EPS: error(f"led {i+1} light guide carrier reaches into the floor or out of the lid")
+        for j, other in enumerate(leds[i+1:], i+2):
+            if (led.x - other.x)**2 + (led.y - other.y)**2 < c.LIGHT_GUIDE_DIAMETER**2 - EPS:
+                warning(f"led {i+1} and led {j} light guide holes merge")
+    for name, b in (("board2", c.board2), ("board3", c.board3)):
+        for i, led in enumerate(b.leds or [], 1):
+            if not (0 <= led.x <= b.width and 0 <= led.y <= b.length): error(f"{name} led {i} ({led.x}, {led.y}) is outside {name}")
+    return issues
+
+
+def check(c: Config):
+    # raise ValueError listing all errors; warnings are printed like generate_enclosure does
+    issues = validate(c)
+    for i in issues:
+        if i.level == "warning": print(f"Warning: {i.message}")
+    errors = [i.message for i in issues if i.level == "error"]
+    if errors: raise ValueError("invalid config:\n  " + "\n  ".join(errors))
+    return issues
@@ -18,6 +18,7 @@ from din_declarations import *
 # configuratoin declaration 
 #
 # currently only designed for 3 boards
+# or give boards = [Board("auto", ...), ...] instead of board1..3 and let din_place.py put them in the slots
 
 config = Config (
     CONFIG_NAME     = "dualzero",
@@ -93,12 +94,11 @@ config = Config (
 )
 
 # ======================================= END of the config part =================================
-import cadquery as cq
 import din_enclosure
 if 'show_object' not in globals(): # if running outside cq-editor
     def show_object(*args, **kwargs):
         pass
 
-din_enclosure.generate_enclosure(config)
+result = din_enclosure.generate_enclosure(config) # detail="draft": quick preview without text, fillets and files
 din_enclosure.show_object = show_object
-din_enclosure.show()
+din_enclosure.show(result)
@@ -0,0 +1,8 @@
+# copyright @infradom
+# the din_* modules live in the repository root, next to the config directories
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path: sys.path.insert(0, str(ROOT))
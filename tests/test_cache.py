@@ -0,0 +1,86 @@
+# copyright @infradom
+# din_cache: part keys, hits and misses, least-recently-used eviction
+
+import os
+from pathlib import Path
+
+import cadquery as cq
+import pytest
+
+from din_cache import PartCache, part_key
+from din_declarations import *
+
+
+def box(size = 1.0):
+    return cq.Workplane("XY").box(size, size, size)
+
+
+def test_part_key_depends_on_name_and_values():
+    board = Board("top", 18, 24)
+    assert part_key("case", [1, board]) == part_key("case", [1, Board("top", 18, 24)])
+    assert part_key("case", [1, board]) != part_key("lid", [1, board])
+    assert part_key("case", [1, board]) != part_key("case", [1, Board("top", 18, 25)])
+    assert part_key("case", [[1, 2]]) != part_key("case", [[2, 1]])
+
+
+def test_get_builds_once_and_round_trips(tmp_path):
+    cache = PartCache(tmp_path)
+    calls = []
+    def build():
+        calls.append(1)
+        return (box(2), box(3))
+    first = cache.get("part", ("key",), build)
+    second = cache.get("part", ("key",), build)
+    assert len(calls) == 1 and (cache.hits, cache.misses) == (1, 1)
+    assert [w.val().Volume() for w in second] == pytest.approx([w.val().Volume() for w in first])
+    assert PartCache(tmp_path).get("part", ("other",), lambda: box()) is not None
+    assert len(list(tmp_path.glob("*.brep"))) == 2
+
+
+def test_unreadable_entry_is_rebuilt(tmp_path):
+    cache = PartCache(tmp_path)
+    cache.get("part", ("key",), box)
+    for p in tmp_path.glob("*.brep"): p.write_text("garbage")
+    assert cache.get("part", ("key",), box).val().Volume() == pytest.approx(1.0)
+    assert cache.misses == 2
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = PartCache(tmp_path, max_bytes=10**9)
+    for i in range(4):
+        cache.get(f"part{i}", (), lambda: box(i + 1))
+    entry = {i: tmp_path / (part_key(f"part{i}", ()) + ".brep") for i in range(4)}
+    for age, i in enumerate((1, 0, 2, 3)): os.utime(entry[i], (1000 + age, 1000 + age)) # part1 oldest, part3 newest
+    cache.max_bytes = entry[2].stat().st_size + entry[3].stat().st_size
+    cache.evict()
+    assert sorted(p.name for p in tmp_path.glob("*.brep")) == sorted([entry[2].name, entry[3].name])
+
+
+def test_store_evicts_with_running_total(tmp_path):
+    cache = PartCache(tmp_path)
+    cache.get("a", (), box)
+    size = cache.size()
+    cache.max_bytes = int(size*2.5)
+    for name in "bcdef": cache.get(name, (), box)
+    assert cache.size() <= cache.max_bytes
+    assert cache._total == cache.size()
+
+
+def test_evict_tolerates_entries_removed_by_another_process(tmp_path, monkeypatch):
+    cache = PartCache(tmp_path, max_bytes=0)
+    cache.get("a", (), box)
+    real_glob = Path.glob
+    monkeypatch.setattr(Path, "glob", lambda self, pattern: list(real_glob(self, pattern)) + [self / "gone.brep"])
+    cache.evict()
+    cache.get("b", (), box)
+    assert cache.size() == 0
+
+
+def test_enclosure_counts_this_builds_hits(tmp_path, capsys):
+    import din_enclosure
+    cache = PartCache(tmp_path)
+    first = din_enclosure.generate_enclosure(Config(), export=False, cache=cache, detail="draft")
+    second = din_enclosure.generate_enclosure(Config(), export=False, cache=cache, detail="draft")
+    assert first.cache_misses > 0 and first.cache_hits == 0
+    assert (second.cache_hits, second.cache_misses) == (first.cache_misses, 0)
+    assert "part cache" not in capsys.readouterr().out
@@ -0,0 +1,59 @@
+# copyright @infradom
+# din_declarations: serialization round trip, canonical hash, frozen copies
+
+import copy
+import json
+import pickle
+
+import pytest
+
+from din_batch import LIBRARY_DIR, find_configs, load_config
+from din_declarations import *
+
+CONFIGS = [Config()] + [load_config(p) for p in find_configs(LIBRARY_DIR)]
+
+
+@pytest.mark.parametrize("c", CONFIGS, ids=lambda c: c.CONFIG_NAME)
+def test_round_trip(c):
+    assert config_from_dict(config_to_dict(c)) == c
+    assert config_from_json(config_to_json(c)) == c
+    assert isinstance(config_from_json(config_to_json(c)).board1.leds[0], Led)
+
+def test_round_trip_with_boards():
+    c = Config(boards=[Board("auto", 18, 24, leds=[Led(1, 2, "x")]), Board("front", 16, 40)])
+    back = config_from_json(config_to_json(c))
+    assert back == c and isinstance(back.boards[0], Board) and isinstance(back.boards[0].leds[0], Led)
+    hash(freeze_config(c))
+    assert thaw_config(freeze_config(c)) == c
+
+def test_missing_keys_take_defaults_and_unknown_keys_fail():
+    assert config_from_dict({"BRAND": "x"}) == Config(BRAND="x")
+    with pytest.raises(TypeError):
+        config_from_dict({"NO_SUCH_FIELD": 1})
+
+def test_hash_is_canonical():
+    c = Config()
+    d = config_to_dict(c)
+    d["CASE_WIDTH"] = 18.0 if isinstance(c.CASE_WIDTH, int) else int(c.CASE_WIDTH)
+    shuffled = json.loads(json.dumps(dict(reversed(list(d.items())))))
+    assert config_hash(config_from_dict(shuffled)) == config_hash(c)
+    assert config_hash(Config(CASE_WIDTH=18 + 1e-12)) == config_hash(c)
+    assert config_hash(Config(CASE_WIDTH=18.5)) != config_hash(c)
+
+def test_hash_sees_board_fields():
+    c = Config()
+    other = copy.deepcopy(c)
+    other.board2.leds = [Led(1, 1)]
+    assert config_hash(other) != config_hash(c)
+
+@pytest.mark.parametrize("c", CONFIGS, ids=lambda c: c.CONFIG_NAME)
+def test_frozen_copy(c):
+    f = freeze_config(c)
+    hash(f)
+    assert freeze_config(f) is f
+    assert config_hash(f) == config_hash(c)
+    assert thaw_config(f) == c
+    assert pickle.loads(pickle.dumps(f)) == f
+    assert f.board2.width == c.board2.width # properties survive freezing
+    with pytest.raises(AttributeError):
+        f.CASE_WIDTH = 20
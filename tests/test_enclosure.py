@@ -0,0 +1,32 @@
+# copyright @infradom
+# din_enclosure: chain and batch booleans build the same parts, also for boards without LEDs
+
+import contextlib
+import io
+
+import cadquery as cq
+import pytest
+
+import din_enclosure
+from din_declarations import *
+
+
+def test_compound_is_one_tool():
+    leds = cq.Workplane("XY").pushPoints([(0, 0), (5, 0), (10, 0)]).circle(1).extrude(2)
+    box = cq.Workplane("XY").box(1, 1, 1)
+    shapes = din_enclosure._tool_shapes([leds, box])
+    assert [s.ShapeType() for s in shapes] == ["Compound", "Solid"]
+    assert len(shapes[0].Solids()) == 3
+
+
+@pytest.mark.parametrize("board", ["board1", "board2"])
+def test_chain_builds_boards_without_leds(board):
+    c = Config()
+    getattr(c, board).leds = None
+    volumes = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for batch in (True, False):
+            result = din_enclosure.generate_enclosure(c, export=False, batch_booleans=batch, detail="draft")
+            volumes[batch] = {name: part.Volume() for name, part in result.outputs.items()}
+    for name, volume in volumes[True].items():
+        assert volumes[False][name] == pytest.approx(volume, rel=1e-6), name
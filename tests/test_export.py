@@ -0,0 +1,115 @@
+# copyright @infradom
+# din_export: the streaming binary STL writer, the 3MF writer with shared meshes
+
+import io
+import struct
+import xml.etree.ElementTree as ET
+import zipfile
+
+import cadquery as cq
+import pytest
+
+from din_export import STL_HEADER, STL_RECORD, Tolerance, stl_bytes, stl_chunks, threemf_bytes, write_3mf, write_stl
+
+
+@pytest.fixture(scope="module")
+def part():
+    return cq.Workplane("XY").box(20, 10, 5).faces(">Z").hole(4).val()
+
+
+class Stream:
+    # write-only target, like a socket or an HTTP response
+    def __init__(self): self.chunks = []
+    def write(self, b): self.chunks.append(bytes(b))
+    def seekable(self): return False
+    def seek(self, *args): raise io.UnsupportedOperation("seek")
+    def tell(self): raise io.UnsupportedOperation("tell")
+
+
+def triangles(data):
+    # the vertex triples of a binary STL, after checking its header and triangle count
+    assert data[:80] == STL_HEADER
+    count, = struct.unpack_from("<I", data, 80)
+    assert count == (len(data) - 84) / STL_RECORD.size
+    return [STL_RECORD.unpack_from(data, 84 + i*STL_RECORD.size)[3:12] for i in range(count)]
+
+
+def test_header_counts_the_records(part):
+    assert len(triangles(stl_bytes(part))) > 12
+
+def test_streams_into_a_non_seekable_target(part):
+    target = Stream()
+    assert write_stl(part, target) is target
+    assert b"".join(target.chunks) == stl_bytes(part)
+
+def test_small_chunks_join_to_the_same_bytes(part):
+    chunks = list(stl_chunks(part, chunk_size=1000))
+    assert len(chunks) > 3 and len(chunks[0]) == 84
+    assert b"".join(chunks) == stl_bytes(part)
+
+def test_triangles_enclose_the_volume(part):
+    volume = 0.0
+    for ax, ay, az, bx, by, bz, cx, cy, cz in triangles(stl_bytes(part, Tolerance(linear=0.01, angular=0.1))):
+        volume += ax*(by*cz - bz*cy) - ay*(bx*cz - bz*cx) + az*(bx*cy - by*cx) # outward triangles: positive
+    assert volume/6 == pytest.approx(part.Volume(), rel=1e-3)
+
+def test_writes_a_path(part, tmp_path):
+    path = write_stl(part, tmp_path / "part.stl")
+    assert path.read_bytes() == stl_bytes(part)
+
+
+CORE = "{http://schemas.microsoft.com/3dmanufacturing/core/2015/02}"
+
+def model(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        assert {"[Content_Types].xml", "_rels/.rels", "3D/3dmodel.model"} <= set(z.namelist())
+        assert "/3D/3dmodel.model" in z.read("_rels/.rels").decode()
+        return ET.fromstring(z.read("3D/3dmodel.model"))
+
+def translation(transform):
+    # the offset of a 3MF transform that does not rotate
+    m = [float(v) for v in transform.split()]
+    assert m[:9] == [1, 0, 0, 0, 1, 0, 0, 0, 1]
+    return m[9:]
+
+
+def test_copies_share_one_mesh(part, tmp_path):
+    moved = part.translate(cq.Vector(30, 0, 0))
+    other = cq.Workplane("XY").box(5, 5, 5).val()
+    items = [(part, None, {"name": "case", "part": "case"}),
+             (moved, None, {"name": "case copy"}),
+             (part, cq.Location(cq.Vector(0, 40, 0)), {"name": "case moved"}),
+             (other, None, {"name": "cube"})]
+    root = model(write_3mf(tmp_path / "parts.3mf", items, metadata={"Title": "test", "config": "abc"}).read_bytes())
+    assert model(threemf_bytes(items, metadata={"Title": "test", "config": "abc"})).attrib == root.attrib
+
+    meta = {m.get("name"): m.text for m in root.findall(f"{CORE}metadata")}
+    assert meta == {"Application": "din_enclosure", "Title": "test", "din:config": "abc"}
+    assert root.get("unit") == "millimeter"
+
+    objects = root.find(f"{CORE}resources").findall(f"{CORE}object")
+    meshes = [o for o in objects if o.find(f"{CORE}mesh") is not None]
+    placed = {o.get("name"): o for o in objects if o.find(f"{CORE}components") is not None}
+    assert len(meshes) == 2 and len(placed) == 4
+    components = {name: o.find(f"{CORE}components").findall(f"{CORE}component") for name, o in placed.items()}
+    assert all(len(c) == 1 for c in components.values())
+    mesh_of = {name: c[0].get("objectid") for name, c in components.items()}
+    assert mesh_of["case"] == mesh_of["case copy"] == mesh_of["case moved"] != mesh_of["cube"]
+
+    corner = [-10, -5, -2.5] # of the geometry, also after the part was meshed
+    offset = {name: translation(c[0].get("transform")) for name, c in components.items()}
+    assert offset["case"] == pytest.approx(corner, abs=1e-4)
+    assert offset["case copy"] == pytest.approx([corner[0] + 30, corner[1], corner[2]], abs=1e-4)
+    assert offset["case moved"] == pytest.approx([corner[0], corner[1] + 40, corner[2]], abs=1e-4)
+    assert offset["cube"] == pytest.approx([-2.5, -2.5, -2.5], abs=1e-4)
+
+    items = [i.get("objectid") for i in root.find(f"{CORE}build").findall(f"{CORE}item")]
+    assert items == [placed[name].get("id") for name in ("case", "case copy", "case moved", "cube")]
+    group = placed["case"].find(f"{CORE}metadatagroup")
+    assert {m.get("name"): m.text for m in group.findall(f"{CORE}metadata")} == {"din:part": "case"}
+    assert placed["cube"].find(f"{CORE}metadatagroup") is None
+
+def test_mesh_is_stored_at_its_corner(part):
+    root = model(threemf_bytes([part]))
+    vertices = root.iter(f"{CORE}vertex")
+    assert min(float(v.get("z")) for v in vertices) == 0.0
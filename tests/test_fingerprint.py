@@ -0,0 +1,52 @@
+# copyright @infradom
+# din_fingerprint: the tolerance comparison that guards geometry refactors, and a shipped config
+
+import copy
+
+import cadquery as cq
+import pytest
+
+from din_batch import LIBRARY_DIR
+from din_fingerprint import TOLERANCES, check_one, compare, fingerprint
+
+
+@pytest.fixture(scope="module")
+def golden():
+    return fingerprint(cq.Workplane("XY").box(10, 20, 30).faces(">Z").hole(4).val())
+
+
+def scaled(fp, key, factor):
+    fp = copy.deepcopy(fp)
+    fp[key] *= factor
+    return fp
+
+
+def test_identical_fingerprints_match(golden):
+    assert compare(golden, copy.deepcopy(golden)) == []
+
+@pytest.mark.parametrize("key", ["volume", "area"])
+def test_change_within_tolerance_passes(golden, key):
+    assert compare(golden, scaled(golden, key, 1 + TOLERANCES[key]/2)) == []
+
+@pytest.mark.parametrize("key", ["volume", "area"])
+def test_change_beyond_tolerance_fails(golden, key):
+    diffs = compare(golden, scaled(golden, key, 1 + TOLERANCES[key]*2))
+    assert len(diffs) == 1 and diffs[0].startswith(key)
+
+def test_moved_bounding_box_fails(golden):
+    moved = copy.deepcopy(golden)
+    moved["bbox"][3] += TOLERANCES["bbox"]/2
+    assert compare(golden, moved) == []
+    moved["bbox"][3] += TOLERANCES["bbox"]*2
+    assert [d.split()[0] for d in compare(golden, moved)] == ["bbox"]
+
+def test_changed_face_count_fails(golden):
+    other = fingerprint(cq.Workplane("XY").box(10, 20, 30).faces(">Z").hole(4).edges("|Z").fillet(1).val())
+    faces = dict(golden, faces=other["faces"])
+    assert [d.split()[0] for d in compare(golden, faces)] == ["faces"]
+
+
+def test_dual_matches_its_fingerprint():
+    path, diffs, error = check_one(LIBRARY_DIR / "dual" / "config.py")
+    assert error is None, error
+    assert diffs == []
@@ -0,0 +1,67 @@
+# copyright @infradom
+# din_graph: a node is re-evaluated exactly when one of its fields or inputs changed
+
+from din_declarations import *
+from din_graph import BuildGraph, field_value
+
+
+def build(graph, c, calls):
+    # width -> slot -> case, brand -> text -> case
+    def node(name, value, fields = (), inputs = ()):
+        def run():
+            calls.append(name)
+            return value()
+        return graph.node(c, name, run, fields, inputs)
+    graph.begin()
+    slot = node("slot", lambda: c.board2.width + 2, ("board2.width",))
+    text = node("text", lambda: c.BRAND.upper(), ("BRAND",))
+    return node("case", lambda: (slot, text), (), ("slot", "text"))
+
+
+def test_field_value():
+    assert field_value(Config(), "board2.width") == Config().board2.width
+
+def test_unchanged_config_is_reused():
+    graph, calls, c = BuildGraph(), [], Config()
+    first = build(graph, c, calls)
+    assert calls == ["slot", "text", "case"]
+    calls.clear()
+    assert build(graph, Config(), calls) == first
+    assert calls == [] and graph.evaluated == []
+
+def test_changed_field_rebuilds_node_and_downstream_only():
+    graph, calls, c = BuildGraph(), [], Config()
+    build(graph, c, calls)
+    calls.clear()
+    c.BRAND = "other"
+    assert build(graph, c, calls) == (c.board2.width + 2, "OTHER")
+    assert calls == ["text", "case"]
+
+def test_same_value_of_an_input_keeps_downstream():
+    # a jst extra moved from left to right: same board2.width, nothing is rebuilt
+    graph, calls, c = BuildGraph(), [], Config()
+    c.board2.jst_extrawidth_left = 2
+    build(graph, c, calls)
+    calls.clear()
+    c.board2.jst_extrawidth_left, c.board2.jst_extrawidth_right = 0, 2
+    build(graph, c, calls)
+    assert calls == []
+
+def test_affected():
+    graph, calls = BuildGraph(), []
+    build(graph, Config(), calls)
+    assert graph.affected(["BRAND"]) == {"text", "case"}
+    assert graph.affected(["board2"]) == {"slot", "case"} # a whole board covers its fields
+    assert graph.affected(["CASE_WIDTH"]) == set()
+    assert graph.downstream(["slot"]) == {"slot", "case"}
+
+
+def test_enclosure_rebuilds_only_affected_nodes(capsys):
+    import din_enclosure
+    graph, c = BuildGraph(), Config()
+    din_enclosure.generate_enclosure(c, export=False, graph=graph, detail="draft")
+    c.USB_HEIGHT = 3.0
+    result = din_enclosure.generate_enclosure(c, export=False, graph=graph, detail="draft")
+    assert "build graph" not in capsys.readouterr().out
+    assert sorted(result.rebuilt) == sorted(graph.affected(["USB_HEIGHT"]))
+    assert "case" in result.rebuilt and "lid" not in result.rebuilt
@@ -0,0 +1,89 @@
+# copyright @infradom
+# din_interference: penetration depth, contact and clearance of box pairs, enclosed parts, and the
+# BVH broad phase against a brute force box test
+
+import cadquery as cq
+import numpy as np
+import pytest
+
+from din_interference import TOLERANCE, _box_gap, bvh, candidates, check_pair, check_parts, mesh
+
+
+def box(x = 0.0, size = (10, 10, 10), name = "box"):
+    return mesh(name, cq.Workplane("XY").box(*size).translate((x, 0, 0)).val())
+
+def pair(ma, mb, radius = 1.0, tolerance = TOLERANCE):
+    return check_pair(ma, bvh(ma), mb, bvh(mb), radius, tolerance)
+
+def bar(x):
+    # 10 x 6 x 6: its side faces stay off the faces of the 10 mm cube, so its corners are clearly in or out
+    return box(x, (10, 6, 6), "bar")
+
+
+def test_overlap_reports_its_depth():
+    p = pair(box(), bar(9.5))
+    assert p.status == "interference" and p.distance == 0
+    assert p.depth == pytest.approx(0.5, abs=1e-6)
+    assert p.at[0] == pytest.approx(4.5) and abs(p.at[1]) == pytest.approx(3)
+    assert "0.500 mm deep" in str(p)
+
+def test_overlap_within_tolerance_is_contact():
+    p = pair(box(), bar(9.98))
+    assert p.depth == pytest.approx(0.02, abs=1e-6)
+    assert p.status == "contact"
+
+def test_touching_faces_are_contact():
+    p = pair(box(), bar(10))
+    assert p.status == "contact"
+    assert p.distance == pytest.approx(0, abs=1e-9) and p.depth == pytest.approx(0, abs=1e-9)
+
+@pytest.mark.parametrize("tolerance, status", [(TOLERANCE, "clearance"), (0.1, "contact")])
+def test_gap_against_tolerance(tolerance, status):
+    p = pair(box(), bar(10.05), tolerance=tolerance)
+    assert p.distance == pytest.approx(0.05, abs=1e-6) and p.depth == 0
+    assert p.status == status
+
+def test_gap_beyond_radius_is_not_reported():
+    assert pair(box(), bar(11.5)) is None
+    assert pair(box(), bar(11.5), radius=2).distance == pytest.approx(1.5, abs=1e-6)
+
+def test_edges_closer_than_vertices():
+    # a bar turned by 45 degrees: its edge comes closest to the cube face between the vertices of both
+    turned = cq.Workplane("XY").box(4, 4, 20).rotate((0, 0, 0), (0, 0, 1), 45).translate((5 + 0.3 + 2*2**0.5, 0, 0))
+    p = pair(box(size=(10, 10, 4)), mesh("turned", turned.val()))
+    assert p.distance == pytest.approx(0.3, abs=1e-6) and p.status == "clearance"
+
+@pytest.mark.parametrize("inner_first", [True, False])
+def test_part_inside_another(inner_first):
+    # no triangles within radius: the winding number finds the enclosed part
+    inner, outer = box(size=(2, 2, 2), name="inner"), box(name="outer")
+    p = pair(inner, outer) if inner_first else pair(outer, inner)
+    assert p.status == "interference" and p.depth == np.inf
+    assert "enclosed" in str(p)
+
+def test_parts_far_apart_inside_their_boxes():
+    # an L-shaped part around a cube: the cube is inside its bounding box, but not inside it
+    l = cq.Workplane("XY").box(20, 4, 4).union(cq.Workplane("XY").box(4, 20, 4).translate((-8, 8, 0)))
+    cube = cq.Workplane("XY").box(2, 2, 2).translate((2, 8, 0))
+    assert pair(mesh("l", l.val()), mesh("cube", cube.val())) is None
+
+
+def test_candidates_match_brute_force():
+    sphere = mesh("sphere", cq.Workplane("XY").sphere(5).val())
+    ring = mesh("ring", cq.Workplane("XY").circle(9).circle(5.6).extrude(3).translate((0, 0, -1.5)).val())
+    a, b = bvh(sphere), bvh(ring)
+    i, j, gap = candidates(a, b, 1.0)
+    every = _box_gap(a.tlo[:, None], a.thi[:, None], b.tlo[None], b.thi[None])
+    expected = set(zip(*np.nonzero(every <= 1.0)))
+    assert len(expected) > 10 and len(expected) < every.size
+    assert sorted(zip(i.tolist(), j.tolist())) == sorted((int(x), int(y)) for x, y in expected)
+    assert np.allclose(gap, every[i, j])
+
+
+def test_check_parts_orders_and_skips_placeholders():
+    shapes = {"a": cq.Workplane("XY").box(10, 10, 10).val(),
+              "b": cq.Workplane("XY").box(10, 6, 6).translate((9.5, 0, 0)).val(),
+              "c": cq.Workplane("XY").box(10, 6, 6).translate((-10.05, 0, 0)).val(),
+              "dummy": cq.Workplane("XY").box(0.1, 0.1, 0.1).val()}
+    pairs = check_parts(shapes)
+    assert [(p.a, p.b, p.status) for p in pairs] == [("a", "b", "interference"), ("a", "c", "clearance")]
@@ -0,0 +1,52 @@
+# copyright @infradom
+# din_place: boards of a list go into the front, top and bottom slots, and the result builds
+
+import contextlib
+import io
+
+import pytest
+
+from din_declarations import *
+from din_layout import MIN_CARRIER
+from din_place import interval, place
+from din_validate import validate
+
+
+def boards():
+    # a usb board and a plain board for the horizontal slots, the LED board pinned to the front
+    return [Board("auto", 18, 24, thickness=2, usb_height=1.8, mount_height=1.5),
+            Board("auto", 20, 30, thickness=1.6),
+            Board("front", 16, 43.4, mount_height=12, leds=[Led(x=1.4, y=21.0), Led(x=3.8, y=21.0)])]
+
+
+def test_pinned_board_keeps_its_slot():
+    result = place(Config(boards=boards()))
+    assert result.slots["front"] == 2
+    assert result.config.boards is None
+    assert result.config.board1.mount_height >= 12
+
+@pytest.mark.parametrize("slot", ["top", "bottom"])
+def test_horizontal_slot_needs_carrier_height(slot):
+    lo, hi = interval(Config(), Board(slot, 20, 30, thickness=1.6, mount_height=0), slot, Config().CASE_WIDTH)
+    assert lo == MIN_CARRIER and hi > lo
+
+def test_placed_boards_have_carriers():
+    c = place(Config(boards=boards())).config
+    assert min(c.board2.mount_height, c.board3.mount_height) >= MIN_CARRIER
+    assert [i.message for i in validate(c) if i.level == "error"] == []
+
+def test_too_many_boards():
+    with pytest.raises(ValueError, match="slots"):
+        place(Config(boards=boards() + [Board("auto", 10, 10)]))
+
+def test_board_that_fits_nowhere():
+    with pytest.raises(ValueError, match="fit in none"):
+        place(Config(boards=[Board("auto", 80, 120)]))
+
+
+def test_placement_builds():
+    import din_enclosure
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = din_enclosure.generate_enclosure(Config(boards=boards()), export=False, detail="draft")
+    assert result.placement is not None and result.placement.config is result.config
+    assert result.outputs["case"].isValid() and result.outputs["lid"].isValid()
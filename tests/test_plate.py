@@ -0,0 +1,63 @@
+# copyright @infradom
+# din_plate: MaxRects packing keeps pieces on the bed, apart by spacing, never overlapping
+
+import itertools
+import random
+
+import pytest
+
+from din_plate import Piece, pack
+
+BED = (220, 220)
+
+
+def footprint(p):
+    w, d = (p.piece.depth, p.piece.width) if p.rotated else (p.piece.width, p.piece.depth)
+    return p.x, p.y, w, d
+
+def check(plates, items, bed = BED, spacing = 5, margin = 5):
+    placed = [p for plate in plates for p in plate.placements]
+    assert sorted(id(p.piece) for p in placed) == sorted(id(i) for i in items)
+    for plate in plates:
+        for p in plate.placements:
+            x, y, w, d = footprint(p)
+            assert x >= margin - 1e-9 and y >= margin - 1e-9
+            assert x + w <= bed[0] - margin + 1e-9 and y + d <= bed[1] - margin + 1e-9
+        for a, b in itertools.combinations(plate.placements, 2):
+            ax, ay, aw, ad = footprint(a)
+            bx, by, bw, bd = footprint(b)
+            apart = (ax + aw + spacing <= bx + 1e-9 or bx + bw + spacing <= ax + 1e-9 or
+                     ay + ad + spacing <= by + 1e-9 or by + bd + spacing <= ay + 1e-9)
+            assert apart, f"{a.piece.name} and {b.piece.name} overlap"
+        assert 0 < plate.fill() <= 1
+
+
+def test_enclosure_parts():
+    items = [Piece(f"e{i}/{n}", None, w, d) for i in range(6)
+             for n, w, d in (("case", 58, 86), ("lid", 54, 80), ("clip", 14, 40), ("fix", 5, 20), ("fix2", 5, 20))]
+    plates = pack(items, BED)
+    check(plates, items)
+    assert len(plates) <= 3
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_pieces(seed):
+    rng = random.Random(seed)
+    items = [Piece(f"p{i}", None, rng.uniform(3, 120), rng.uniform(3, 120)) for i in range(40)]
+    check(pack(items, BED, spacing=3, margin=2), items, spacing=3, margin=2)
+
+def test_rotation_makes_long_pieces_fit():
+    items, bed = [Piece("wide", None, 200, 30), Piece("long", None, 30, 200)], (60, 220)
+    with pytest.raises(ValueError):
+        pack(items, bed, rotate=False)
+    plates = pack(items, bed)
+    check(plates, items, bed)
+    assert sum(p.rotated for plate in plates for p in plate.placements) == 1
+
+def test_copies_share_the_piece():
+    p = Piece("x", None, 50, 50)
+    plates = pack([p]*4, BED)
+    assert len(plates) == 1 and len(plates[0].placements) == 4
+
+def test_too_large():
+    with pytest.raises(ValueError):
+        pack([Piece("big", None, 215, 10)], BED)
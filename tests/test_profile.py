@@ -0,0 +1,53 @@
+# copyright @infradom
+# din_profile: nested stage timing, the JSON, folded-stack and table reports
+
+import json
+import time
+
+import cadquery as cq
+
+from din_profile import Profiler
+
+
+def profile():
+    p = Profiler()
+    with p.stage("parent"):
+        time.sleep(0.02)
+        with p.stage("child") as st:
+            time.sleep(0.05)
+            st.result = cq.Workplane("XY").box(1, 1, 1)
+    return p
+
+
+def test_child_time_is_part_of_the_parent():
+    parent, child = profile().stages
+    assert (parent.path, child.path) == ("parent", "parent;child")
+    assert child.seconds >= 0.05
+    assert parent.seconds >= child.seconds + 0.02
+    assert abs(parent.self_seconds - (parent.seconds - child.seconds)) < 1e-9
+    assert (child.faces, child.edges) == (6, 12) and child.result is None
+
+def test_total_counts_top_level_stages_once():
+    p = profile()
+    assert p.total() == p.stages[0].seconds
+
+def test_folded_stacks_hold_self_time():
+    p = profile()
+    lines = dict(line.rsplit(" ", 1) for line in p.folded().splitlines())
+    assert set(lines) == {"parent", "parent;child"}
+    assert int(lines["parent;child"]) == round(p.stages[1].self_seconds*1e6)
+
+def test_json_and_table(tmp_path):
+    p = profile()
+    p.write_json(tmp_path / "profile.json")
+    report = json.loads((tmp_path / "profile.json").read_text())
+    assert [s["path"] for s in report["stages"]] == ["parent", "parent;child"]
+    assert "result" not in report["stages"][0] and report["total_seconds"] == p.total()
+    table = p.table().splitlines()
+    assert table[0].split()[-1] == "stage" and table[1].endswith("parent;child") # most self time first
+
+def test_disabled_profiler_records_nothing():
+    p = Profiler(enabled=False)
+    with p.stage("parent"):
+        with p.stage("child"): pass
+    assert p.stages == [] and p.folded() == ""
@@ -0,0 +1,106 @@
+# copyright @infradom
+# din_service: in-flight sharing, the queue bound, validation and recovery from a crashed worker;
+# render is stubbed, so no enclosure is built
+
+import http.client
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import din_service
+from din_declarations import *
+from din_service import Busy, Handler, Scheduler
+
+
+def slow_render(config, kind, part = None, preset = "print", detail = "full"):
+    time.sleep(0.3)
+    return f"{kind} {config.CASE_WIDTH:g}".encode()
+
+def crash_render(config, kind, part = None, preset = "print", detail = "full"):
+    # the worker dies like on an OCCT segfault, as often as CASE_WIDTH says, counted in a file named by BRAND
+    with open(config.BRAND, "a+") as f:
+        f.seek(0)
+        crashes = len(f.read())
+        f.write("x")
+    if crashes < config.CASE_WIDTH: os._exit(1)
+    return b"built"
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    def make(render = slow_render, queue = 16):
+        monkeypatch.setattr(din_service, "_warm", lambda use_cache: None)
+        monkeypatch.setattr(din_service, "render", render)
+        made.append(Scheduler(workers=1, queue=queue))
+        return made[-1]
+    made = []
+    yield make
+    for s in made: s.shutdown()
+
+
+def test_identical_requests_share_one_build(scheduler):
+    s = scheduler()
+    first = s.submit(Config(), "stl", "case")
+    same = s.submit(Config(CASE_WIDTH=18.0), "stl", "case") # same config hash
+    other = s.submit(Config(), "stl", "lid")
+    assert same is first and other is not first
+    assert first.result(10) == b"stl 18"
+    assert other.result(10) == b"stl 18"
+    assert s.health()["builds"] == 2 and s.health()["shared"] == 1 and s.health()["inflight"] == 0
+    assert s.submit(Config(), "stl", "case") is not first # done builds are not shared
+
+def test_queue_bound_refuses(scheduler):
+    s = scheduler(queue=1)
+    running = s.submit(Config(), "step")
+    with pytest.raises(Busy):
+        s.submit(Config(CASE_WIDTH=36), "step")
+    assert s.health()["refused"] == 1
+    running.result(10)
+    assert s.submit(Config(CASE_WIDTH=36), "step").result(10) == b"step 36"
+
+def test_crashed_worker_is_replaced(scheduler, tmp_path):
+    s = scheduler(crash_render)
+    assert s.submit(Config(CASE_WIDTH=1, BRAND=str(tmp_path / "once")), "step").result(30) == b"built"
+    assert s.health()["restarts"] == 1 and s.health()["failed"] == 0
+
+def test_second_crash_fails_the_build_only(scheduler, tmp_path):
+    s = scheduler(crash_render)
+    with pytest.raises(BrokenProcessPool):
+        s.submit(Config(CASE_WIDTH=2, BRAND=str(tmp_path / "twice")), "step").result(30)
+    assert s.health()["failed"] == 1 and s.health()["inflight"] == 0
+    assert s.submit(Config(CASE_WIDTH=0, BRAND=str(tmp_path / "never")), "step").result(30) == b"built"
+    assert s.health()["restarts"] == 2
+
+
+@pytest.fixture
+def server(scheduler):
+    Handler.scheduler = scheduler(queue=1)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def post(server, path, config):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=30)
+    conn.request("POST", path, config_to_json(config), {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def test_http_statuses(server):
+    assert post(server, "/stl/case", Config()) == (200, b"stl 18")
+    invalid = Config()
+    invalid.board2.mount_height = 0
+    status, body = post(server, "/stl/case", invalid)
+    assert status == 422 and b"board2 mount_height" in body
+    assert post(server, "/stl/nothing", Config())[0] == 404
+    busy = threading.Thread(target=post, args=(server, "/step", Config()))
+    busy.start()
+    time.sleep(0.1)
+    assert post(server, "/step", Config(CASE_WIDTH=36))[0] == 503
+    busy.join()
@@ -0,0 +1,33 @@
+# copyright @infradom
+# din_sweep: the vectorized checks agree with din_layout.layout and din_validate.validate
+
+import numpy as np
+import pytest
+
+from din_batch import LIBRARY_DIR, find_configs, load_config
+from din_declarations import *
+from din_sweep import check, sweep
+
+BASES = [Config()] + [load_config(p) for p in find_configs(LIBRARY_DIR)]
+
+AXES = {
+    "wagos":   {"NR_WAGO_TOP": np.array([0, 1, 2, 3, 4]), "NR_WAGO_BOTTOM": np.array([0, 2, 5]), "CASE_WIDTH": np.array([18, 27, 36])},
+    "slots":   {"board2.width": np.arange(10, 44, 3.0), "board3.length": np.arange(10, 70, 4.0)},
+    "heights": {"board2.mount_height": np.arange(-0.5, 9, 0.75), "board3.mount_height": np.arange(-0.5, 9, 0.75), "CASE_WIDTH": np.array([18, 24])},
+    "front":   {"board1.width": np.arange(8, 24, 2.0), "board1.mount_height": np.arange(0, 50, 5.0), "board1.length": np.array([20, 43.4, 60])},
+    "usb":     {"USB_WIDTH": np.arange(6, 16, 1.5), "USB_HEIGHT": np.arange(2, 8, 1.0), "CASE_THICKNESS": np.array([1.5, 2, 3])},
+}
+
+
+@pytest.mark.parametrize("axes", AXES, ids=str)
+@pytest.mark.parametrize("base", BASES, ids=lambda c: c.CONFIG_NAME)
+def test_sweep_matches_validate(base, axes):
+    result = sweep(base, AXES[axes])
+    assert check(result, base, n=150) == []
+
+def test_led_boards():
+    base = Config()
+    base.board2.leds = [Led(2, 3), Led(10, 20)]
+    base.board3.leds = [Led(5, 5)]
+    result = sweep(base, {"board2.mount_height": np.arange(0, 12, 0.5), "board3.length": np.arange(5, 40, 2.5)})
+    assert check(result, base, n=200) == []
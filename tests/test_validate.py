@@ -0,0 +1,38 @@
+# copyright @infradom
+# din_validate: the pre-flight check rejects configs that cannot be built
+
+import pytest
+
+from din_batch import LIBRARY_DIR, find_configs, load_config
+from din_declarations import *
+from din_validate import validate
+
+CONFIGS = find_configs(LIBRARY_DIR)
+
+
+def errors(c):
+    return [i.message for i in validate(c) if i.level == "error"]
+
+
+@pytest.mark.parametrize("path", CONFIGS, ids=lambda p: p.parent.name)
+def test_shipped_configs_are_valid(path):
+    assert errors(load_config(path)) == []
+
+def test_default_config_is_valid():
+    assert errors(Config()) == []
+
+@pytest.mark.parametrize("slot", ["board2", "board3"])
+def test_horizontal_board_needs_carrier_height(slot):
+    c = Config()
+    getattr(c, slot).mount_height = 0
+    assert any(f"{slot} mount_height" in e for e in errors(c))
+
+def test_board_into_lid():
+    c = Config()
+    c.board2.mount_height = 20
+    assert any("board2" in e for e in errors(c))
+
+def test_unsupported_position():
+    c = Config()
+    c.board2.position = "bottom"
+    assert any("board2 position" in e for e in errors(c))